@@ -0,0 +1,542 @@
+"""游戏更新与绘制性能测试
+
+在dummy视频驱动下用headless模式驱动每个游戏，跑固定的脚本化场景，
+报告每个阶段的 ns/op 以及整帧的 frames/sec。
+
+    python benchmarks.py                         # 运行全部场景
+    python benchmarks.py -s snake_200            # 只运行指定场景
+    python benchmarks.py --save baseline.json    # 保存基线
+    python benchmarks.py --compare baseline.json --threshold 0.15
+    python benchmarks.py --replay session.gbr    # 用录制的一局作为场景
+
+与基线比较时，任何阶段变慢超过阈值都会以退出码1结束。
+"""
+import argparse
+import copy
+import json
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+
+os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+os.environ.setdefault('SDL_AUDIODRIVER', 'dummy')
+
+import pygame
+
+try:
+    import numpy as np
+except ImportError:  # numpy是可选依赖，没有时跳过需要它的阶段
+    np = None
+
+from minesweeper_board import (FLAGGED, MINE, REVEALED, VALUE_MASK, generate_board, mine_positions,
+                              neighbor_counts, sample_mines, values)
+from minesweeper_chunks import InfiniteBoard, generate_chunk
+from minesweeper_game import Minesweeper, GameState
+from minesweeper_infinite import InfiniteMinesweeper
+from minesweeper_pool import find_board
+from minesweeper_solver import analyze
+from minesweeper_stats import board_stats, seeded_stats
+from pacman_game import PacManGame
+from plane_shooter_simple import PlaneShooter
+from replay import InputLog, ReplayCursor
+from snake_autopilot import Autopilot, hamiltonian_cycle, play
+from snake_batch import BatchSnake
+from snake_game import SnakeGame
+from tetris_game import TetrisGame
+from tic_tac_toe import TicTacToe
+
+
+class Scenario:
+    """一个基准场景：构造好状态的游戏 + 需要计时的各个阶段
+
+    phases 是 (名字, 函数) 列表；restore 会在每次计时前调用（不计入时间），
+    用来把会被修改的状态恢复到场景的初始样子。
+    """
+
+    def __init__(self, name, description, game, phases, restore=None):
+        self.name = name
+        self.description = description
+        self.game = game
+        self.phases = phases
+        self.restore = restore
+
+
+def minesweeper_expert_half():
+    game = Minesweeper(headless=True)
+    game.reset(seed=1)
+    game.change_difficulty('hard')
+    game.reveal_cell(game.rows // 2, game.cols // 2)
+
+    # 揭开一半的安全格子，剩下的一部分插上旗子
+    rng = random.Random(1)
+    cells = list(range(game.rows * game.cols))
+    rng.shuffle(cells)
+    safe = [index for index in cells if game.cells[index] & VALUE_MASK != MINE]
+    for index in safe[:len(safe) // 2]:
+        game.cells[index] |= REVEALED
+    mines = mine_positions(game.cells, game.cols)
+    for r, c in mines[:len(mines) // 3]:
+        game.cells[r * game.cols + c] |= FLAGGED
+    # 直接改了格子状态，棋盘layer要全部重画
+    game.board_layer.invalidate_all()
+
+    return Scenario('minesweeper_expert_half', 'expert 16x30 board, half revealed', game,
+                    [('draw', game.draw),
+                     ('draw_dirty', lambda: minesweeper_frame(game)),
+                     ('repaint_board', lambda: minesweeper_repaint(game))])
+
+
+def minesweeper_frame(game):
+    """窗口模式下的一帧（没有输入时只检查各区域的key）"""
+    game.update_board()
+    game.dirty.draw(game.screen, game.draw, scene=(game.game_state, game.difficulty))
+
+
+def minesweeper_repaint(game):
+    """把视口里的格子全部重画到棋盘layer上"""
+    game.board_layer.invalidate_all()
+    game.board_layer.update()
+
+
+def minesweeper_generate_1m():
+    """百万格子的自定义棋盘：抽样地雷、计算数字、生成游戏使用的格子字节"""
+    rows, cols, mines = 1000, 1000, 150000
+    rng = random.Random(1)
+    picks = sample_mines(rows, cols, mines, rows // 2, cols // 2, rng)
+
+    return Scenario('minesweeper_generate_1m', '1000x1000 board, 150k mines', None,
+                    [('sample_mines', lambda: sample_mines(rows, cols, mines, rows // 2, cols // 2, rng)),
+                     ('neighbor_counts', lambda: neighbor_counts(rows, cols, picks)),
+                     ('generate_board', lambda: generate_board(rows, cols, mines,
+                                                               rows // 2, cols // 2, rng))])
+
+
+def minesweeper_cascade():
+    """300x300的稀疏棋盘，第一次点击展开一大片空白区域"""
+    game = Minesweeper(headless=True)
+    game.reset(seed=1)
+    game.configure('custom:300x300:900')
+    game.reveal_cell(150, 150)
+    board = values(game.cells)
+
+    def restore():
+        game.reset_game()
+        game.cells = bytearray(board)
+        game.first_click = False
+
+    return Scenario('minesweeper_cascade', '300x300 board, 900 mines, one big opening', game,
+                    [('reveal', lambda: game.reveal_cell(150, 150))],
+                    restore)
+
+
+def minesweeper_huge_view():
+    """2000x2000的棋盘，视口停在中间：绘制开销只取决于视口大小"""
+    game = Minesweeper(headless=True)
+    game.reset(seed=1)
+    game.configure('custom:2000x2000:400000')
+    game.reveal_cell(1000, 1000)
+    game.view.pan(1000 * game.cell_size, 1000 * game.cell_size)
+    step = [game.PAN_SPEED]
+
+    def pan():
+        # 左右来回平移，每帧滚动layer并重画露出来的一列格子
+        step[0] = -step[0]
+        game.view.pan(step[0], 0)
+        minesweeper_frame(game)
+
+    return Scenario('minesweeper_huge_view', '2000x2000 board seen through a 1600x880 viewport', game,
+                    [('draw', game.draw),
+                     ('draw_dirty', lambda: minesweeper_frame(game)),
+                     ('repaint_board', lambda: minesweeper_repaint(game)),
+                     ('pan', pan)])
+
+
+def minesweeper_solver():
+    """高级棋盘按提示玩到揭开约三分之一的格子，然后分析整个局面"""
+    game = Minesweeper(headless=True)
+    game.reset(seed=3)
+    game.change_difficulty('hard')
+    game.reveal_cell(game.rows // 2, game.cols // 2)
+    while (game.game_state == GameState.PLAYING and
+           game.rows * game.cols - game.mine_count - game.safe_left < game.rows * game.cols // 3):
+        game.reveal_cell(*game.solve().best_move()[0])
+
+    return Scenario('minesweeper_solver', 'expert 16x30 board, a third revealed', game,
+                    [('analyze', lambda: analyze(game.cells, game.rows, game.cols, game.mine_count))])
+
+
+def minesweeper_save_1m():
+    """1000x1000的棋盘玩到一半时存档、读档（存档是文件头加上原样的格子字节）"""
+    game = Minesweeper(headless=True)
+    game.reset(seed=1)
+    game.configure('custom:1000x1000:150000')
+    game.reveal_cell(500, 500)
+    path = os.path.join(tempfile.mkdtemp(), 'benchmark.gbm')
+    game.save_game(path)
+
+    return Scenario('minesweeper_save_1m', '1000x1000 board saved and loaded', game,
+                    [('save', lambda: game.save_game(path)),
+                     ('load', lambda: game.load_game(path))])
+
+
+def minesweeper_3bv():
+    """高级棋盘的3BV：赢了以后统计一个棋盘，以及批量统计1000个种子（需要numpy）"""
+    game = Minesweeper(headless=True)
+    game.reset(seed=1)
+    game.change_difficulty('hard')
+    game.reveal_cell(game.rows // 2, game.cols // 2)
+    phases = [('board_stats', lambda: board_stats(game.cells, game.rows, game.cols))]
+    if np is not None:
+        phases.append(('seeded_stats_1000', lambda: seeded_stats(16, 30, 99, range(1000))))
+
+    return Scenario('minesweeper_3bv', 'expert 3BV / openings, one board and a batch of 1000', game,
+                    phases)
+
+
+def minesweeper_no_guess():
+    """在一个进程里生成不用猜的高级棋盘（后台队列每个任务做的事）"""
+    seeds = iter(range(10 ** 9))
+
+    return Scenario('minesweeper_no_guess', 'expert no-guess board search, one process', None,
+                    [('find_board', lambda: find_board(16, 30, 99, next(seeds)))])
+
+
+def minesweeper_infinite():
+    """无尽扫雷：生成新区块、换出再换回一个揭开过的区块、边走边画"""
+    game = InfiniteMinesweeper(headless=True)
+    game.reset(seed=1)
+    coords = iter(range(10 ** 9))
+    board = InfiniteBoard(1, max_chunks=0)
+    board.open_cells(0, 0)
+
+    def evict_reload():
+        board.trim(0, 0)
+        board.get(0, 0)
+
+    def walk():
+        game.view.pan(game.cell_size, 0)
+        game.advance(None)
+        game.update_board()
+        game.dirty.draw(game.screen, game.draw, scene=(game.game_state, game.difficulty))
+
+    return Scenario('minesweeper_infinite', 'endless board: chunk generation, eviction and a walking view', game,
+                    [('generate_chunk', lambda: generate_chunk(1, next(coords), 0)),
+                     ('evict_reload', evict_reload),
+                     ('walk', walk)])
+
+
+def tetris_half_stack():
+    game = TetrisGame(headless=True)
+    game.reset(seed=1)
+
+    # 下半部分堆满方块，每行留一个空位
+    rng = random.Random(1)
+    for y in range(game.GRID_HEIGHT // 2, game.GRID_HEIGHT):
+        hole = rng.randrange(game.GRID_WIDTH)
+        for x in range(game.GRID_WIDTH):
+            if x != hole:
+                game.grid[y][x] = rng.choice(game.COLORS)
+    grid = [row[:] for row in game.grid]
+    piece = (game.current_shape_idx, game.current_shape, game.current_x, game.current_y)
+
+    def restore():
+        game.grid = [row[:] for row in grid]
+        game.current_shape_idx, game.current_shape, game.current_x, game.current_y = piece
+        game.game_over = False
+
+    return Scenario('tetris_half_stack', '10x20 well, bottom half filled', game,
+                    [('update', lambda: game.step(0)),
+                     ('draw_grid', game.draw_grid),
+                     ('draw', game.draw),
+                     ('draw_dirty', lambda: game.dirty.draw(game.screen, game.draw,
+                                                            scene=(game.game_over, False)))],
+                    restore)
+
+
+def snake_200():
+    game = SnakeGame(headless=True)
+    game.reset(seed=1)
+
+    # 沿哈密顿回路走，长蛇可以一直走下去
+    cycle = hamiltonian_cycle(game.GRID_WIDTH, game.GRID_HEIGHT)
+    length = 200
+    game.set_snake(reversed(cycle[:length]))
+    # 食物放在棋盘外，保证长度不变
+    game.food = (-1, -1)
+    cycle_index = {cell: i for i, cell in enumerate(cycle)}
+
+    def restore():
+        # 让蛇头沿着回路走向下一个格子
+        hx, hy = game.snake[0]
+        nx, ny = cycle[(cycle_index[(hx, hy)] + 1) % len(cycle)]
+        dx = (nx - hx + 1) % game.GRID_WIDTH - 1
+        dy = (ny - hy + 1) % game.GRID_HEIGHT - 1
+        game.direction = game.next_direction = (dx, dy)
+
+    def update():
+        game.update()
+        if game.game_over:
+            raise RuntimeError("snake benchmark collided with itself")
+
+    return Scenario('snake_200', '200-segment snake following a cycle', game,
+                    [('update', update),
+                     ('draw', game.draw)],
+                    restore)
+
+
+def snake_autopilot():
+    """贪吃蛇自动驾驶：30x25 的一整局（填满网格），以及 200x200 网格上的每一步"""
+    game = SnakeGame(headless=True)
+    autopilot = Autopilot(game.GRID_WIDTH, game.GRID_HEIGHT, game.ACTIONS)
+
+    # 大网格上先走一段，让蛇有一定长度（还在抄近路的阶段）
+    big = SnakeGame(headless=True)
+    big.configure('grid:200x200')
+    big.reset(seed=1)
+    big_autopilot = Autopilot(big.GRID_WIDTH, big.GRID_HEIGHT, big.ACTIONS)
+    play(big, big_autopilot, 20000)
+
+    def fill():
+        game.reset(seed=1)
+        play(game, autopilot)
+        if not game.won:
+            raise RuntimeError("snake autopilot collided with itself")
+
+    def step_big():
+        big.advance(big_autopilot.action(big))
+        if big.game_over:
+            raise RuntimeError("snake autopilot collided with itself")
+
+    return Scenario('snake_autopilot', 'Hamiltonian-cycle autopilot: a full 30x25 game and 200x200 decisions',
+                    game,
+                    [('fill_30x25', fill),
+                     ('decide_200x200', lambda: big_autopilot.action(big)),
+                     ('step_200x200', step_big)])
+
+
+def snake_batch():
+    """批量贪吃蛇：4096局随机动作的游戏一起推进一个逻辑帧，需要numpy"""
+    phases = []
+    if np is not None:
+        batch = BatchSnake(4096, seed=1)
+        actions = np.random.default_rng(1).integers(-1, 4, (64, batch.count))
+        ticks = iter(range(10 ** 9))
+        phases.append(('step_4096', lambda: batch.step(actions[next(ticks) % len(actions)])))
+    return Scenario('snake_batch', '4096 Snake games stepped together in numpy arrays', None, phases)
+
+
+def plane_shooter_crowded():
+    game = PlaneShooter(headless=True)
+    game.reset(seed=1)
+
+    # 100架敌机在上半屏，300发子弹在下半屏（这一帧互不命中，碰撞检测全量执行）
+    rng = random.Random(1)
+    game.enemies = [{
+        'x': rng.randint(25, game.SCREEN_WIDTH - 25),
+        'y': rng.randint(20, 200),
+        'width': game.enemy_width,
+        'height': game.enemy_height,
+        'speed': 0,
+        'color': game.enemy_colors[i % 3],
+        'type': i % 3,
+        'wobble': 0.0,
+        'wobble_speed': 0.0,
+    } for i in range(100)]
+    game.bullets = [{
+        'x': rng.randint(0, game.SCREEN_WIDTH),
+        'y': rng.randint(300, 500),
+        'width': game.bullet_width,
+        'height': game.bullet_height,
+        'color': game.bullet_color,
+    } for _ in range(300)]
+    for i in range(20):
+        game.create_explosion(rng.randint(0, game.SCREEN_WIDTH), rng.randint(0, 300),
+                              game.enemy_colors[i % 3])
+    game.update_explosions()
+
+    snapshot = copy.deepcopy((game.enemies, game.bullets, game.explosions, game.stars))
+
+    def restore():
+        game.enemies, game.bullets, game.explosions, game.stars = copy.deepcopy(snapshot)
+        game.lives = 3
+        game.game_over = False
+
+    return Scenario('plane_shooter_crowded', '300 bullets, 100 enemies, 20 explosions', game,
+                    [('update_bullets', game.update_bullets),
+                     ('update_enemies', game.update_enemies),
+                     ('draw_explosions', game.draw_explosions),
+                     ('draw', game.draw)],
+                    restore)
+
+
+def pacman_level():
+    game = PacManGame(headless=True)
+    game.reset(seed=1)
+    snapshot = copy.deepcopy((game.game_map, game.player_pos, game.ghosts))
+
+    def restore():
+        game.game_map, game.player_pos, game.ghosts = copy.deepcopy(snapshot)
+        game.game_over = False
+
+    return Scenario('pacman_level', 'full level, two ghosts', game,
+                    [('update', lambda: game.step(3)),
+                     ('draw', game.draw)],
+                    restore)
+
+
+def tic_tac_toe_midgame():
+    game = TicTacToe(headless=True)
+    game.reset(seed=1)
+    for cell in (4, 0, 8, 2):
+        game.step(cell)
+    return Scenario('tic_tac_toe_midgame', 'four moves played', game,
+                    [('draw', game.draw),
+                     ('draw_dirty', lambda: game.dirty.draw(game.screen, game.draw))])
+
+
+def replay_scenario(path):
+    """回放一个录制文件：每次计时都从头完整回放一遍（创建游戏不计时）"""
+    log = InputLog.load(path)
+    state = {}
+
+    def restore():
+        game = log.create_game()
+        state['cursor'] = ReplayCursor(log, game)
+
+    def replay():
+        cursor = state['cursor']
+        while not cursor.finished:
+            cursor.step()
+
+    def replay_render():
+        cursor = state['cursor']
+        while not cursor.finished:
+            cursor.step()
+            cursor.game.draw()
+
+    name = 'replay_' + os.path.splitext(os.path.basename(path))[0]
+    return Scenario(name, f"{log.game}, {log.end_tick} ticks from {path}", None,
+                    [('replay', replay),
+                     ('replay_render', replay_render)],
+                    restore)
+
+
+SCENARIOS = {
+    'minesweeper_expert_half': minesweeper_expert_half,
+    'minesweeper_generate_1m': minesweeper_generate_1m,
+    'minesweeper_cascade': minesweeper_cascade,
+    'minesweeper_huge_view': minesweeper_huge_view,
+    'minesweeper_solver': minesweeper_solver,
+    'minesweeper_no_guess': minesweeper_no_guess,
+    'minesweeper_3bv': minesweeper_3bv,
+    'minesweeper_save_1m': minesweeper_save_1m,
+    'minesweeper_infinite': minesweeper_infinite,
+    'tetris_half_stack': tetris_half_stack,
+    'snake_200': snake_200,
+    'snake_autopilot': snake_autopilot,
+    'snake_batch': snake_batch,
+    'plane_shooter_crowded': plane_shooter_crowded,
+    'pacman_level': pacman_level,
+    'tic_tac_toe_midgame': tic_tac_toe_midgame,
+}
+
+
+def time_phase(func, restore, iterations):
+    """返回执行一次func的平均纳秒数"""
+    total = 0
+    perf_counter_ns = time.perf_counter_ns
+    for _ in range(iterations):
+        if restore is not None:
+            restore()
+        start = perf_counter_ns()
+        func()
+        total += perf_counter_ns() - start
+    return total / iterations
+
+
+def run_scenario(scenario, rounds, min_time):
+    """每个阶段先确定迭代次数，再跑若干轮取中位数"""
+    results = {}
+    for phase_name, func in scenario.phases:
+        # 预热，同时估算单次耗时
+        estimate = time_phase(func, scenario.restore, 3)
+        iterations = max(1, int(min_time * 1e9 / max(estimate, 1)))
+        samples = [time_phase(func, scenario.restore, iterations) for _ in range(rounds)]
+        results[phase_name] = statistics.median(samples)
+    return results
+
+
+def format_report(name, description, results):
+    lines = [f"{name}  ({description})"]
+    for phase_name, ns in results.items():
+        lines.append(f"  {phase_name:<18}{ns:>14,.0f} ns/op{1e9 / ns:>12,.1f} ops/s")
+    # 一帧 = 所有阶段各执行一次（'draw'已包含其子阶段时只计draw）
+    frame_ns = sum(ns for phase, ns in results.items()
+                   if phase in ('update', 'update_bullets', 'update_enemies', 'draw'))
+    if frame_ns:
+        lines.append(f"  {'frame':<18}{frame_ns:>14,.0f} ns   {1e9 / frame_ns:>12,.1f} frames/s")
+    return '\n'.join(lines)
+
+
+def compare(results, baseline, threshold):
+    """返回超过阈值的退化列表"""
+    regressions = []
+    for name, phases in results.items():
+        for phase_name, ns in phases.items():
+            base = baseline.get(name, {}).get(phase_name)
+            if base and ns > base * (1 + threshold):
+                regressions.append((name, phase_name, base, ns))
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Game update/draw benchmarks")
+    parser.add_argument('-s', '--scenario', action='append', choices=sorted(SCENARIOS),
+                        help="scenario to run (repeatable, default: all)")
+    parser.add_argument('--rounds', type=int, default=5, help="rounds per phase")
+    parser.add_argument('--min-time', type=float, default=0.2,
+                        help="seconds of work per round")
+    parser.add_argument('--replay', metavar='FILE', action='append', default=[],
+                        help="add a recorded input log as a scenario (repeatable)")
+    parser.add_argument('--save', metavar='FILE', help="save results as a JSON baseline")
+    parser.add_argument('--compare', metavar='FILE', help="compare against a JSON baseline")
+    parser.add_argument('--threshold', type=float, default=0.15,
+                        help="allowed slowdown before failing (0.15 = 15%%)")
+    args = parser.parse_args(argv)
+
+    pygame.init()
+    # 只给了 --replay 时不运行内置场景
+    if args.scenario or not args.replay:
+        scenarios = [SCENARIOS[name]() for name in args.scenario or SCENARIOS]
+    else:
+        scenarios = []
+    scenarios += [replay_scenario(path) for path in args.replay]
+
+    results = {}
+    for scenario in scenarios:
+        results[scenario.name] = run_scenario(scenario, args.rounds, args.min_time)
+        print(format_report(scenario.name, scenario.description, results[scenario.name]))
+
+    if args.save:
+        with open(args.save, 'w', encoding='utf-8') as f:
+            json.dump({'version': 1, 'results': results}, f, indent=2)
+        print(f"Baseline saved to {args.save}")
+
+    if args.compare:
+        with open(args.compare, 'r', encoding='utf-8') as f:
+            baseline = json.load(f)['results']
+        regressions = compare(results, baseline, args.threshold)
+        for name, phase_name, base, ns in regressions:
+            print(f"REGRESSION {name}.{phase_name}: {base:,.0f} -> {ns:,.0f} ns/op "
+                  f"(+{(ns / base - 1) * 100:.1f}%)")
+        if regressions:
+            return 1
+        print(f"No regressions over {args.threshold * 100:.0f}% against {args.compare}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
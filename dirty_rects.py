@@ -0,0 +1,159 @@
+"""脏矩形刷新：只重绘、只提交画面上变化了的区域
+
+游戏把画面划分成若干区域（region），每个区域提供：
+- rect: 在屏幕上占的矩形
+- key:  返回该区域当前状态的函数（可比较的值，比如格子的状态）
+- draw: 重绘该区域的函数，必须完整覆盖rect（包括背景）；
+        只重绘了区域的一部分时可以返回实际重绘的矩形列表，只提交这些矩形
+
+每帧只有key变化了的区域会被重绘，然后用 pygame.display.update(rects)
+只提交这些矩形，而不是每帧 screen.fill() + display.flip() 整屏刷新。
+scene（例如游戏是否结束）变化时整屏重绘一次，用来处理跨越多个区域的
+遮罩、提示框等。
+
+    with profiler.phase('draw'):
+        rects = self.dirty.draw(self.screen, self.draw, scene=self.game_over)
+    with profiler.phase('flip'):
+        self.dirty.update(rects)
+
+环境变量 GAMEBOX_DIRTY_RECTS=0 可以关闭（回到整屏刷新），
+按 F8 或设置 GAMEBOX_DIRTY_DEBUG=1 会用紫色框标出被重绘的区域，
+并在窗口标题上显示每帧平均提交的像素比例。
+"""
+import os
+
+import pygame
+
+
+class _Region:
+    __slots__ = ('rect', 'key', 'draw', 'overlay', 'last_key', 'highlight')
+
+    def __init__(self, rect, key, draw, overlay):
+        self.rect = rect
+        self.key = key
+        self.draw = draw
+        self.overlay = overlay
+        self.last_key = None
+        # 调试框还要显示的帧数，归零时重绘一次把框擦掉
+        self.highlight = 0
+
+
+class DirtyRegions:
+    DEBUG_KEY = pygame.K_F8
+    DEBUG_COLOR = (255, 0, 255)
+    DEBUG_FRAMES = 15
+    # 调试模式下每隔多少帧刷新一次标题上的统计
+    STATS_FRAMES = 30
+
+    def __init__(self, enabled=None, debug=None):
+        if enabled is None:
+            enabled = os.environ.get('GAMEBOX_DIRTY_RECTS', '1') not in ('', '0')
+        if debug is None:
+            debug = os.environ.get('GAMEBOX_DIRTY_DEBUG', '') not in ('', '0')
+        self.enabled = enabled
+        self.debug = debug
+        self.regions = []
+        self.full_redraw = True
+        self.scene = None
+
+        # 调试统计：提交的像素数 / 整屏像素数
+        self.caption = None
+        self.stats_frames = 0
+        self.stats_pixels = 0
+        self.stats_total = 0
+
+    def add(self, rect, key, draw, overlay=False):
+        """注册一个区域；overlay=True 的区域压在前面的区域上，下层重绘时它也会重绘"""
+        self.regions.append(_Region(pygame.Rect(rect), key, draw, overlay))
+
+    def clear(self):
+        """移除所有区域（布局变化时调用），下一帧整屏重绘"""
+        self.regions.clear()
+        self.invalidate()
+
+    def invalidate(self):
+        """下一帧整屏重绘"""
+        self.full_redraw = True
+
+    def draw(self, screen, draw_full, scene=None):
+        """重绘变化的区域并返回它们的矩形；返回None表示整屏都已重绘"""
+        if not self.enabled:
+            draw_full()
+            return None
+
+        if scene != self.scene:
+            self.scene = scene
+            self.full_redraw = True
+
+        if self.full_redraw:
+            self.full_redraw = False
+            draw_full()
+            for region in self.regions:
+                region.last_key = region.key()
+                region.highlight = 0
+            self._record(screen, screen.get_width() * screen.get_height())
+            return None
+
+        rects = []
+        outlined = []
+        for region in self.regions:
+            key = region.key()
+            if key != region.last_key or (region.overlay and region.rect.collidelist(rects) != -1):
+                region.last_key = key
+                drawn = region.draw()
+                drawn = [region.rect] if drawn is None else drawn
+                rects.extend(drawn)
+                if self.debug:
+                    region.highlight = self.DEBUG_FRAMES
+                    outlined.extend(drawn)
+            elif region.highlight:
+                region.highlight -= 1
+                if not region.highlight:
+                    drawn = region.draw()
+                    rects.extend([region.rect] if drawn is None else drawn)
+
+        for rect in outlined:
+            pygame.draw.rect(screen, self.DEBUG_COLOR, rect, 2)
+
+        self._record(screen, sum(rect.width * rect.height for rect in rects))
+        return rects
+
+    def update(self, rects):
+        """把draw()的结果提交到窗口"""
+        if rects is None:
+            pygame.display.flip()
+        else:
+            # 没有变化时也提交（空列表不刷新任何像素）：game_host 把提交画面当作心跳，
+            # 空闲的游戏不能被当成卡死
+            pygame.display.update(rects)
+
+    def _record(self, screen, pixels):
+        if not self.debug:
+            return
+        if self.caption is None:
+            self.caption = pygame.display.get_caption()[0]
+        self.stats_frames += 1
+        self.stats_pixels += pixels
+        self.stats_total += screen.get_width() * screen.get_height()
+        if self.stats_frames >= self.STATS_FRAMES:
+            percent = self.stats_pixels * 100 / self.stats_total
+            pygame.display.set_caption(f"{self.caption} | dirty {percent:.1f}% px/frame")
+            self.stats_frames = self.stats_pixels = self.stats_total = 0
+
+    def set_debug(self, debug):
+        if debug == self.debug:
+            return
+        self.debug = debug
+        if not debug and self.caption is not None:
+            pygame.display.set_caption(self.caption)
+            self.caption = None
+        self.stats_frames = self.stats_pixels = self.stats_total = 0
+        # 擦掉残留的调试框
+        self.invalidate()
+
+    def handle_event(self, event):
+        """处理调试热键，返回True表示事件已被处理"""
+        if event.type == pygame.KEYDOWN and event.key == self.DEBUG_KEY:
+            self.set_debug(not self.debug)
+            return True
+        return False
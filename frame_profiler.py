@@ -0,0 +1,184 @@
+"""按帧阶段计时的性能剖析器
+
+每个游戏的主循环都由相同的阶段组成：事件处理、更新、绘制、
+display.flip() 和 clock.tick()。剖析器为每个阶段以及指定的子调用
+（例如 draw_explosions、draw_cell）计时，结果保存在环形缓冲区里，
+可以导出为 Chrome trace / Perfetto 可以打开的JSON，事后查看某一个卡顿帧。
+
+默认关闭，关闭时每个阶段只多一次方法调用。开启方式：
+- 环境变量 GAMEBOX_PROFILE=1（启动时开启）
+- 游戏中按 F9 开/关，关闭时自动导出；按 F10 立即导出
+
+导出文件写到 GAMEBOX_PROFILE_DIR（默认当前目录），
+缓冲区大小由 GAMEBOX_PROFILE_EVENTS 指定（默认100000个事件）。
+"""
+import collections
+import functools
+import json
+import os
+import time
+
+import pygame
+
+
+class _NullPhase:
+    """剖析器关闭时使用的空上下文"""
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+_NULL_PHASE = _NullPhase()
+
+
+class _Phase:
+    __slots__ = ('events', 'name', 'start')
+
+    def __init__(self, events, name):
+        self.events = events
+        self.name = name
+        self.start = 0
+
+    def __enter__(self):
+        self.start = time.perf_counter_ns()
+        return self
+
+    def __exit__(self, *exc):
+        self.events.append((self.name, self.start, time.perf_counter_ns() - self.start))
+        return False
+
+
+class FrameProfiler:
+    TOGGLE_KEY = pygame.K_F9
+    DUMP_KEY = pygame.K_F10
+
+    def __init__(self, name, enabled=None, capacity=None, output_dir=None):
+        self.name = name
+        if enabled is None:
+            enabled = os.environ.get('GAMEBOX_PROFILE', '') not in ('', '0')
+        if capacity is None:
+            capacity = int(os.environ.get('GAMEBOX_PROFILE_EVENTS', 100000))
+        self.output_dir = output_dir or os.environ.get('GAMEBOX_PROFILE_DIR', '.')
+
+        # 环形缓冲区：(名字, 开始纳秒, 持续纳秒)
+        self.events = collections.deque(maxlen=capacity)
+        self.origin = time.perf_counter_ns()
+        self.frame_start = None
+        self.frame_count = 0
+        self.phases = {}
+        self.instrumented = []
+        self.enabled = False
+        if enabled:
+            self.enable()
+
+    def phase(self, name):
+        """为一个阶段计时：with profiler.phase('draw'): ..."""
+        if not self.enabled:
+            return _NULL_PHASE
+        phase = self.phases.get(name)
+        if phase is None:
+            phase = self.phases[name] = _Phase(self.events, name)
+        return phase
+
+    def begin_frame(self):
+        """在每帧开始时调用，记录上一帧的完整时长"""
+        if not self.enabled:
+            return
+        now = time.perf_counter_ns()
+        if self.frame_start is not None:
+            self.events.append(('frame', self.frame_start, now - self.frame_start))
+        self.frame_start = now
+        self.frame_count += 1
+
+    def instrument(self, obj, *method_names):
+        """为对象上的子调用计时；只在开启时替换方法，关闭时没有额外开销"""
+        self.instrumented.append((obj, method_names))
+        if self.enabled:
+            self._wrap(obj, method_names)
+
+    def _wrap(self, obj, method_names):
+        events = self.events
+        for name in method_names:
+            method = getattr(obj, name)
+
+            def wrapper(*args, _method=method, _name=name, **kwargs):
+                start = time.perf_counter_ns()
+                try:
+                    return _method(*args, **kwargs)
+                finally:
+                    events.append((_name, start, time.perf_counter_ns() - start))
+
+            functools.update_wrapper(wrapper, method)
+            setattr(obj, name, wrapper)
+
+    def enable(self):
+        if self.enabled:
+            return
+        self.enabled = True
+        self.frame_start = None
+        for obj, method_names in self.instrumented:
+            self._wrap(obj, method_names)
+
+    def disable(self):
+        if not self.enabled:
+            return
+        self.enabled = False
+        for obj, method_names in self.instrumented:
+            for name in method_names:
+                obj.__dict__.pop(name, None)
+
+    def handle_event(self, event):
+        """处理剖析器的热键，返回True表示事件已被处理"""
+        if event.type != pygame.KEYDOWN:
+            return False
+        if event.key == self.TOGGLE_KEY:
+            if self.enabled:
+                self.disable()
+                self.dump()
+            else:
+                self.enable()
+            return True
+        if event.key == self.DUMP_KEY:
+            self.dump()
+            return True
+        return False
+
+    def to_chrome_trace(self):
+        """转换为Chrome trace事件格式（时间单位为微秒）"""
+        pid = os.getpid()
+        trace_events = [{
+            'name': 'process_name', 'ph': 'M', 'pid': pid, 'tid': 0,
+            'args': {'name': self.name},
+        }]
+        for name, start, duration in self.events:
+            trace_events.append({
+                'name': name,
+                'cat': 'frame' if name == 'frame' else 'phase',
+                'ph': 'X',
+                'ts': (start - self.origin) / 1000,
+                'dur': duration / 1000,
+                'pid': pid,
+                'tid': 0,
+            })
+        return {'traceEvents': trace_events, 'displayTimeUnit': 'ms'}
+
+    def dump(self, path=None):
+        """把缓冲区写成trace文件，返回文件路径"""
+        if not self.events:
+            return None
+        if path is None:
+            stamp = time.strftime('%Y%m%d-%H%M%S')
+            path = os.path.join(self.output_dir, f"{self.name}-trace-{stamp}.json")
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(self.to_chrome_trace(), f)
+        print(f"Frame trace written to {path} ({len(self.events)} events)")
+        return path
+
+    def close(self):
+        """游戏结束时调用：开启状态下导出剩余数据"""
+        if self.enabled:
+            self.disable()
+            self.dump()
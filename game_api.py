@@ -0,0 +1,154 @@
+"""所有游戏共用的无界面(headless)模拟接口
+
+游戏以 headless=True 构造时不会创建窗口，画面绘制到一个普通Surface上。
+之后可以用统一的接口以远超实时的速度推进游戏：
+
+    game = SnakeGame(headless=True)
+    obs = game.reset(seed=1)
+    obs, reward, done = game.step(action)
+    surface = game.render()  # 可选
+
+配合 SDL_VIDEODRIVER=dummy 可以在没有显示器的服务器上运行机器人、
+浸泡测试和性能测试。每个游戏在自己的类里说明动作(action)的格式。
+
+每个游戏有自己的随机数流 self.rng（不使用全局random），同样的种子和
+同样的动作序列总是得到同样的结果，输入录制与回放见 replay.py。
+"""
+import os
+import random
+import time
+
+import pygame
+
+from replay import Recorder
+
+
+class HeadlessGame:
+    """reset()/step()/render() 接口的公共实现
+
+    子类需要实现 reset_game()、apply_action()、observe()，按需覆盖
+    update_tick()、reward_signal()、is_done() 和 apply_config()。
+    """
+
+    headless = False
+    # 通过step()/advance()已经推进的逻辑帧数
+    sim_ticks = 0
+    # 为True时游戏逻辑的时钟按sim_ticks换算（固定步长循环中使用），
+    # 这样计时器和逻辑帧一起变快变慢，与真实时间无关
+    sim_clock = False
+    # 游戏逻辑使用的随机数流和它的种子
+    rng = None
+    seed_value = None
+    # 正在录制输入时的Recorder
+    recorder = None
+
+    def seed_rng(self, seed=None):
+        """创建这个游戏自己的随机数流；seed为None时随机选一个，记录在seed_value里"""
+        if seed is None:
+            seed = random.randrange(2 ** 32)
+        self.seed_value = seed
+        self.rng = random.Random(seed)
+        return seed
+
+    def setup_screen(self, size, caption=None, headless=None):
+        """创建游戏画面：正常模式下是窗口，headless模式下是内存中的Surface"""
+        if headless is not None:
+            self.headless = headless
+        if self.headless:
+            return pygame.Surface(size)
+        screen = pygame.display.set_mode(size)
+        if caption:
+            pygame.display.set_caption(caption)
+        return screen
+
+    def get_ticks(self):
+        """游戏逻辑使用的毫秒时钟；headless模式或sim_clock时按逻辑帧数换算"""
+        if self.headless or self.sim_clock:
+            return self.sim_ticks * 1000 // self.FPS
+        return pygame.time.get_ticks()
+
+    def get_mouse_pos(self):
+        """鼠标位置；headless模式下没有鼠标"""
+        if self.headless:
+            return (-1, -1)
+        return pygame.mouse.get_pos()
+
+    def reset(self, seed=None):
+        """重置游戏，返回初始观测"""
+        if seed is not None:
+            self.seed_rng(seed)
+        self.sim_ticks = 0
+        self.reset_game()
+        return self.observe()
+
+    def step(self, action=None):
+        """应用一个动作并推进一个逻辑帧，返回 (观测, 奖励, 是否结束)"""
+        before = self.reward_signal()
+        self.advance(action)
+        return self.observe(), self.reward_signal() - before, self.is_done()
+
+    def advance(self, action=None):
+        """应用一个动作并推进一个逻辑帧，不计算观测和奖励（实时循环和回放使用）"""
+        if self.recorder is not None:
+            self.recorder.action(self.sim_ticks, action)
+        self.apply_action(action)
+        self.update_tick()
+        self.sim_ticks += 1
+
+    def restart(self):
+        """玩家在游戏中重新开始（会被录制，回放时在同一逻辑帧重置）"""
+        if self.recorder is not None:
+            self.recorder.reset(self.sim_ticks)
+        self.reset_game()
+
+    def configure(self, option):
+        """玩家在游戏中修改设置，例如扫雷的难度（会被录制，无效的设置不会）"""
+        self.apply_config(option)
+        if self.recorder is not None:
+            self.recorder.config(self.sim_ticks, option)
+
+    def apply_config(self, option):
+        raise ValueError(f"{type(self).__name__} has no options")
+
+    def current_config(self):
+        """录制开始时的设置（configure()的选项），None表示使用默认设置"""
+        return None
+
+    def start_recording(self, path=None):
+        """开始录制输入；不指定path时只在设置了GAMEBOX_RECORD_DIR时录制"""
+        if path is None:
+            directory = os.environ.get('GAMEBOX_RECORD_DIR')
+            if not directory:
+                return None
+            os.makedirs(directory, exist_ok=True)
+            stamp = time.strftime('%Y%m%d-%H%M%S')
+            path = os.path.join(directory, f"{type(self).__name__}-{stamp}.gbr")
+        self.recorder = Recorder(path, self)
+        # 录制前修改过设置（例如命令行指定的自定义棋盘）时，回放要先恢复
+        option = self.current_config()
+        if option is not None:
+            self.recorder.config(self.sim_ticks, option)
+        return path
+
+    def stop_recording(self):
+        """写入结束记录并关闭录制文件"""
+        if self.recorder is None:
+            return
+        self.recorder.close(self)
+        print(f"Input log written to {self.recorder.path} ({self.sim_ticks} ticks)")
+        self.recorder = None
+
+    def render(self):
+        """把当前状态绘制到画面上并返回该Surface"""
+        self.draw()
+        return self.screen
+
+    def update_tick(self):
+        """推进一个逻辑帧（回合制游戏不需要）"""
+
+    def reward_signal(self):
+        """奖励按该值在一步中的变化计算，默认是分数"""
+        return self.score
+
+    def is_done(self):
+        return self.game_over
@@ -0,0 +1,197 @@
+"""预热的游戏宿主进程池
+
+启动器不再在tkinter进程里导入并运行游戏，而是把启动请求通过管道发给
+事先启动好的工作进程。工作进程里pygame已经导入并初始化完毕，游戏崩溃
+或卡死都只影响该工作进程，启动器会自动替换掉它。
+"""
+import importlib
+import multiprocessing as mp
+import os
+import time
+import traceback
+
+
+def _worker_main(conn, last_frame):
+    """工作进程入口：预热pygame，然后循环等待启动请求"""
+    import pygame
+
+    pygame.init()
+    # 预热系统字体列表，避免第一次SysFont时扫描字体目录
+    pygame.font.get_fonts()
+
+    # 游戏退出时会调用pygame.quit()，这里只关闭窗口，保留已初始化的子系统
+    pygame.quit = pygame.display.quit
+
+    state = {'pending': False}
+
+    def frame_hook(present):
+        def wrapper(*args, **kwargs):
+            result = present(*args, **kwargs)
+            now = time.monotonic()
+            last_frame.value = now
+            if state['pending']:
+                state['pending'] = False
+                conn.send(('first_frame', now))
+            return result
+        return wrapper
+
+    # 通过包装flip/update记录第一帧时间和心跳
+    pygame.display.flip = frame_hook(pygame.display.flip)
+    pygame.display.update = frame_hook(pygame.display.update)
+
+    conn.send(('ready', os.getpid()))
+
+    while True:
+        try:
+            request = conn.recv()
+        except (EOFError, KeyboardInterrupt):
+            break
+        if request is None:
+            break
+
+        module_name, class_name = request
+        state['pending'] = True
+        last_frame.value = time.monotonic()
+        try:
+            module = importlib.import_module(module_name)
+            game_class = getattr(module, class_name)
+            game_class().run()
+        except SystemExit:
+            # 部分游戏在关闭窗口时调用sys.exit()
+            pass
+        except Exception as e:
+            conn.send(('error', f"{type(e).__name__}: {e}", traceback.format_exc()))
+        finally:
+            state['pending'] = False
+            pygame.display.quit()
+            last_frame.value = 0.0
+
+        conn.send(('done', None))
+
+
+class GameLaunch:
+    """一次游戏启动的状态"""
+
+    def __init__(self, module_name, class_name, clicked_at):
+        self.module_name = module_name
+        self.class_name = class_name
+        self.clicked_at = clicked_at
+        self.first_frame_latency = None  # 点击到第一帧的延迟（秒）
+        self.status = 'starting'  # starting / running / done / error / crashed / hung
+        self.error = None
+
+    @property
+    def finished(self):
+        return self.status in ('done', 'error', 'crashed', 'hung')
+
+
+class _Worker:
+    def __init__(self, ctx):
+        self.conn, child_conn = ctx.Pipe()
+        self.last_frame = ctx.Value('d', 0.0, lock=False)
+        self.process = ctx.Process(target=_worker_main,
+                                   args=(child_conn, self.last_frame),
+                                   daemon=True)
+        self.process.start()
+        child_conn.close()
+        self.launch = None
+
+    @property
+    def idle(self):
+        return self.launch is None and self.process.is_alive()
+
+    def stop(self, timeout=1.0):
+        if self.process.is_alive():
+            try:
+                self.conn.send(None)
+            except (BrokenPipeError, OSError):
+                pass
+            self.process.join(timeout)
+        if self.process.is_alive():
+            self.process.terminate()
+            self.process.join(timeout)
+        self.conn.close()
+
+
+class GameHostPool:
+    """预热的游戏工作进程池"""
+
+    def __init__(self, size=2, hang_timeout=10.0):
+        self.size = size
+        self.hang_timeout = hang_timeout  # 超过该时间没有新帧视为卡死
+        self.ctx = mp.get_context()
+        self.workers = []
+
+    def start(self):
+        """启动工作进程（应在创建tkinter窗口之前调用）"""
+        while len(self.workers) < self.size:
+            self.workers.append(_Worker(self.ctx))
+
+    def launch(self, module_name, class_name, clicked_at=None):
+        """把启动请求交给一个空闲的工作进程"""
+        if clicked_at is None:
+            clicked_at = time.monotonic()
+
+        self._replace_dead_workers()
+        worker = next((w for w in self.workers if w.idle), None)
+        if worker is None:
+            worker = _Worker(self.ctx)
+            self.workers.append(worker)
+
+        launch = GameLaunch(module_name, class_name, clicked_at)
+        worker.launch = launch
+        worker.conn.send((module_name, class_name))
+        return launch
+
+    def poll(self):
+        """处理工作进程发回的消息，更新各个启动的状态"""
+        for worker in self.workers:
+            launch = worker.launch
+            try:
+                while worker.conn.poll():
+                    message = worker.conn.recv()
+                    if launch is not None:
+                        self._handle_message(worker, launch, message)
+                        launch = worker.launch
+            except (EOFError, OSError):
+                pass
+
+            if launch is None:
+                continue
+
+            if not worker.process.is_alive():
+                launch.status = 'crashed'
+                launch.error = f"Game process exited with code {worker.process.exitcode}"
+                worker.launch = None
+            elif (worker.last_frame.value and
+                  time.monotonic() - worker.last_frame.value > self.hang_timeout):
+                launch.status = 'hung'
+                launch.error = f"Game stopped responding for {self.hang_timeout:.0f}s"
+                worker.launch = None
+                worker.process.terminate()
+
+        self._replace_dead_workers()
+
+    def _handle_message(self, worker, launch, message):
+        kind = message[0]
+        if kind == 'first_frame':
+            launch.first_frame_latency = message[1] - launch.clicked_at
+            launch.status = 'running'
+        elif kind == 'error':
+            launch.error = message[1]
+            print(message[2])
+        elif kind == 'done':
+            launch.status = 'error' if launch.error else 'done'
+            worker.launch = None
+
+    def _replace_dead_workers(self):
+        for i, worker in enumerate(self.workers):
+            if worker.launch is None and not worker.process.is_alive():
+                worker.stop()
+                self.workers[i] = _Worker(self.ctx)
+
+    def shutdown(self):
+        """关闭所有工作进程"""
+        for worker in self.workers:
+            worker.stop()
+        self.workers = []
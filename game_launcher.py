@@ -3,11 +3,21 @@ from tkinter import ttk, messagebox
 import subprocess
 import sys
 import os
+import time
+
+from game_host import GameHostPool
+from game_manifest import discover_games
 
 
 class GameLauncher:
-    def __init__(self, root):
+    # 轮询游戏宿主进程的间隔（毫秒）
+    POLL_INTERVAL = 15
+
+    def __init__(self, root, host_pool=None):
         self.root = root
+        # 预热的游戏宿主进程池；为None时退回到在本进程内运行游戏
+        self.host_pool = host_pool
+        self.active_launch = None
         self.root.title("My Game Box 🎮")
         self.root.geometry("500x400")
 
@@ -15,15 +25,8 @@ class GameLauncher:
         self.setup_style()
 
         # 游戏列表数据： (显示名, 对应的游戏模块类名)
-        self.games = [
-            ("🐍 Snake Game", "snake_game.SnakeGame"),
-            ("⭕ Tic-Tac-Toe", "tic_tac_toe.TicTacToe"),
-            #("👻 Pac-Man", "pacman_game.PacManGame"),有bug
-            ("🔷 Tetris", "tetris_game.TetrisGame"),
-            ("✈️ Air Battle", "plane_shooter_simple.PlaneShooter"),
-            ("💣 Minesweeper", "minesweeper_game.Minesweeper"),
-            # 未来可以在这里添加更多游戏：
-        ]
+        # 通过静态扫描目录得到，新游戏文件放进目录即可自动出现在列表中
+        self.games = discover_games()
 
         self.create_widgets()
 
@@ -138,12 +141,23 @@ class GameLauncher:
             messagebox.showwarning("No Selection", "Please select a game first!")
             return
 
+        if self.active_launch is not None:
+            return
+
+        clicked_at = time.monotonic()
         game_index = selection[0]
         game_module_class = self.games[game_index][1]
 
         # 隐藏启动器窗口
         self.root.withdraw()
 
+        if self.host_pool is not None:
+            # 交给预热的宿主进程运行，tkinter主循环保持响应
+            module_name, class_name = game_module_class.split('.')
+            self.active_launch = self.host_pool.launch(module_name, class_name, clicked_at)
+            self.root.after(self.POLL_INTERVAL, self.poll_game)
+            return
+
         try:
             # 动态导入游戏模块并运行
             module_name, class_name = game_module_class.split('.')
@@ -161,11 +175,42 @@ class GameLauncher:
         # 游戏结束后，重新显示启动器
         self.root.deiconify()
 
+    def poll_game(self):
+        """轮询宿主进程中正在运行的游戏"""
+        launch = self.active_launch
+        reported = launch.first_frame_latency is not None
+        self.host_pool.poll()
+
+        if not reported and launch.first_frame_latency is not None:
+            print(f"{launch.module_name}.{launch.class_name}: "
+                  f"click-to-first-frame {launch.first_frame_latency * 1000:.1f} ms")
+
+        if not launch.finished:
+            self.root.after(self.POLL_INTERVAL, self.poll_game)
+            return
+
+        self.active_launch = None
+        if launch.error:
+            messagebox.showerror("Error", f"Failed to launch game:\n{launch.error}")
+
+        # 游戏结束后，重新显示启动器
+        self.root.deiconify()
+
 
 def main():
+    host_pool = None
+    if '--in-process' not in sys.argv:
+        # 在创建tkinter窗口之前启动工作进程
+        host_pool = GameHostPool()
+        host_pool.start()
+
     root = tk.Tk()
-    app = GameLauncher(root)
-    root.mainloop()
+    app = GameLauncher(root, host_pool)
+    try:
+        root.mainloop()
+    finally:
+        if host_pool is not None:
+            host_pool.shutdown()
 
 
 if __name__ == "__main__":
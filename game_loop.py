@@ -0,0 +1,66 @@
+"""固定步长的游戏循环调度
+
+游戏逻辑按固定频率（tick_rate，逻辑帧/秒）推进，画面按显示频率绘制，
+两者互不影响：机器慢时一帧里多推进几步追上真实时间，机器快时一帧里
+可能一步都不推进，所以游戏速度在任何机器上都一样。
+
+    timestep = FixedTimestep(self.FPS)
+    dt = 0.0
+    while running:
+        ...处理事件...
+        for _ in range(timestep.advance(dt)):
+            self.step(action)
+        self.draw(timestep.alpha)
+        pygame.display.flip()
+        dt = self.clock.tick(DISPLAY_FPS) / 1000
+
+一帧里最多追赶 max_steps 步，卡顿太久（比如拖动窗口）时丢弃多出的时间，
+避免为了追赶而越来越慢。逻辑频率低于显示频率的游戏（贪吃蛇、吃豆人）
+用 alpha 在上一步和当前步的位置之间插值，画面依然按显示频率平滑移动。
+"""
+DISPLAY_FPS = 60
+MAX_CATCH_UP_STEPS = 5
+
+
+class FixedTimestep:
+    def __init__(self, tick_rate, max_steps=MAX_CATCH_UP_STEPS):
+        # tick_rate 可以在运行中修改（例如贪吃蛇加速）
+        self.tick_rate = tick_rate
+        self.max_steps = max_steps
+        # 还没有被逻辑帧消耗的真实时间（秒）
+        self.accumulator = 0.0
+        # 因为超过追赶上限而丢弃的逻辑帧数
+        self.dropped_steps = 0
+
+    def advance(self, dt):
+        """累加经过的真实时间（秒），返回这一帧需要执行的逻辑步数"""
+        step = 1.0 / self.tick_rate
+        self.accumulator += dt
+        steps = int(self.accumulator // step)
+        if steps > self.max_steps:
+            self.dropped_steps += steps - self.max_steps
+            steps = self.max_steps
+            self.accumulator %= step
+        else:
+            self.accumulator -= steps * step
+        return steps
+
+    @property
+    def alpha(self):
+        """当前时刻在上一逻辑帧和下一逻辑帧之间的位置，范围 [0, 1]"""
+        return min(max(self.accumulator * self.tick_rate, 0.0), 1.0)
+
+    def reset(self):
+        """清空累积的时间（例如暂停恢复后）"""
+        self.accumulator = 0.0
+
+
+def lerp_position(previous, current, alpha, max_jump=1):
+    """在上一逻辑帧和当前逻辑帧的格子坐标之间插值
+
+    任一坐标跳跃超过 max_jump（穿过边界、传送）时不插值，直接返回当前位置。
+    """
+    (px, py), (cx, cy) = previous, current
+    if abs(cx - px) > max_jump or abs(cy - py) > max_jump:
+        return current
+    return (px + (cx - px) * alpha, py + (cy - py) * alpha)
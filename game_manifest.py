@@ -0,0 +1,144 @@
+"""游戏发现与清单缓存
+
+通过AST静态分析（不导入模块）扫描目录下的游戏文件：带有run()方法、并在
+``if __name__ == "__main__":`` 中被实例化的类就是一个游戏。扫描结果连同
+文件的mtime/大小/哈希一起写入磁盘上的清单缓存，之后只有改动过的文件才会
+重新解析，所以即使有上百个游戏文件启动也不会变慢。
+
+游戏类可以定义以下类属性（必须是常量）：
+- TITLE: 启动器里显示的名字，默认用类名
+- HIDDEN: 为True时不在启动器中显示
+- ORDER: 启动器里的排序（数字小的在前），没有的排在所有有ORDER的游戏后面，
+  相同时按文件名
+"""
+import ast
+import hashlib
+import json
+import os
+
+MANIFEST_NAME = '.gamebox_manifest.json'
+MANIFEST_VERSION = 2
+
+
+def _file_hash(path):
+    with open(path, 'rb') as f:
+        return hashlib.sha1(f.read()).hexdigest()
+
+
+def _is_main_guard(node):
+    """判断是否为 if __name__ == "__main__": 语句"""
+    test = node.test
+    return (isinstance(test, ast.Compare) and
+            isinstance(test.left, ast.Name) and test.left.id == '__name__' and
+            len(test.comparators) == 1 and
+            isinstance(test.comparators[0], ast.Constant) and
+            test.comparators[0].value == '__main__')
+
+
+def _class_constant(class_node, name):
+    for stmt in class_node.body:
+        if (isinstance(stmt, ast.Assign) and len(stmt.targets) == 1 and
+                isinstance(stmt.targets[0], ast.Name) and stmt.targets[0].id == name and
+                isinstance(stmt.value, ast.Constant)):
+            return stmt.value.value
+    return None
+
+
+def scan_module(path):
+    """静态分析单个模块，返回其中的游戏列表 [{'title', 'class', 'order'}]"""
+    with open(path, 'rb') as f:
+        try:
+            tree = ast.parse(f.read(), filename=path)
+        except (SyntaxError, ValueError):
+            return []
+
+    # 在 __main__ 块中被实例化的类名
+    launched = set()
+    for node in tree.body:
+        if isinstance(node, ast.If) and _is_main_guard(node):
+            for sub in ast.walk(node):
+                if isinstance(sub, ast.Call) and isinstance(sub.func, ast.Name):
+                    launched.add(sub.func.id)
+
+    games = []
+    for node in tree.body:
+        if not isinstance(node, ast.ClassDef) or node.name not in launched:
+            continue
+        has_run = any(isinstance(stmt, ast.FunctionDef) and stmt.name == 'run'
+                      for stmt in node.body)
+        if not has_run or _class_constant(node, 'HIDDEN') is True:
+            continue
+        title = _class_constant(node, 'TITLE')
+        order = _class_constant(node, 'ORDER')
+        games.append({
+            'title': title if isinstance(title, str) else node.name,
+            'class': node.name,
+            'order': order if isinstance(order, (int, float)) and not isinstance(order, bool) else None,
+        })
+    return games
+
+
+def load_manifest(manifest_path):
+    try:
+        with open(manifest_path, 'r', encoding='utf-8') as f:
+            manifest = json.load(f)
+    except (OSError, ValueError):
+        return {}
+    if manifest.get('version') != MANIFEST_VERSION:
+        return {}
+    return manifest.get('files', {})
+
+
+def save_manifest(manifest_path, files):
+    tmp_path = manifest_path + '.tmp'
+    try:
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump({'version': MANIFEST_VERSION, 'files': files}, f,
+                      ensure_ascii=False, indent=1)
+        os.replace(tmp_path, manifest_path)
+    except OSError:
+        # 目录不可写时只是无法缓存，不影响使用
+        pass
+
+
+def discover_games(directory=None, manifest_path=None):
+    """扫描目录中的游戏，返回 [(显示名, "模块名.类名")]"""
+    if directory is None:
+        directory = os.path.dirname(os.path.abspath(__file__))
+    if manifest_path is None:
+        manifest_path = os.path.join(directory, MANIFEST_NAME)
+
+    cached = load_manifest(manifest_path)
+    files = {}
+    changed = False
+
+    with os.scandir(directory) as entries:
+        for entry in entries:
+            if not entry.name.endswith('.py') or not entry.is_file():
+                continue
+            stat = entry.stat()
+            record = cached.get(entry.name)
+
+            if (record is None or record['mtime_ns'] != stat.st_mtime_ns or
+                    record['size'] != stat.st_size):
+                # mtime变了但内容没变时（例如git checkout）不用重新解析
+                digest = _file_hash(entry.path)
+                if record is None or record['sha1'] != digest:
+                    record = {'games': scan_module(entry.path)}
+                record = dict(record, mtime_ns=stat.st_mtime_ns,
+                              size=stat.st_size, sha1=digest)
+                changed = True
+
+            files[entry.name] = record
+
+    if changed or files.keys() != cached.keys():
+        save_manifest(manifest_path, files)
+
+    games = []
+    for file_name in sorted(files):
+        module_name = file_name[:-3]
+        for game in files[file_name]['games']:
+            games.append((game['order'], game['title'], f"{module_name}.{game['class']}"))
+    # 稳定排序：ORDER相同或都没有时保持文件名的顺序
+    games.sort(key=lambda game: (game[0] is None, game[0] or 0))
+    return [(title, target) for order, title, target in games]
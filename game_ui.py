@@ -0,0 +1,148 @@
+"""所有游戏共用的界面组件
+
+- get_font(): 按 (字体名, 字号) 缓存字体对象
+- render_text(): 按 (文字, 颜色, 字号, 字体名) 在LRU中缓存渲染好的文字
+- Label: 内容会变化的文字（分数、计时器），只在文字变化时重新渲染
+- Button / draw_button(): 带悬停效果的圆角按钮
+- draw_overlay(): 缓存的半透明遮罩层
+
+pygame.quit() 之后字体对象会失效，所以退出时会自动清空所有缓存。
+"""
+import collections
+
+import pygame
+
+TEXT_CACHE_SIZE = 512
+
+WHITE = (255, 255, 255)
+BORDER_COLOR = (220, 220, 220)
+
+_fonts = {}
+_text_cache = collections.OrderedDict()
+_overlays = {}
+_quit_hook_registered = False
+
+
+def clear_caches():
+    """清空字体、文字和遮罩缓存"""
+    global _quit_hook_registered
+    _fonts.clear()
+    _text_cache.clear()
+    _overlays.clear()
+    _quit_hook_registered = False
+
+
+def get_font(size, name=None):
+    """获取缓存的字体（name为None时使用pygame默认字体）"""
+    global _quit_hook_registered
+    key = (name, size)
+    font = _fonts.get(key)
+    if font is None:
+        # pygame每次quit后会清空已注册的回调，所以每轮都要重新注册
+        if not _quit_hook_registered:
+            pygame.register_quit(clear_caches)
+            _quit_hook_registered = True
+        font = _fonts[key] = pygame.font.SysFont(name, size)
+    return font
+
+
+def render_text(text, color, size, name=None):
+    """渲染文字，结果按 (文字, 颜色, 字号, 字体名) 缓存"""
+    key = (text, color, size, name)
+    surface = _text_cache.get(key)
+    if surface is not None:
+        _text_cache.move_to_end(key)
+        return surface
+
+    surface = get_font(size, name).render(text, True, color)
+    _text_cache[key] = surface
+    if len(_text_cache) > TEXT_CACHE_SIZE:
+        _text_cache.popitem(last=False)
+    return surface
+
+
+def blit_text(surface, text, color, size, name=None, **position):
+    """绘制缓存的文字，position 同 Surface.get_rect()，例如 center=(x, y)"""
+    text_surface = render_text(text, color, size, name)
+    rect = text_surface.get_rect(**position)
+    surface.blit(text_surface, rect)
+    return rect
+
+
+def draw_overlay(surface, color=(0, 0, 0, 180)):
+    """在整个画面上叠加半透明遮罩"""
+    key = (surface.get_size(), color)
+    overlay = _overlays.get(key)
+    if overlay is None:
+        overlay = _overlays[key] = pygame.Surface(surface.get_size(), pygame.SRCALPHA)
+        overlay.fill(color)
+    surface.blit(overlay, (0, 0))
+
+
+def draw_button(surface, rect, text, color, font_size=28, text_color=WHITE,
+                border_color=BORDER_COLOR, border_radius=8):
+    """绘制按钮的通用函数"""
+    pygame.draw.rect(surface, color, rect, border_radius=border_radius)
+    pygame.draw.rect(surface, border_color, rect, 2, border_radius=border_radius)
+    blit_text(surface, text, text_color, font_size, center=rect.center)
+    return rect
+
+
+class Label:
+    """内容会变化的文字，文字不变时直接复用上一次渲染的结果
+
+    变化频繁的文字（分数、计时）不适合放进共享的LRU，否则会把其它文字挤出去。
+    """
+
+    def __init__(self, size, color, name=None):
+        self.size = size
+        self.color = color
+        self.name = name
+        self.text = None
+        self.surface = None
+
+    def render(self, text):
+        if text != self.text:
+            self.text = text
+            self.surface = get_font(self.size, self.name).render(text, True, self.color)
+        return self.surface
+
+    def draw(self, surface, text, **position):
+        """绘制文字，position 同 Surface.get_rect()，返回占用的矩形"""
+        text_surface = self.render(text)
+        rect = text_surface.get_rect(**position)
+        surface.blit(text_surface, rect)
+        return rect
+
+
+class Button:
+    """可点击的按钮"""
+
+    def __init__(self, rect, text, color, hover_color, text_color=WHITE, font_size=28,
+                 border_color=BORDER_COLOR, border_radius=8):
+        self.rect = pygame.Rect(rect)
+        self.text = text
+        self.color = color
+        self.hover_color = hover_color
+        self.text_color = text_color
+        self.font_size = font_size
+        self.border_color = border_color
+        self.border_radius = border_radius
+        self.hovered = False
+
+    def draw(self, surface):
+        """绘制按钮，悬停时使用hover_color"""
+        color = self.hover_color if self.hovered else self.color
+        return draw_button(surface, self.rect, self.text, color, self.font_size,
+                           self.text_color, self.border_color, self.border_radius)
+
+    def check_hover(self, pos):
+        """更新并返回悬停状态"""
+        self.hovered = self.rect.collidepoint(pos)
+        return self.hovered
+
+    def is_clicked(self, event):
+        """是否被鼠标左键点击"""
+        if event.type == pygame.MOUSEBUTTONDOWN and event.button == 1:
+            return self.rect.collidepoint(event.pos)
+        return False
@@ -0,0 +1,259 @@
+"""扫雷棋盘的存储、生成和存档
+
+每个格子占一个字节，整个棋盘是按行排列的 bytearray（格子编号 row * cols + col）：
+- 低4位：周围的地雷数 0-8，地雷为 MINE
+- 第4、5位：格子状态 HIDDEN / REVEALED / FLAGGED / QUESTION（已经移好位）
+
+百万格子的棋盘只占1MB，判断状态只是一次位运算；统计旗子、找地雷等
+整盘操作用 bytes.translate/count/find 在C里完成，不需要逐格的Python对象。
+
+地雷不从"所有格子的列表"里抽样：先在去掉安全区（第一次点击及其周围）
+之后的格子编号 0..N-1 中无放回抽样，再按安全区的位置把编号映射回
+棋盘上的格子，所以不需要列出所有格子。哪些格子相邻由棋盘的拓扑决定
+（方格、环面、六边形，见minesweeper_topology.py），各函数的topology
+参数默认是普通的方格棋盘。
+
+自定义的大棋盘（1000x1000以上）用numpy生成，百万格子只需要几毫秒；
+没有安装numpy时退回纯Python实现（大棋盘会慢一些）。同一个种子在两种
+实现下生成的棋盘不同，所以只有格子数达到 VECTORIZE_CELLS 时才使用numpy，
+标准难度的棋盘不受是否安装numpy影响，与以前的版本完全一致。
+
+存档文件是一个固定长度的文件头加上原样的格子字节，可以直接内存映射，
+读取大棋盘时只有一次拷贝。
+"""
+import bisect
+import mmap
+import os
+import random
+import struct
+from collections import deque
+
+from minesweeper_topology import BY_CODE, SQUARE
+
+try:
+    import numpy as np
+except ImportError:  # numpy是可选依赖
+    np = None
+
+VALUE_MASK = 0x0F
+MINE = 9
+STATE_MASK = 0x30
+HIDDEN = 0x00
+REVEALED = 0x10
+FLAGGED = 0x20
+QUESTION = 0x30
+STATE_SHIFT = 4
+
+# 达到这个格子数的棋盘用numpy生成
+VECTORIZE_CELLS = 4096
+
+# bytes.translate 用的表：只保留数字 / 地雷为1 / 未揭开的安全格子为1 / 某个状态为1
+_VALUES = bytes(i & VALUE_MASK for i in range(256))
+_MINES = bytes(int(i & VALUE_MASK == MINE) for i in range(256))
+_COVERED_SAFE = bytes(int(i & VALUE_MASK != MINE and i & STATE_MASK != REVEALED) for i in range(256))
+_STATES = {state: bytes(int(i & STATE_MASK == state) for i in range(256))
+           for state in (HIDDEN, REVEALED, FLAGGED, QUESTION)}
+
+# 存档：魔数、版本、游戏状态、是否还没点第一下、拓扑编号、行、列、地雷数、已用毫秒数，
+# 补齐到32字节后是 rows * cols 个格子字节
+SAVE_MAGIC = b'GBMS'
+SAVE_VERSION = 1
+_SAVE_HEADER = struct.Struct('<4sBBBBIIIQ4x')
+
+
+def values(cells):
+    """去掉状态位，只保留数字和地雷的副本"""
+    return cells.translate(_VALUES)
+
+
+def count_state(cells, state):
+    """状态为state的格子数"""
+    return cells.translate(_STATES[state]).count(1)
+
+
+def covered_safe_count(cells):
+    """还没揭开的安全格子数"""
+    return cells.translate(_COVERED_SAFE).count(1)
+
+
+def mine_positions(cells, cols):
+    """所有地雷的位置 [(行, 列)]，按编号排序"""
+    if np is not None and len(cells) >= VECTORIZE_CELLS:
+        indexes = np.flatnonzero(np.frombuffer(cells, dtype=np.uint8) & VALUE_MASK == MINE)
+        mine_rows, mine_cols = np.divmod(indexes, cols)
+        return list(zip(mine_rows.tolist(), mine_cols.tolist()))
+    marks = cells.translate(_MINES)
+    positions = []
+    index = marks.find(1)
+    while index >= 0:
+        positions.append(divmod(index, cols))
+        index = marks.find(1, index + 1)
+    return positions
+
+
+def open_cells(cells, rows, cols, index, topology=SQUARE):
+    """揭开格子index；是空白格子时用队列逐层展开周围未揭开、未标记的格子
+
+    返回新揭开的格子编号列表。未标记、周围没有雷的格子字节正好是0，
+    未揭开的格子字节小于REVEALED，所以展开时只需要比较整数。格子数达到
+    VECTORIZE_CELLS 且有numpy时用邻居表的numpy视图一次展开一整层。
+    """
+    cells[index] = cells[index] & VALUE_MASK | REVEALED
+    opened = [index]
+    if cells[index] & VALUE_MASK:
+        return opened
+    neighbors = topology.neighbors(rows, cols)
+    if np is not None and len(cells) >= VECTORIZE_CELLS:
+        return _open_layers(cells, neighbors, index)
+    table, k = neighbors.table, neighbors.k
+    queue = deque(opened)
+    pop, push, record = queue.popleft, queue.append, opened.append
+    while queue:
+        base = pop() * k
+        for i in table[base:base + k]:
+            if i < 0:
+                break
+            cell = cells[i]
+            if cell < REVEALED:
+                cells[i] = cell | REVEALED
+                record(i)
+                if not cell:
+                    push(i)
+    return opened
+
+
+def _open_layers(cells, neighbors, index):
+    """numpy: 与 open_cells 相同的展开，每次处理一整层（大棋盘上的大片空白）"""
+    board = np.frombuffer(cells, dtype=np.uint8)
+    opened = [np.array([index])]
+    frontier = opened[0]
+    while len(frontier):
+        around = neighbors.take(frontier).ravel()
+        around = around[around >= 0]
+        around = around[board[around] < REVEALED]
+        # 去重：排好序后只留每段相同编号的第一个（只用这一层大小的内存）
+        around.sort()
+        first = np.ones(len(around), dtype=bool)
+        first[1:] = around[1:] != around[:-1]
+        around = around[first]
+        blank = around[board[around] == 0]
+        board[around] |= REVEALED
+        opened.append(around)
+        frontier = blank
+    return np.concatenate(opened).tolist()
+
+
+def safe_zone(rows, cols, row, col, topology=SQUARE):
+    """第一次点击的格子及其周围，按编号 row * cols + col 排好序"""
+    return topology.zone(rows, cols, row * cols + col)
+
+
+def sample_mines(rows, cols, mine_count, safe_row, safe_col, rng, topology=SQUARE):
+    """随机选择地雷的格子编号，避开安全区；rng是游戏的random.Random"""
+    safe = safe_zone(rows, cols, safe_row, safe_col, topology)
+    available = rows * cols - len(safe)
+    if not 0 <= mine_count <= available:
+        raise ValueError(f"{mine_count} mines do not fit on a {rows}x{cols} board")
+
+    # 第i个安全格子之前有i个安全格子，编号p要跳过所有 safe[i] - i <= p 的安全格子
+    offsets = [index - i for i, index in enumerate(safe)]
+    if np is not None and rows * cols >= VECTORIZE_CELLS:
+        generator = np.random.default_rng(rng.getrandbits(64))
+        picks = generator.choice(available, mine_count, replace=False)
+        return picks + np.searchsorted(offsets, picks, side='right')
+    # 对range抽样与对同样长度的列表抽样消耗的随机数完全相同
+    picks = rng.sample(range(available), mine_count)
+    return [p + bisect.bisect_right(offsets, p) for p in picks]
+
+
+def neighbor_counts(rows, cols, mines, topology=SQUARE):
+    """返回格子字节（都未揭开）：地雷为MINE，其它格子为周围的地雷数"""
+    if np is not None and not isinstance(mines, list):
+        mask = np.zeros(rows * cols, dtype=np.uint8)
+        mask[mines] = 1
+        mask = mask.reshape(rows, cols)
+        return bytearray(np.where(mask, np.uint8(MINE), topology.count(mask)))
+
+    cells = bytearray(rows * cols)
+    for index in mines:
+        cells[index] = MINE
+    neighbors = topology.neighbors(rows, cols)
+    table, k = neighbors.table, neighbors.k
+    for index in mines:
+        for i in table[index * k:index * k + k]:
+            if i < 0:
+                break
+            if cells[i] != MINE:
+                cells[i] += 1
+    return cells
+
+
+def generate_board(rows, cols, mine_count, safe_row, safe_col, rng, topology=SQUARE):
+    """生成一局的棋盘，返回 (格子字节, 地雷的格子编号)
+
+    地雷编号是 sample_mines() 的结果：大棋盘上是numpy数组，不为每个地雷创建Python对象。
+    """
+    mines = sample_mines(rows, cols, mine_count, safe_row, safe_col, rng, topology)
+    return neighbor_counts(rows, cols, mines, topology), mines
+
+
+def seeded_board(rows, cols, mine_count, safe_row, safe_col, seed, flip=0, topology=SQUARE):
+    """按种子生成棋盘，flip的第1位上下翻转、第2位左右翻转（只能用topology.flips里的翻转）
+
+    不用猜的棋盘在后台进程里生成，游戏只需要记下 (种子, 安全格, 翻转)
+    就能重建同一个棋盘（录制回放也靠它）。返回值同 generate_board()。
+    """
+    cells, mines = generate_board(rows, cols, mine_count, safe_row, safe_col,
+                                  random.Random(seed), topology)
+    if flip & 1:
+        cells = bytearray().join(cells[r * cols:(r + 1) * cols] for r in reversed(range(rows)))
+    if flip & 2:
+        for r in range(rows):
+            cells[r * cols:(r + 1) * cols] = cells[r * cols:(r + 1) * cols][::-1]
+    if flip and isinstance(mines, list):
+        mines = [_flip_index(index, rows, cols, flip) for index in mines]
+    elif flip:
+        mines = _flip_index(mines, rows, cols, flip)
+    return cells, mines
+
+
+def _flip_index(index, rows, cols, flip):
+    """翻转后的格子编号（index可以是numpy数组）"""
+    row, col = index // cols, index % cols
+    if flip & 1:
+        row = rows - 1 - row
+    if flip & 2:
+        col = cols - 1 - col
+    return row * cols + col
+
+
+def write_save(path, rows, cols, mine_count, state, first_click, elapsed_ms, cells, topology=SQUARE):
+    """写存档；先写临时文件再替换，写到一半失败不会破坏原来的存档"""
+    header = _SAVE_HEADER.pack(SAVE_MAGIC, SAVE_VERSION, state, first_click, topology.code,
+                               rows, cols, mine_count, elapsed_ms)
+    temp = path + '.tmp'
+    with open(temp, 'wb') as f:
+        f.write(header)
+        f.write(cells)
+    os.replace(temp, path)
+
+
+def read_save(path):
+    """读存档，返回 (行, 列, 地雷数, 游戏状态, 是否还没点第一下, 已用毫秒数, 格子字节, 拓扑)"""
+    with open(path, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+        if len(mapped) < _SAVE_HEADER.size:
+            raise ValueError(f"{path} is not a minesweeper save")
+        magic, version, state, first_click, code, rows, cols, mine_count, elapsed_ms = \
+            _SAVE_HEADER.unpack_from(mapped)
+        if magic != SAVE_MAGIC:
+            raise ValueError(f"{path} is not a minesweeper save")
+        if version != SAVE_VERSION:
+            raise ValueError(f"unsupported minesweeper save version {version}")
+        if code not in BY_CODE:
+            raise ValueError(f"unknown board topology {code} in {path}")
+        end = _SAVE_HEADER.size + rows * cols
+        if len(mapped) < end:
+            raise ValueError(f"{path} is truncated")
+        with memoryview(mapped) as view:
+            cells = bytearray(view[_SAVE_HEADER.size:end])
+    return rows, cols, mine_count, state, bool(first_click), elapsed_ms, cells, BY_CODE[code]
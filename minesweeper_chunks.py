@@ -0,0 +1,272 @@
+"""无尽扫雷的棋盘：按需生成、可以换出到磁盘的区块
+
+棋盘在四个方向上都没有边界，按 CHUNK x CHUNK 的区块存放。每个区块是
+一个 bytearray，格子字节的格式与 minesweeper_board.py 相同（低4位是数字
+或地雷，第4、5位是状态）。格子 (row, col) 可以是负数，所在的区块是
+(row >> CHUNK_SHIFT, col >> CHUNK_SHIFT)，区块里的编号是
+(row & CHUNK_MASK) << CHUNK_SHIFT | col & CHUNK_MASK。
+
+区块的地雷只由棋盘种子和区块坐标决定（chunk_mines()，用哈希把两者
+混成区块自己的种子），所以不管按什么顺序访问，同一个种子的棋盘都一样。
+边上格子的数字要看相邻区块的地雷，生成时把周围8个区块靠边的地雷也算进去。
+起点 (0, 0) 周围没有地雷，开局时从这里展开。
+
+内存里最多保留 max_chunks 个区块，trim() 把离视口中心最远的区块换出：
+没动过的区块直接丢掉，用到时重新生成；揭开、插过旗的区块只有状态位
+需要保存，zlib压缩后追加写到 ChunkStore 的临时文件里，换回来时重新生成
+数字再合上状态位。所以不管玩家走多远，内存占用都是固定的。
+"""
+import hashlib
+import random
+import struct
+import tempfile
+import zlib
+from collections import deque
+from functools import lru_cache
+
+from minesweeper_board import MINE, REVEALED, STATE_MASK, VALUE_MASK, mine_positions, neighbor_counts
+
+CHUNK_SHIFT = 5
+CHUNK = 1 << CHUNK_SHIFT
+CHUNK_MASK = CHUNK - 1
+# 每个区块的地雷数（密度约16%，介于中级和高级之间）
+CHUNK_MINES = 164
+# 内存里最多保留的区块数（每个区块1KB）
+MAX_CHUNKS = 64
+# 临时文件里作废的数据超过有效数据、并且超过这么多字节时整理一次
+COMPACT_BYTES = 1 << 20
+
+# 起点周围没有地雷的范围（行、列都在 -START_ZONE..START_ZONE 内）
+START_ZONE = 1
+
+# bytes.translate 用的表：只保留状态位
+_STATE_BITS = bytes(i & STATE_MASK for i in range(256))
+# 没有状态位的区块（没动过）的crc32，InfiniteBoard.digest() 跳过这样的区块
+_CLEAN_CHECKSUM = zlib.crc32(bytes(CHUNK * CHUNK))
+_CHUNK_KEY = struct.Struct('<Qqq')
+
+
+def chunk_key(row, col):
+    """格子所在的区块坐标"""
+    return row >> CHUNK_SHIFT, col >> CHUNK_SHIFT
+
+
+def chunk_seed(seed, chunk_row, chunk_col):
+    """区块自己的种子：棋盘种子和区块坐标的哈希，与访问顺序无关"""
+    digest = hashlib.blake2b(_CHUNK_KEY.pack(seed, chunk_row, chunk_col), digest_size=8).digest()
+    return int.from_bytes(digest, 'little')
+
+
+@lru_cache(maxsize=256)
+def chunk_mines(seed, chunk_row, chunk_col, mine_count=CHUNK_MINES):
+    """区块里地雷的编号（排好序的元组），起点周围的地雷去掉"""
+    picks = random.Random(chunk_seed(seed, chunk_row, chunk_col)).sample(range(CHUNK * CHUNK), mine_count)
+    top, left = chunk_row * CHUNK, chunk_col * CHUNK
+    return tuple(sorted(index for index in picks
+                        if not (abs(top + (index >> CHUNK_SHIFT)) <= START_ZONE
+                                and abs(left + (index & CHUNK_MASK)) <= START_ZONE)))
+
+
+def generate_chunk(seed, chunk_row, chunk_col, mine_count=CHUNK_MINES):
+    """生成一个区块的格子字节（都未揭开），边上的数字算上相邻区块的地雷"""
+    # 在四周各多一格的 (CHUNK + 2) x (CHUNK + 2) 棋盘上数地雷，再取中间部分
+    size = CHUNK + 2
+    mines = []
+    for dr in (-1, 0, 1):
+        for dc in (-1, 0, 1):
+            for index in chunk_mines(seed, chunk_row + dr, chunk_col + dc, mine_count):
+                row = dr * CHUNK + (index >> CHUNK_SHIFT) + 1
+                col = dc * CHUNK + (index & CHUNK_MASK) + 1
+                if 0 <= row < size and 0 <= col < size:
+                    mines.append(row * size + col)
+    padded = neighbor_counts(size, size, mines)
+    return bytearray().join(padded[row * size + 1:row * size + 1 + CHUNK] for row in range(1, CHUNK + 1))
+
+
+class ChunkStore:
+    """换出的区块的状态位：zlib压缩后追加写到临时文件，内存里只有索引
+
+    同一个区块再次换出时写一份新的，旧的作废；作废的数据太多时把有效的
+    记录拷到新文件里（compact()）。
+    """
+
+    def __init__(self, directory=None):
+        self.directory = directory
+        self.file = tempfile.TemporaryFile(dir=directory)
+        # 区块坐标 -> (文件里的位置, 长度)
+        self.index = {}
+        # 区块坐标 -> 状态位的crc32（InfiniteBoard.digest() 用，不用读文件）
+        self.checksums = {}
+        self.size = 0
+        self.garbage = 0
+
+    def __len__(self):
+        return len(self.index)
+
+    def __contains__(self, key):
+        return key in self.index
+
+    def put(self, key, states):
+        """保存一个区块的状态位"""
+        blob = zlib.compress(states, 1)
+        old = self.index.get(key)
+        if old is not None:
+            self.garbage += old[1]
+        self.file.seek(self.size)
+        self.file.write(blob)
+        self.index[key] = (self.size, len(blob))
+        self.checksums[key] = zlib.crc32(states)
+        self.size += len(blob)
+        if self.garbage > max(self.size - self.garbage, COMPACT_BYTES):
+            self.compact()
+
+    def get(self, key):
+        """区块的状态位，没有保存过时返回None"""
+        entry = self.index.get(key)
+        if entry is None:
+            return None
+        offset, length = entry
+        self.file.seek(offset)
+        return zlib.decompress(self.file.read(length))
+
+    def compact(self):
+        """去掉作废的记录"""
+        old = self.file
+        self.file = tempfile.TemporaryFile(dir=self.directory)
+        position = 0
+        for key, (offset, length) in self.index.items():
+            old.seek(offset)
+            self.file.write(old.read(length))
+            self.index[key] = (position, length)
+            position += length
+        old.close()
+        self.size = position
+        self.garbage = 0
+
+    def close(self):
+        self.file.close()
+
+
+class InfiniteBoard:
+    """没有边界的方格棋盘，区块按需生成，离得远的换出到 ChunkStore"""
+
+    def __init__(self, seed, mine_count=CHUNK_MINES, max_chunks=MAX_CHUNKS, store=None):
+        self.seed = seed
+        self.mine_count = mine_count
+        self.max_chunks = max_chunks
+        self.store = store if store is not None else ChunkStore()
+        # 内存里的区块，以及其中状态和生成时不一样（换出时要保存）的区块
+        self.chunks = {}
+        self.modified = set()
+        # 生成、从磁盘换回、换出的区块数
+        self.generated = 0
+        self.loaded = 0
+        self.evicted = 0
+
+    def __repr__(self):
+        return f"<InfiniteBoard seed {self.seed}, {self.mine_count} mines per chunk>"
+
+    def chunk(self, key):
+        """区块的格子字节，不在内存里时生成（换出过的再合上保存的状态位）
+
+        只有 trim() 会换出区块，所以两次 trim() 之间拿到的区块一直有效。
+        """
+        cells = self.chunks.get(key)
+        if cells is None:
+            cells = generate_chunk(self.seed, *key, self.mine_count)
+            self.generated += 1
+            states = self.store.get(key)
+            if states is not None:
+                # 生成的格子没有状态位，按整数或一下就合上了
+                merged = int.from_bytes(cells, 'little') | int.from_bytes(states, 'little')
+                cells = bytearray(merged.to_bytes(len(cells), 'little'))
+                self.loaded += 1
+            self.chunks[key] = cells
+        return cells
+
+    def get(self, row, col):
+        """格子字节"""
+        return self.chunk(chunk_key(row, col))[(row & CHUNK_MASK) << CHUNK_SHIFT | col & CHUNK_MASK]
+
+    def set(self, row, col, cell):
+        key = chunk_key(row, col)
+        self.chunk(key)[(row & CHUNK_MASK) << CHUNK_SHIFT | col & CHUNK_MASK] = cell
+        self.modified.add(key)
+
+    def open_cells(self, row, col):
+        """揭开格子；是空白格子时逐层展开，跨过区块的边界。返回新揭开的格子 [(行, 列)]
+
+        与 minesweeper_board.open_cells 一样，未揭开、未标记的格子字节小于REVEALED。
+        """
+        self.set(row, col, self.get(row, col) & VALUE_MASK | REVEALED)
+        opened = [(row, col)]
+        if self.get(row, col) & VALUE_MASK:
+            return opened
+        chunks, modified = self.chunks, self.modified
+        queue = deque(opened)
+        while queue:
+            r, c = queue.popleft()
+            for nr in (r - 1, r, r + 1):
+                for nc in (c - 1, c, c + 1):
+                    key = (nr >> CHUNK_SHIFT, nc >> CHUNK_SHIFT)
+                    cells = chunks.get(key)
+                    if cells is None:
+                        cells = self.chunk(key)
+                    i = (nr & CHUNK_MASK) << CHUNK_SHIFT | nc & CHUNK_MASK
+                    cell = cells[i]
+                    if cell < REVEALED:
+                        cells[i] = cell | REVEALED
+                        modified.add(key)
+                        opened.append((nr, nc))
+                        if not cell:
+                            queue.append((nr, nc))
+        return opened
+
+    def reveal_mines(self):
+        """揭开内存里所有区块的地雷（输了以后），返回变化的格子"""
+        changed = []
+        for key, cells in self.chunks.items():
+            top, left = key[0] * CHUNK, key[1] * CHUNK
+            for r, c in mine_positions(cells, CHUNK):
+                i = r << CHUNK_SHIFT | c
+                if cells[i] & STATE_MASK != REVEALED:
+                    cells[i] = MINE | REVEALED
+                    changed.append((top + r, left + c))
+                    self.modified.add(key)
+        return changed
+
+    def digest(self):
+        """棋盘内容的校验值：按区块坐标的顺序合上每个动过的区块的状态位
+
+        数字和地雷只由种子决定，状态位包括内存里的和换出保存的，所以
+        校验值和哪些区块正好在内存里无关。换出的区块用保存时算好的crc32。
+        """
+        value = zlib.crc32(repr(self).encode('utf-8'))
+        checksums = self.store.checksums
+        for key in sorted(self.chunks.keys() | checksums.keys()):
+            cells = self.chunks.get(key)
+            checksum = zlib.crc32(cells.translate(_STATE_BITS)) if cells is not None else checksums[key]
+            if checksum != _CLEAN_CHECKSUM:
+                value = zlib.crc32(f"{key}{checksum}".encode('ascii'), value)
+        return value
+
+    def trim(self, row, col):
+        """内存里的区块超过 max_chunks 时，换出离格子 (row, col) 最远的那些"""
+        excess = len(self.chunks) - self.max_chunks
+        if excess <= 0:
+            return
+        center_row, center_col = chunk_key(row, col)
+        keys = sorted(self.chunks, key=lambda key: max(abs(key[0] - center_row), abs(key[1] - center_col)))
+        for key in keys[-excess:]:
+            self.evict(key)
+
+    def evict(self, key):
+        """把区块移出内存，动过的区块保存状态位"""
+        cells = self.chunks.pop(key)
+        if key in self.modified:
+            self.modified.discard(key)
+            self.store.put(key, cells.translate(_STATE_BITS))
+        self.evicted += 1
+
+    def close(self):
+        self.store.close()
@@ -1,8 +1,24 @@
+import os
 import pygame
 import random
 import sys
 from enum import Enum
 
+from dirty_rects import DirtyRegions
+from frame_profiler import FrameProfiler
+from game_loop import FixedTimestep
+from game_api import HeadlessGame
+from game_ui import Label, blit_text, draw_button
+from minesweeper_board import (FLAGGED, HIDDEN, MINE, QUESTION, REVEALED, STATE_MASK, STATE_SHIFT,
+                              VALUE_MASK, count_state, covered_safe_count, generate_board,
+                              mine_positions, open_cells, read_save, seeded_board, write_save)
+from minesweeper_pool import MAX_CELLS, BoardPool, find_board
+from minesweeper_solver import analyze
+from minesweeper_stats import board_stats
+from minesweeper_topology import SQUARE, TOPOLOGIES, get_topology
+from sprites import bake
+from viewport import GridLayer, Viewport
+
 
 class GameState(Enum):
     PLAYING = 0
@@ -11,15 +27,33 @@ class GameState(Enum):
 
 
 class CellState(Enum):
+    """格子状态；格子字节里存的是 value << STATE_SHIFT（见minesweeper_board.py）"""
     HIDDEN = 0
     REVEALED = 1
     FLAGGED = 2
     QUESTION = 3
 
 
-class Minesweeper:
-    def __init__(self):
+class Minesweeper(HeadlessGame):
+    TITLE = "💣 Minesweeper"
+    ORDER = 50
+
+    # 标准格子大小；大一些的棋盘缩小格子以放进窗口，缩到MIN_CELL_SIZE还放不下时
+    # 按标准大小显示，通过视口平移（拖动、方向键）和缩放（滚轮、+/-）查看
+    CELL_SIZE = 40
+    MIN_CELL_SIZE = 10
+    MAX_BOARD_WIDTH = 1600
+    MAX_BOARD_HEIGHT = 880
+    # 方向键每帧平移的像素数；拖动超过这个距离不再算点击
+    PAN_SPEED = 16
+    DRAG_THRESHOLD = 5
+    # 概率图的颜色分级数
+    ODDS_LEVELS = 10
+
+    def __init__(self, headless=False, seed=None):
         pygame.init()
+        # 游戏自己的随机数流，seed为None时随机选择（录制时会保存下来）
+        self.seed_rng(seed)
 
         # 颜色定义
         self.BG_COLOR = (200, 200, 200)  # 背景色
@@ -29,6 +63,11 @@ class Minesweeper:
         self.CELL_FLAGGED = (255, 100, 100)  # 标记格子颜色
         self.CELL_QUESTION = (255, 255, 100)  # 问号格子颜色
         self.CELL_HIGHLIGHT = (240, 240, 240)  # 高亮颜色
+        self.CELL_HINT = (150, 230, 150)  # 提示格子颜色
+        # 未揭开的格子按状态取颜色
+        self.COVER_COLORS = {HIDDEN: self.CELL_HIDDEN,
+                             FLAGGED: self.CELL_FLAGGED,
+                             QUESTION: self.CELL_QUESTION}
         self.MINE_COLOR = (0, 0, 0)  # 地雷颜色
         self.TEXT_COLORS = [
             (0, 0, 255),  # 1: 蓝色
@@ -51,11 +90,8 @@ class Minesweeper:
         # 默认难度
         self.difficulty = 'medium'
         self.rows, self.cols, self.mine_count = self.difficulties[self.difficulty]
-
-        # 计算窗口大小 (格子大小40x40像素)
-        self.cell_size = 40
-        self.grid_width = self.cols * self.cell_size
-        self.grid_height = self.rows * self.cell_size
+        # 棋盘拓扑：方格、环面或六边形（T键切换，见minesweeper_topology.py）
+        self.topology = SQUARE
 
         # 顶部信息栏高度
         self.info_height = 80
@@ -63,13 +99,13 @@ class Minesweeper:
         # 底部控制栏高度
         self.control_height = 60
 
-        # 总窗口大小
-        self.SCREEN_WIDTH = self.grid_width
-        self.SCREEN_HEIGHT = self.grid_height + self.info_height + self.control_height
+        # 计算窗口大小 (格子大小40x40像素) 和视口
+        self.layout_board()
 
         # 创建窗口
-        self.screen = pygame.display.set_mode((self.SCREEN_WIDTH, self.SCREEN_HEIGHT))
-        pygame.display.set_caption('Minesweeper - Left click to reveal, Right click to flag, ESC to exit')
+        self.caption = ('Minesweeper - Left click to reveal, Right click to flag, '
+                        'H hint, P odds, N no-guess, T topology, F5 save, F6 load, ESC to exit')
+        self.screen = self.setup_screen((self.SCREEN_WIDTH, self.SCREEN_HEIGHT), self.caption, headless)
 
         # 游戏状态
         self.game_state = GameState.PLAYING
@@ -78,141 +114,417 @@ class Minesweeper:
         self.elapsed_time = 0
         self.flags_placed = 0
 
-        # 字体
-        self.font_small = pygame.font.SysFont(None, 24)
-        self.font_medium = pygame.font.SysFont(None, 32)
-        self.font_large = pygame.font.SysFont(None, 48)
+        # 信息栏里会变化的文字
+        self.mines_label = Label(48, (255, 255, 255))
+        self.time_label = Label(48, (255, 255, 255))
 
         # 游戏时钟
         self.clock = pygame.time.Clock()
         self.FPS = 60
 
+        # 帧剖析器（默认关闭，F9开关，F10导出）
+        self.profiler = FrameProfiler(type(self).__name__)
+        self.profiler.instrument(self, 'draw_cell', 'draw_info_bar', 'draw_control_bar')
+
+        # 脏矩形刷新：只提交重画过的格子和信息栏（F8显示重绘区域）
+        self.dirty = DirtyRegions()
+        self.build_dirty_regions()
+        # 左键或中键按下的位置，拖动时用来平移视口
+        self.drag_start = None
+        self.dragging = False
+        # 概率图（P键开关）
+        self.show_odds = False
+        # 不用猜模式（N键开关）：窗口模式下由后台进程池预先生成棋盘
+        self.no_guess = False
+        self.board_pool = None
+        # configure('board:...') 指定的下一局棋盘 (种子, 行, 列, 翻转)
+        self.next_board = None
+        # 从存档载入、之后还没有操作过时记下存档路径（录制开始时写入设置）
+        self.loaded_from = None
+
         # 初始化游戏
         self.reset_game()
 
     def reset_game(self):
         """重置游戏状态"""
-        # 初始化游戏板
-        self.board = [[0 for _ in range(self.cols)] for _ in range(self.rows)]
-        self.cell_states = [[CellState.HIDDEN for _ in range(self.cols)] for _ in range(self.rows)]
+        # 初始化游戏板：每个格子一个字节，低4位是数字（地雷为MINE），第4、5位是状态
+        self.cells = bytearray(self.rows * self.cols)
         self.game_state = GameState.PLAYING
         self.first_click = True
         self.start_time = 0
         self.elapsed_time = 0
         self.flags_placed = 0
-
-        # 地雷位置将在第一次点击后生成
-        self.mines = []
+        # 还没揭开的安全格子数，为0时胜利
+        self.safe_left = self.rows * self.cols - self.mine_count
+
+        # 地雷在第一次点击后生成，位置只记在格子字节里（需要时用mine_positions()找）
+        self.board_layer.invalidate_all()
+        # 求解器的分析结果（揭开格子后作废）和提示的格子
+        self.analysis = None
+        self.hint_cell = None
+        self.loaded_from = None
+        # 赢了以后的效率统计（见win_summary()）
+        self.win_stats = None
+        # 不用猜模式下没找到不用猜的棋盘、这一局用的是普通棋盘
+        self.guess_fallback = False
+
+    def cell_byte(self, row, col):
+        """格子字节（格式见minesweeper_board.py）"""
+        return self.cells[row * self.cols + col]
+
+    def cell_state(self, row, col):
+        """格子的状态 CellState"""
+        return CellState(self.cell_byte(row, col) >> STATE_SHIFT)
+
+    def cell_value(self, row, col):
+        """格子周围的地雷数，地雷为-1（不管有没有揭开）"""
+        value = self.cell_byte(row, col) & VALUE_MASK
+        return -1 if value == MINE else value
 
     def place_mines(self, first_click_row, first_click_col):
-        """放置地雷，避开第一次点击的位置及其周围"""
-        # 计算第一次点击周围的安全区域
-        safe_cells = set()
-        for dr in [-1, 0, 1]:
-            for dc in [-1, 0, 1]:
-                r, c = first_click_row + dr, first_click_col + dc
-                if 0 <= r < self.rows and 0 <= c < self.cols:
-                    safe_cells.add((r, c))
-
-        # 生成所有可能的位置
-        all_cells = [(r, c) for r in range(self.rows) for c in range(self.cols)]
-
-        # 移除安全区域
-        available_cells = [cell for cell in all_cells if cell not in safe_cells]
-
-        # 随机选择地雷位置
-        self.mines = random.sample(available_cells, self.mine_count)
-
-        # 设置地雷
-        for r, c in self.mines:
-            self.board[r][c] = -1  # -1 表示地雷
-
-        # 计算每个格子的数字
-        for r in range(self.rows):
-            for c in range(self.cols):
-                if self.board[r][c] != -1:  # 如果不是地雷
-                    mine_count = 0
-                    for dr in [-1, 0, 1]:
-                        for dc in [-1, 0, 1]:
-                            nr, nc = r + dr, c + dc
-                            if 0 <= nr < self.rows and 0 <= nc < self.cols:
-                                if self.board[nr][nc] == -1:
-                                    mine_count += 1
-                    self.board[r][c] = mine_count
+        """放置地雷并计算每个格子的数字，避开第一次点击的位置及其周围
+
+        不用猜模式下从后台队列取一个覆盖这次点击的棋盘，没有时当场生成，
+        并用 configure('board:...') 记下来，回放时重建同一个棋盘。当场生成的
+        种子不从 self.rng 取：回放时棋盘已经由设置给出，不会再搜索，self.rng
+        必须和录制时一样。找不到不用猜的棋盘时用普通棋盘，并在标题上说明。
+        """
+        if self.next_board is None and self.no_guess and self.rows * self.cols <= MAX_CELLS:
+            spec = None
+            if self.board_pool is not None:
+                spec = self.board_pool.take(self.rows, self.cols, self.mine_count,
+                                            first_click_row, first_click_col, self.topology)
+            if spec is None:
+                seed = random.Random(f"no-guess:{self.seed_value}:{self.sim_ticks}").getrandbits(32)
+                spec, _ = find_board(self.rows, self.cols, self.mine_count, seed,
+                                     (first_click_row, first_click_col), topology=self.topology)
+            if spec is not None:
+                self.configure(spec.option())
+            else:
+                self.guess_fallback = True
+                print("No no-guess board found, this board may need guessing")
+                if not self.headless:
+                    self.update_caption()
+
+        marks = self.cells
+        if self.next_board is not None:
+            seed, row, col, flip = self.next_board
+            self.next_board = None
+            self.cells, _ = seeded_board(self.rows, self.cols, self.mine_count,
+                                                  row, col, seed, flip, self.topology)
+        else:
+            self.cells, _ = generate_board(self.rows, self.cols, self.mine_count,
+                                                    first_click_row, first_click_col, self.rng,
+                                                    self.topology)
+        # 第一次点击前插的旗子、问号留在新棋盘上
+        if marks.count(0) != len(marks):
+            cells = self.cells
+            for index, mark in enumerate(marks):
+                if mark:
+                    cells[index] |= mark
 
     def reveal_cell(self, row, col):
-        """揭开格子"""
+        """揭开格子，空白格子用队列逐层展开周围的格子
+
+        返回状态发生变化的格子列表 [(行, 列)]，绘制时只需要更新这些格子。
+        """
         # 如果游戏已结束或格子已揭开或已标记，则不处理
-        if (self.game_state != GameState.PLAYING or
-                self.cell_states[row][col] == CellState.REVEALED or
-                self.cell_states[row][col] == CellState.FLAGGED):
-            return
+        state = self.cells[row * self.cols + col] & STATE_MASK
+        if self.game_state != GameState.PLAYING or state == REVEALED or state == FLAGGED:
+            return []
+        self.loaded_from = None
 
         # 如果是第一次点击，生成地雷
         if self.first_click:
             self.first_click = False
             self.place_mines(row, col)
-            self.start_time = pygame.time.get_ticks()
+            self.start_time = self.get_ticks()
 
-        # 揭开当前格子
-        self.cell_states[row][col] = CellState.REVEALED
+        cells, cols = self.cells, self.cols
+        index = row * cols + col
 
         # 如果揭开的是地雷，游戏结束
-        if self.board[row][col] == -1:
+        if cells[index] & VALUE_MASK == MINE:
             self.game_state = GameState.LOSE
-            # 揭开所有地雷
-            for r in range(self.rows):
-                for c in range(self.cols):
-                    if self.board[r][c] == -1:
-                        self.cell_states[r][c] = CellState.REVEALED
-            return
-
-        # 如果揭开的是空白格子，自动揭开周围的空白格子
-        if self.board[row][col] == 0:
-            for dr in [-1, 0, 1]:
-                for dc in [-1, 0, 1]:
-                    nr, nc = row + dr, col + dc
-                    if 0 <= nr < self.rows and 0 <= nc < self.cols:
-                        if self.cell_states[nr][nc] == CellState.HIDDEN:
-                            self.reveal_cell(nr, nc)
+            # 揭开所有地雷（踩中的格子排在最前面）
+            cells[index] = MINE | REVEALED
+            changed = [(row, col)]
+            for r, c in mine_positions(cells, cols):
+                i = r * cols + c
+                if cells[i] & STATE_MASK != REVEALED:
+                    cells[i] = MINE | REVEALED
+                    changed.append((r, c))
+            self.board_changed(changed)
+            return changed
+
+        # 揭开当前格子，空白格子自动揭开周围的格子，其中的空白格子继续展开
+        opened = open_cells(cells, self.rows, cols, index, self.topology)
+        changed = [divmod(i, cols) for i in opened]
 
         # 检查是否胜利
+        self.safe_left -= len(changed)
+        self.board_changed(changed)
         self.check_win()
-
-    def toggle_flag(self, row, col):
-        """切换标记状态 (无标记 -> 旗帜 -> 问号 -> 无标记)"""
-        if self.game_state != GameState.PLAYING or self.cell_states[row][col] == CellState.REVEALED:
+        return changed
+
+    def board_changed(self, cells):
+        """揭开了格子：重画这些格子，之前的分析和提示作废"""
+        self.board_layer.invalidate(cells)
+        self.analysis = None
+        self.set_hint(None)
+        if self.show_odds:
+            # 概率图上所有格子的概率都可能变化
+            self.board_layer.invalidate_all()
+
+    def solve(self):
+        """按玩家看到的局面分析每个格子是地雷的概率（见minesweeper_solver.py）"""
+        if self.analysis is None:
+            self.analysis = analyze(self.cells, self.rows, self.cols, self.mine_count,
+                                    topology=self.topology)
+        return self.analysis
+
+    def set_hint(self, cell):
+        if cell != self.hint_cell:
+            self.board_layer.invalidate([c for c in (self.hint_cell, cell) if c is not None])
+            self.hint_cell = cell
+
+    def show_hint(self):
+        """标出最安全的格子：一定安全的格子，没有时选地雷概率最小的"""
+        if self.game_state != GameState.PLAYING:
             return
+        if self.first_click:
+            # 第一次点击总是安全的
+            self.set_hint((self.rows // 2, self.cols // 2))
+            return
+        move = self.solve().best_move()
+        if move is not None:
+            self.set_hint(move[0])
 
-        current_state = self.cell_states[row][col]
+    def toggle_odds(self):
+        """开关概率图：未揭开的格子按地雷概率从绿到红着色"""
+        self.show_odds = not self.show_odds
+        self.board_layer.invalidate_all()
 
-        if current_state == CellState.HIDDEN:
-            self.cell_states[row][col] = CellState.FLAGGED
+    def toggle_flag(self, row, col):
+        """切换标记状态 (无标记 -> 旗帜 -> 问号 -> 无标记)，返回变化的格子（同reveal_cell）"""
+        index = row * self.cols + col
+        cell = self.cells[index]
+        current_state = cell & STATE_MASK
+        if self.game_state != GameState.PLAYING or current_state == REVEALED:
+            return []
+        self.loaded_from = None
+
+        value = cell & VALUE_MASK
+        if current_state == HIDDEN:
+            self.cells[index] = value | FLAGGED
             self.flags_placed += 1
-        elif current_state == CellState.FLAGGED:
-            self.cell_states[row][col] = CellState.QUESTION
+        elif current_state == FLAGGED:
+            self.cells[index] = value | QUESTION
             self.flags_placed -= 1
-        elif current_state == CellState.QUESTION:
-            self.cell_states[row][col] = CellState.HIDDEN
+        elif current_state == QUESTION:
+            self.cells[index] = value
 
+        self.board_layer.invalidate([(row, col)])
         # 检查是否胜利
         self.check_win()
+        return [(row, col)]
 
     def check_win(self):
         """检查是否胜利"""
         # 胜利条件：所有非地雷格子都已揭开
-        for r in range(self.rows):
-            for c in range(self.cols):
-                if self.board[r][c] != -1 and self.cell_states[r][c] != CellState.REVEALED:
-                    return
+        if self.safe_left:
+            return
 
         # 所有地雷都已标记（可选，但标准扫雷不要求）
-        for r, c in self.mines:
-            if self.cell_states[r][c] != CellState.FLAGGED:
-                # 如果地雷没有被标记，自动标记
-                self.cell_states[r][c] = CellState.FLAGGED
+        cells, cols = self.cells, self.cols
+        mines = mine_positions(cells, cols)
+        for r, c in mines:
+            # 如果地雷没有被标记，自动标记
+            cells[r * cols + c] = MINE | FLAGGED
+        self.flags_placed = len(mines)
+        self.board_layer.invalidate(mines)
 
         self.game_state = GameState.WIN
+        self.record_win(self.get_ticks() - self.start_time)
+
+    def record_win(self, elapsed_ms):
+        """赢了：停住计时，统计这个棋盘的3BV"""
+        self.elapsed_time = elapsed_ms // 1000
+        self.win_stats = board_stats(self.cells, self.rows, self.cols, self.topology)
+        self.win_stats['time_ms'] = elapsed_ms
+
+    def win_summary(self):
+        """胜利提示框里的效率：3BV、每秒完成的3BV和开口数"""
+        stats = self.win_stats
+        rate = stats['bbbv'] * 1000 / max(stats['time_ms'], 1)
+        return f"3BV {stats['bbbv']}, {rate:.2f} 3BV/s, {stats['openings']} openings"
+
+    def apply_action(self, action):
+        """step() 的动作：(行, 列, 按键)，按键1揭开、3标记，None表示不操作"""
+        if action is None:
+            return
+        row, col, button = action
+        if button == 1:
+            self.reveal_cell(row, col)
+        elif button == 3:
+            self.toggle_flag(row, col)
+
+    def observe(self):
+        """观测：格子字节（格式见minesweeper_board.py）、棋盘大小和游戏状态。
+
+        格子字节包含未揭开格子的真实值，机器人应只读取已揭开的格子
+        （cell_state()、cell_value() 按格子读取）。
+        """
+        return {
+            'cells': self.cells,
+            'rows': self.rows,
+            'cols': self.cols,
+            'state': self.game_state,
+        }
+
+    def reward_signal(self):
+        # 每揭开一个安全格子奖励1
+        return self.rows * self.cols - self.mine_count - self.safe_left
+
+    def is_done(self):
+        return self.game_state != GameState.PLAYING
+
+    def apply_config(self, option):
+        """configure() 的选项：难度名，自定义棋盘 'custom:行x列:地雷数'，
+        不用猜模式 'no-guess:on' / 'no-guess:off'，
+        下一局的棋盘 'board:种子:行:列:翻转'（见minesweeper_pool.py），
+        棋盘拓扑 'topology:square' / 'topology:torus' / 'topology:hex'，
+        载入存档 'load:路径'，或者用分号连起来的几个选项
+        """
+        if ';' in option:
+            for part in option.split(';'):
+                self.apply_config(part)
+        elif option.startswith('custom:'):
+            size, mines = option[len('custom:'):].split(':')
+            rows, cols = size.lower().split('x')
+            self.set_custom(int(rows), int(cols), int(mines))
+        elif option.startswith('no-guess:'):
+            self.set_no_guess(option == 'no-guess:on')
+        elif option.startswith('board:'):
+            seed, row, col, flip = (int(value) for value in option[len('board:'):].split(':'))
+            self.next_board = (seed, row, col, flip)
+        elif option.startswith('topology:'):
+            self.set_topology(get_topology(option[len('topology:'):]))
+        elif option.startswith('load:'):
+            self.load_game(option[len('load:'):])
+        else:
+            self.change_difficulty(option)
+
+    def set_no_guess(self, enabled):
+        """开关不用猜模式，从下一次第一次点击开始生效（录制时请用configure）"""
+        self.no_guess = enabled
+        if enabled and not self.headless and self.board_pool is None:
+            self.board_pool = BoardPool()
+        if enabled and self.board_pool is not None:
+            self.board_pool.want(self.rows, self.cols, self.mine_count, self.topology)
+
+    def set_topology(self, topology):
+        """换一种棋盘拓扑并重新开始（录制时请用 configure('topology:名字')）"""
+        topology.check(self.rows, self.cols)
+        self.topology = topology
+        self.change_difficulty(self.difficulty)
+
+    def current_config(self):
+        """当前的设置（录制开始时写入，回放时先恢复）"""
+        if self.loaded_from is not None:
+            return 'load:' + self.loaded_from
+        option = self.difficulty
+        if self.difficulty == 'custom':
+            rows, cols, mines = self.difficulties['custom']
+            option = f"custom:{rows}x{cols}:{mines}"
+        if self.topology is not SQUARE:
+            option += ';topology:' + self.topology.name
+        return option
+
+    def set_custom(self, rows, cols, mines):
+        """自定义棋盘大小和地雷数（录制时请用 configure('custom:行x列:地雷数')）"""
+        self.topology.check(rows, cols)
+        # 第一次点击的格子及其周围没有地雷
+        safe = len(self.topology.zone(rows, cols, rows // 2 * cols + cols // 2))
+        if not 0 <= mines <= rows * cols - safe:
+            raise ValueError(f"{mines} mines do not fit on a {rows}x{cols} board")
+        self.difficulties['custom'] = (rows, cols, mines)
+        self.change_difficulty('custom')
+
+    @staticmethod
+    def default_save_path():
+        """F5/F6使用的存档：GAMEBOX_SAVE_DIR（默认当前目录）下的minesweeper.gbm"""
+        return os.path.join(os.environ.get('GAMEBOX_SAVE_DIR', ''), 'minesweeper.gbm')
+
+    def save_game(self, path=None):
+        """把当前这局存到path（默认是default_save_path()），返回路径"""
+        if path is None:
+            path = self.default_save_path()
+        if self.game_state == GameState.PLAYING and not self.first_click:
+            elapsed_ms = self.get_ticks() - self.start_time
+        elif self.win_stats is not None:
+            elapsed_ms = self.win_stats['time_ms']
+        else:
+            elapsed_ms = self.elapsed_time * 1000
+        write_save(path, self.rows, self.cols, self.mine_count, self.game_state.value,
+                   self.first_click, elapsed_ms, self.cells, self.topology)
+        return path
+
+    def load_game(self, path):
+        """载入save_game()写的存档（录制时请用 configure('load:路径')）
+
+        存档里只有格子字节，剩余安全格子数和旗子数都从格子字节里数出来，
+        不为每个格子、每个地雷创建Python对象。
+        """
+        rows, cols, mines, state, first_click, elapsed_ms, cells, topology = read_save(path)
+        topology.check(rows, cols)
+        self.topology = topology
+        for name in ('easy', 'medium', 'hard'):
+            if self.difficulties[name] == (rows, cols, mines):
+                self.change_difficulty(name)
+                break
+        else:
+            self.set_custom(rows, cols, mines)
+
+        self.cells = cells
+        self.game_state = GameState(state)
+        self.first_click = first_click
+        self.safe_left = covered_safe_count(cells)
+        self.flags_placed = count_state(cells, FLAGGED)
+        self.elapsed_time = elapsed_ms // 1000
+        self.start_time = self.get_ticks() - elapsed_ms
+        if self.game_state == GameState.WIN:
+            self.record_win(elapsed_ms)
+        self.board_layer.invalidate_all()
+        self.analysis = None
+        self.hint_cell = None
+        self.loaded_from = path
+
+    def fit_cell_size(self, rows, cols):
+        """能把棋盘放进窗口的格子大小（不超过标准大小），太小时用标准大小"""
+        size = min(self.CELL_SIZE, self.MAX_BOARD_WIDTH // cols, self.MAX_BOARD_HEIGHT // rows)
+        return size if size >= self.MIN_CELL_SIZE else self.CELL_SIZE
+
+    def layout_board(self):
+        """按棋盘大小计算窗口大小，创建显示棋盘的视口"""
+        # 六边形棋盘的奇数行错开半格，多占半个格子的宽度
+        stagger = self.topology.stagger and self.rows > 1
+        cell_size = self.fit_cell_size(self.rows, self.cols + stagger)
+        self.grid_width = min(self.cols * cell_size + (cell_size // 2 if stagger else 0), self.MAX_BOARD_WIDTH)
+        self.grid_height = min(self.rows * cell_size, self.MAX_BOARD_HEIGHT)
+        self.SCREEN_WIDTH = self.grid_width
+        self.SCREEN_HEIGHT = self.grid_height + self.info_height + self.control_height
+        self.view = Viewport((0, self.info_height, self.grid_width, self.grid_height),
+                             self.rows, self.cols, cell_size, stagger=self.topology.stagger)
+        # 格子画在离屏的layer上，只重画变化的格子
+        self.board_layer = GridLayer(self.view, lambda row, col: self.draw_cell(row, col), self.BG_COLOR)
+        # 鼠标悬停的格子，进出时这两个格子要重画
+        self.hover_cell = None
+
+    @property
+    def cell_size(self):
+        """当前缩放级别下的格子大小"""
+        return self.view.cell_size
 
     def change_difficulty(self, difficulty):
         """改变游戏难度"""
@@ -221,102 +533,156 @@ class Minesweeper:
             self.rows, self.cols, self.mine_count = self.difficulties[difficulty]
 
             # 重新计算窗口大小
-            self.grid_width = self.cols * self.cell_size
-            self.grid_height = self.rows * self.cell_size
-            self.SCREEN_WIDTH = self.grid_width
-            self.SCREEN_HEIGHT = self.grid_height + self.info_height + self.control_height
+            self.layout_board()
 
             # 创建新窗口
-            self.screen = pygame.display.set_mode((self.SCREEN_WIDTH, self.SCREEN_HEIGHT))
+            self.screen = self.setup_screen((self.SCREEN_WIDTH, self.SCREEN_HEIGHT))
+            self.build_dirty_regions()
+
+            if self.no_guess and self.board_pool is not None:
+                self.board_pool.want(self.rows, self.cols, self.mine_count, self.topology)
 
             # 重置游戏
             self.reset_game()
 
-    def draw_cell(self, row, col, mouse_pos):
-        """绘制单个格子"""
-        x = col * self.cell_size
-        y = row * self.cell_size + self.info_height
+    def build_dirty_regions(self):
+        """划分脏矩形区域：棋盘、信息栏和胜负提示框
+
+        棋盘区域的key是layer的重画次数，重绘时只提交layer上重画过的格子。
+        控制栏和笑脸只随难度、胜负变化，放在scene里整屏重绘。
+        用lambda调用方法，这样剖析器替换的方法也会生效。
+        """
+        self.dirty.clear()
+        self.board_rects = []
+        self.dirty.add(self.view.rect, lambda: self.board_layer.generation, lambda: self.blit_board())
+        self.dirty.add((0, 0, self.SCREEN_WIDTH, self.info_height),
+                       lambda: (self.counter_text(), self.update_timer()),
+                       lambda: self.draw_info_bar())
+        # 胜负提示框压在格子上面，下面的格子重绘后它也要重绘
+        self.dirty.add(self.result_rect(), lambda: None, lambda: self.draw_result(), overlay=True)
+
+    def update_timer(self):
+        """更新并返回计时（秒）"""
+        if self.game_state == GameState.PLAYING and not self.first_click:
+            self.elapsed_time = (self.get_ticks() - self.start_time) // 1000
+        return self.elapsed_time
 
-        cell_rect = pygame.Rect(x, y, self.cell_size, self.cell_size)
+    def draw_cell(self, row, col):
+        """把单个格子画到棋盘layer上：每种外观烘焙成一个精灵，一次blit画完"""
+        x, y = self.board_layer.cell_rect(row, col).topleft
 
         # 检查鼠标是否悬停在该格子上
-        mouse_over = cell_rect.collidepoint(mouse_pos)
-
-        # 根据格子状态选择颜色
-        state = self.cell_states[row][col]
-        cell_value = self.board[row][col]
-
-        if state == CellState.HIDDEN:
-            color = self.CELL_HIGHLIGHT if mouse_over else self.CELL_HIDDEN
-            pygame.draw.rect(self.screen, color, cell_rect)
-            pygame.draw.rect(self.screen, self.GRID_COLOR, cell_rect, 1)
-
-        elif state == CellState.REVEALED:
-            color = self.CELL_REVEALED
-            pygame.draw.rect(self.screen, color, cell_rect)
-            pygame.draw.rect(self.screen, self.GRID_COLOR, cell_rect, 1)
-
-            # 如果是地雷
-            if cell_value == -1:
-                # 绘制地雷（如果游戏输了，用红色表示踩中的地雷）
-                if self.game_state == GameState.LOSE and (row, col) in self.mines:
-                    # 检查这个地雷是否是玩家踩中的
-                    if (row, col) in self.mines:
-                        # 用红色圆表示踩中的地雷
-                        center_x = x + self.cell_size // 2
-                        center_y = y + self.cell_size // 2
-                        pygame.draw.circle(self.screen, (255, 0, 0),
-                                           (center_x, center_y), self.cell_size // 3)
-                else:
-                    # 普通地雷
-                    center_x = x + self.cell_size // 2
-                    center_y = y + self.cell_size // 2
-                    pygame.draw.circle(self.screen, self.MINE_COLOR,
-                                       (center_x, center_y), self.cell_size // 4)
-
-                    # 地雷的光晕效果
-                    pygame.draw.circle(self.screen, (100, 100, 100),
-                                       (center_x, center_y), self.cell_size // 4 + 2, 2)
-
-            # 如果是数字
-            elif cell_value > 0:
-                text = str(cell_value)
-                text_color = self.TEXT_COLORS[cell_value - 1]
-                text_surface = self.font_medium.render(text, True, text_color)
-                text_rect = text_surface.get_rect(center=(x + self.cell_size // 2,
-                                                          y + self.cell_size // 2))
-                self.screen.blit(text_surface, text_rect)
-
-        elif state == CellState.FLAGGED:
-            color = self.CELL_HIGHLIGHT if mouse_over else self.CELL_FLAGGED
-            pygame.draw.rect(self.screen, color, cell_rect)
-            pygame.draw.rect(self.screen, self.GRID_COLOR, cell_rect, 1)
+        mouse_over = (row, col) == self.hover_cell
+
+        # 根据格子状态选择外观
+        cell = self.cell_byte(row, col)
+        state = cell & STATE_MASK
+        cell_value = cell & VALUE_MASK
+
+        if state == REVEALED:
+            if cell_value == MINE:
+                # 游戏输了时用红色表示地雷
+                look = ('mine', self.game_state == GameState.LOSE)
+            else:
+                look = ('number', cell_value)
+        else:
+            if (row, col) == self.hint_cell:
+                color = self.CELL_HINT
+            elif mouse_over:
+                color = self.CELL_HIGHLIGHT
+            else:
+                color = self.COVER_COLORS[state]
+            look = (state, color)
+
+        sprite = bake(('minesweeper_cell', look, self.cell_size),
+                      (0, 0, self.cell_size, self.cell_size),
+                      lambda surface, x, y: self.paint_cell(surface, x, y, look),
+                      opaque=True)
+        # 视口边缘只露出一部分的格子由layer的边界裁剪
+        sprite.blit(self.board_layer.surface, x, y)
+
+        if (self.show_odds and state != REVEALED and not self.first_click
+                and self.game_state == GameState.PLAYING):
+            level = round(self.solve().probability(row, col) * self.ODDS_LEVELS)
+            bake(('minesweeper_odds', level, self.cell_size),
+                 (0, 0, self.cell_size, self.cell_size),
+                 lambda surface, x, y: self.paint_odds(surface, x, y, level)
+                 ).blit(self.board_layer.surface, x, y)
+
+    def update_board(self):
+        """更新鼠标悬停的格子，把失效的格子重画到layer上"""
+        cell = self.view.cell_at(self.get_mouse_pos())
+        if cell != self.hover_cell:
+            self.board_layer.invalidate([c for c in (self.hover_cell, cell) if c is not None])
+            self.hover_cell = cell
+        origin = self.view.rect.topleft
+        self.board_rects.extend(rect.move(origin) for rect in self.board_layer.update())
+
+    def blit_board(self):
+        """把layer上重画过的部分贴到屏幕上，返回这些矩形（没有时贴整个棋盘）"""
+        view_rect = self.view.rect
+        rects = [rect.clip(view_rect) for rect in self.board_rects] or [view_rect]
+        for rect in rects:
+            self.screen.blit(self.board_layer.surface, rect,
+                             rect.move(-view_rect.x, -view_rect.y))
+        self.board_rects = []
+        return rects
+
+    def paint_odds(self, surface, x, y, level):
+        """概率图的半透明色块：level为0（安全）时绿色，ODDS_LEVELS（地雷）时红色"""
+        red = 255 * level // self.ODDS_LEVELS
+        surface.fill((red, 255 - red, 0, 110), (x + 1, y + 1, self.cell_size - 2, self.cell_size - 2))
+
+    def paint_cell(self, surface, x, y, look):
+        """以 (x, y) 为左上角画一个格子，look 是 draw_cell() 选出的外观"""
+        kind, detail = look
+        cell_rect = pygame.Rect(x, y, self.cell_size, self.cell_size)
+        color = self.CELL_REVEALED if kind in ('mine', 'number') else detail
+        pygame.draw.rect(surface, color, cell_rect)
+        pygame.draw.rect(surface, self.GRID_COLOR, cell_rect, 1)
+
+        center_x = x + self.cell_size // 2
+        center_y = y + self.cell_size // 2
+
+        if kind == 'mine':
+            if detail:
+                # 用红色圆表示踩中的地雷
+                pygame.draw.circle(surface, (255, 0, 0),
+                                   (center_x, center_y), self.cell_size // 3)
+            else:
+                # 普通地雷
+                pygame.draw.circle(surface, self.MINE_COLOR,
+                                   (center_x, center_y), self.cell_size // 4)
 
+                # 地雷的光晕效果
+                pygame.draw.circle(surface, (100, 100, 100),
+                                   (center_x, center_y), self.cell_size // 4 + 2, 2)
+
+        # 如果是数字
+        elif kind == 'number' and detail > 0:
+            text_color = self.TEXT_COLORS[detail - 1]
+            blit_text(surface, str(detail), text_color, self.cell_size * 4 // 5,
+                      center=(center_x, center_y))
+
+        elif kind == FLAGGED:
             # 绘制旗帜
             # 旗帜杆
-            pole_x = x + self.cell_size // 2
-            pygame.draw.line(self.screen, (0, 0, 0),
-                             (pole_x, y + 5),
-                             (pole_x, y + self.cell_size - 5), 2)
+            eighth = self.cell_size // 8
+            pygame.draw.line(surface, (0, 0, 0),
+                             (center_x, y + eighth),
+                             (center_x, y + self.cell_size - eighth), 2)
 
             # 旗帜
             flag_points = [
-                (pole_x, y + 10),
-                (pole_x + self.cell_size // 3, y + 15),
-                (pole_x, y + 20)
+                (center_x, y + 2 * eighth),
+                (center_x + self.cell_size // 3, y + 3 * eighth),
+                (center_x, y + 4 * eighth)
             ]
-            pygame.draw.polygon(self.screen, (255, 0, 0), flag_points)
-
-        elif state == CellState.QUESTION:
-            color = self.CELL_HIGHLIGHT if mouse_over else self.CELL_QUESTION
-            pygame.draw.rect(self.screen, color, cell_rect)
-            pygame.draw.rect(self.screen, self.GRID_COLOR, cell_rect, 1)
+            pygame.draw.polygon(surface, (255, 0, 0), flag_points)
 
+        elif kind == QUESTION:
             # 绘制问号
-            text_surface = self.font_medium.render("?", True, (0, 0, 0))
-            text_rect = text_surface.get_rect(center=(x + self.cell_size // 2,
-                                                      y + self.cell_size // 2))
-            self.screen.blit(text_surface, text_rect)
+            blit_text(surface, "?", (0, 0, 0), self.cell_size * 4 // 5, center=(center_x, center_y))
 
     def draw_info_bar(self):
         """绘制顶部信息栏"""
@@ -325,10 +691,7 @@ class Minesweeper:
         pygame.draw.rect(self.screen, (100, 100, 150), info_rect)
 
         # 地雷计数器
-        mines_left = self.mine_count - self.flags_placed
-        mines_text = f"Mines: {mines_left}"
-        mines_surface = self.font_large.render(mines_text, True, (255, 255, 255))
-        self.screen.blit(mines_surface, (20, 20))
+        self.mines_label.draw(self.screen, self.counter_text(), topleft=(20, 20))
 
         # 游戏状态表情
         face_x = self.SCREEN_WIDTH // 2 - 25
@@ -378,12 +741,13 @@ class Minesweeper:
                             3.14, 6.28, 3)
 
         # 计时器
-        if self.game_state == GameState.PLAYING and not self.first_click:
-            self.elapsed_time = (pygame.time.get_ticks() - self.start_time) // 1000
+        self.update_timer()
+        self.time_label.draw(self.screen, f"Time: {self.elapsed_time}",
+                             topleft=(self.SCREEN_WIDTH - 150, 20))
 
-        time_text = f"Time: {self.elapsed_time}"
-        time_surface = self.font_large.render(time_text, True, (255, 255, 255))
-        self.screen.blit(time_surface, (self.SCREEN_WIDTH - 150, 20))
+    def counter_text(self):
+        """信息栏左边的计数：还没标记的地雷数"""
+        return f"Mines: {self.mine_count - self.flags_placed}"
 
     def draw_control_bar(self):
         """绘制底部控制栏"""
@@ -410,72 +774,60 @@ class Minesweeper:
             else:
                 color = (200, 200, 200)
 
-            pygame.draw.rect(self.screen, color, button_rect, border_radius=5)
-            pygame.draw.rect(self.screen, (0, 0, 0), button_rect, 2, border_radius=5)
-
-            # 按钮文字
             diff_text = {'easy': 'Beginner', 'medium': 'Intermediate', 'hard': 'Expert'}[diff]
-            text_surface = self.font_medium.render(diff_text, True, (0, 0, 0))
-            text_rect = text_surface.get_rect(center=button_rect.center)
-            self.screen.blit(text_surface, text_rect)
+            draw_button(self.screen, button_rect, diff_text, color, font_size=32,
+                        text_color=(0, 0, 0), border_color=(0, 0, 0), border_radius=5)
 
         # 重新开始按钮
         restart_x = self.SCREEN_WIDTH - 120
         restart_y = self.SCREEN_HEIGHT - self.control_height // 2 - button_height // 2
         restart_rect = pygame.Rect(restart_x, restart_y, button_width, button_height)
 
-        pygame.draw.rect(self.screen, (100, 200, 100), restart_rect, border_radius=5)
-        pygame.draw.rect(self.screen, (0, 0, 0), restart_rect, 2, border_radius=5)
-
-        restart_text = "Restart"
-        text_surface = self.font_medium.render(restart_text, True, (0, 0, 0))
-        text_rect = text_surface.get_rect(center=restart_rect.center)
-        self.screen.blit(text_surface, text_rect)
+        draw_button(self.screen, restart_rect, "Restart", (100, 200, 100), font_size=32,
+                    text_color=(0, 0, 0), border_color=(0, 0, 0), border_radius=5)
 
         # 控制提示
         hint_text = "Left: Reveal | Right: Flag/Unflag | ESC: Exit"
-        hint_surface = self.font_small.render(hint_text, True, (255, 255, 255))
-        self.screen.blit(hint_surface, (self.SCREEN_WIDTH // 2 - hint_surface.get_width() // 2,
-                                        self.SCREEN_HEIGHT - self.control_height + 5))
+        blit_text(self.screen, hint_text, (255, 255, 255), 24,
+                  midtop=(self.SCREEN_WIDTH // 2, self.SCREEN_HEIGHT - self.control_height + 5))
 
     def draw(self):
         """绘制整个游戏"""
         self.screen.fill(self.BG_COLOR)
 
-        # 获取鼠标位置
-        mouse_pos = pygame.mouse.get_pos()
-
-        # 绘制所有格子
-        for row in range(self.rows):
-            for col in range(self.cols):
-                self.draw_cell(row, col, mouse_pos)
+        # 棋盘layer只重画变化的格子，然后整个贴到屏幕上
+        self.update_board()
+        self.screen.blit(self.board_layer.surface, self.view.rect)
+        self.board_rects = []
 
         # 绘制信息栏和控制栏
         self.draw_info_bar()
         self.draw_control_bar()
 
         # 如果游戏结束，显示消息
+        self.draw_result()
+
+    def result_rect(self):
+        """胜负提示框的位置（棋盘中间）"""
+        return pygame.Rect(self.view.rect.centerx - 150, self.view.rect.centery - 50, 300, 100)
+
+    def draw_result(self):
+        """游戏结束时绘制胜负提示框"""
         if self.game_state == GameState.WIN:
-            win_rect = pygame.Rect(self.SCREEN_WIDTH // 2 - 150,
-                                   self.info_height + self.grid_height // 2 - 50,
-                                   300, 100)
+            win_rect = self.result_rect()
             pygame.draw.rect(self.screen, (100, 200, 100, 200), win_rect, border_radius=10)
 
             win_text = f"You Win! Time: {self.elapsed_time}s"
-            text_surface = self.font_large.render(win_text, True, (255, 255, 255))
-            text_rect = text_surface.get_rect(center=win_rect.center)
-            self.screen.blit(text_surface, text_rect)
+            blit_text(self.screen, win_text, (255, 255, 255), 48,
+                      center=(win_rect.centerx, win_rect.centery - 12))
+            blit_text(self.screen, self.win_summary(), (255, 255, 255), 24,
+                      center=(win_rect.centerx, win_rect.bottom - 22))
 
         elif self.game_state == GameState.LOSE:
-            lose_rect = pygame.Rect(self.SCREEN_WIDTH // 2 - 150,
-                                    self.info_height + self.grid_height // 2 - 50,
-                                    300, 100)
+            lose_rect = self.result_rect()
             pygame.draw.rect(self.screen, (200, 100, 100, 200), lose_rect, border_radius=10)
 
-            lose_text = "Game Over!"
-            text_surface = self.font_large.render(lose_text, True, (255, 255, 255))
-            text_rect = text_surface.get_rect(center=lose_rect.center)
-            self.screen.blit(text_surface, text_rect)
+            blit_text(self.screen, "Game Over!", (255, 255, 255), 48, center=lose_rect.center)
 
     def handle_click(self, pos, button):
         """处理鼠标点击"""
@@ -494,7 +846,7 @@ class Minesweeper:
 
                 if (button_x <= x <= button_x + button_width and
                         button_y <= y <= button_y + button_height):
-                    self.change_difficulty(diff)
+                    self.configure(diff)
                     return
 
             # 检查是否点击了重新开始按钮
@@ -503,54 +855,174 @@ class Minesweeper:
 
             if (restart_x <= x <= restart_x + button_width and
                     restart_y <= y <= restart_y + button_height):
-                self.reset_game()
+                self.restart()
                 return
 
         # 检查是否点击了游戏区域
-        elif y >= self.info_height and y < self.info_height + self.grid_height:
-            # 计算点击的格子
-            col = x // self.cell_size
-            row = (y - self.info_height) // self.cell_size
+        else:
+            # 通过视口计算点击的格子
+            cell = self.view.cell_at(pos)
 
-            if 0 <= row < self.rows and 0 <= col < self.cols:
-                if button == 1:  # 左键
-                    self.reveal_cell(row, col)
-                elif button == 3:  # 右键
-                    self.toggle_flag(row, col)
+            # 左键揭开、右键标记，在下一个逻辑帧作为动作生效
+            if cell is not None and button in (1, 3):
+                self.pending_action = (*cell, button)
+
+    def handle_events(self):
+        """处理游戏事件，返回False表示退出游戏"""
+        running = True
+        for event in pygame.event.get():
+            if self.profiler.handle_event(event) or self.dirty.handle_event(event):
+                continue
+            if event.type == pygame.QUIT:
+                running = False
+            elif event.type == pygame.KEYDOWN:
+                if event.key == pygame.K_ESCAPE:
+                    running = False
+                else:
+                    self.handle_key(event.key)
+            elif event.type == pygame.MOUSEWHEEL:
+                # 以鼠标位置为中心缩放
+                if self.view.rect.collidepoint(pygame.mouse.get_pos()):
+                    self.view.zoom(event.y, pygame.mouse.get_pos())
+            elif event.type == pygame.MOUSEBUTTONDOWN:
+                if event.button == 2 or (event.button == 1 and self.view.rect.collidepoint(event.pos)):
+                    # 棋盘上的左键在松开时才揭开格子，按住拖动则平移视口
+                    self.drag_start = event.pos
+                    self.dragging = False
+                elif event.button in (1, 3):
+                    self.handle_click(event.pos, event.button)
+            elif event.type == pygame.MOUSEMOTION and self.drag_start is not None:
+                if not self.dragging:
+                    dx = event.pos[0] - self.drag_start[0]
+                    dy = event.pos[1] - self.drag_start[1]
+                    self.dragging = max(abs(dx), abs(dy)) > self.DRAG_THRESHOLD
+                    if self.dragging:
+                        self.view.pan(-dx, -dy)
+                else:
+                    self.view.pan(-event.rel[0], -event.rel[1])
+            elif event.type == pygame.MOUSEBUTTONUP and event.button in (1, 2):
+                if event.button == 1 and self.drag_start is not None and not self.dragging:
+                    self.handle_click(self.drag_start, 1)
+                self.drag_start = None
+                self.dragging = False
+
+        # 按住方向键平移视口
+        keys = pygame.key.get_pressed()
+        dx = (keys[pygame.K_RIGHT] - keys[pygame.K_LEFT]) * self.PAN_SPEED
+        dy = (keys[pygame.K_DOWN] - keys[pygame.K_UP]) * self.PAN_SPEED
+        if dx or dy:
+            self.view.pan(dx, dy)
+
+        return running
+
+    def handle_key(self, key):
+        """处理ESC以外的按键"""
+        if key in (pygame.K_EQUALS, pygame.K_PLUS, pygame.K_KP_PLUS):
+            self.view.zoom(1)
+        elif key in (pygame.K_MINUS, pygame.K_KP_MINUS):
+            self.view.zoom(-1)
+        elif key == pygame.K_h:
+            self.show_hint()
+        elif key == pygame.K_p:
+            self.toggle_odds()
+        elif key == pygame.K_n:
+            try:
+                self.configure('no-guess:off' if self.no_guess else 'no-guess:on')
+            except (AssertionError, OSError, RuntimeError) as e:  # 后台进程池启动失败
+                print(f"No-guess board pool failed to start: {type(e).__name__}: {e}")
+            self.update_caption()
+        elif key == pygame.K_t:
+            names = list(TOPOLOGIES)
+            following = names[(names.index(self.topology.name) + 1) % len(names)]
+            try:
+                self.configure('topology:' + following)
+            except ValueError as e:  # 棋盘太小，不能做成环面
+                print(e)
+        elif key == pygame.K_F5:
+            print(f"Game saved to {self.save_game()}")
+        elif key == pygame.K_F6:
+            path = self.default_save_path()
+            if os.path.exists(path):
+                self.configure('load:' + path)
 
     def run(self):
         """运行游戏主循环"""
+        profiler = self.profiler
+        self.start_recording()
+        # 计时器按逻辑帧计时，点击在逻辑帧里生效，逻辑帧数就是录制的时间戳
+        self.sim_clock = True
+        timestep = FixedTimestep(self.FPS)
+        dt = 0.0
+        self.pending_action = None
         running = True
 
         while running:
+            profiler.begin_frame()
+
             # 处理事件
-            for event in pygame.event.get():
-                if event.type == pygame.QUIT:
-                    running = False
-                elif event.type == pygame.KEYDOWN:
-                    if event.key == pygame.K_ESCAPE:
-                        running = False
-                elif event.type == pygame.MOUSEBUTTONDOWN:
-                    self.handle_click(event.pos, event.button)
+            with profiler.phase('event'):
+                running = self.handle_events()
 
             if not running:
                 break
 
-            # 绘制游戏
-            self.draw()
-
-            # 更新屏幕
-            pygame.display.flip()
+            with profiler.phase('update'):
+                for _ in range(timestep.advance(dt)):
+                    self.advance(self.pending_action)
+                    self.pending_action = None
+                # 收集后台生成的棋盘，每秒在标题上更新一次队列的统计
+                if self.board_pool is not None:
+                    self.board_pool.poll()
+                    if self.sim_ticks % self.FPS == 0:
+                        self.update_caption()
+
+            # 绘制游戏：只重画变化的格子，只重绘、提交变化的区域
+            with profiler.phase('draw'):
+                self.update_board()
+                rects = self.dirty.draw(self.screen, self.draw,
+                                        scene=(self.game_state, self.difficulty))
+
+            # 只提交变化的矩形
+            with profiler.phase('flip'):
+                self.dirty.update(rects)
 
             # 控制帧率
-            self.clock.tick(self.FPS)
+            with profiler.phase('tick'):
+                dt = self.clock.tick(self.FPS) / 1000
 
         # 退出游戏
+        self.stop_recording()
+        profiler.close()
+        if self.board_pool is not None:
+            self.board_pool.shutdown()
         pygame.quit()
         return
 
+    def update_caption(self):
+        """不用猜模式下在窗口标题上显示后台队列的深度和生成速度"""
+        caption = self.caption
+        if self.no_guess:
+            metrics = self.board_pool and self.board_pool.metrics(self.rows, self.cols, self.mine_count,
+                                                                  self.topology)
+            if self.guess_fallback:
+                caption += " | no-guess: none found, this board may need guessing"
+            elif metrics is None:
+                caption += " | no-guess"
+            else:
+                caption += (f" | no-guess queue {metrics['depth']}/{metrics['target']}, "
+                            f"{metrics['rate']:.1f} boards/s per worker, "
+                            f"{metrics['hits']} hits / {metrics['misses']} misses")
+        pygame.display.set_caption(caption)
+
 
 # 单独测试用
 if __name__ == "__main__":
     game = Minesweeper()
+    # python minesweeper_game.py 300x500:20000 直接开始自定义棋盘，
+    # python minesweeper_game.py minesweeper.gbm 载入存档
+    if len(sys.argv) > 1:
+        if sys.argv[1].endswith('.gbm'):
+            game.configure('load:' + sys.argv[1])
+        else:
+            game.configure('custom:' + sys.argv[1])
     game.run()
\ No newline at end of file
@@ -0,0 +1,220 @@
+"""无尽扫雷的游戏类：InfiniteMinesweeper
+
+在 Minesweeper 的界面和操作上换成没有边界的棋盘：视口可以向任何方向
+拖动，分数是揭开的安全格子数。棋盘怎样按区块生成、换出到磁盘见
+minesweeper_chunks.py。
+"""
+import pygame
+
+from game_ui import blit_text, draw_button
+from minesweeper_board import FLAGGED, HIDDEN, MINE, QUESTION, REVEALED, STATE_MASK, VALUE_MASK
+from minesweeper_chunks import CHUNK, CHUNK_MINES, MAX_CHUNKS, InfiniteBoard
+from minesweeper_game import GameState, Minesweeper
+from viewport import GridLayer, Viewport
+
+
+class InfiniteMinesweeper(Minesweeper):
+    """无尽扫雷：没有边界的棋盘，一直向外揭开，踩到地雷结束
+
+    规则和格子状态与 Minesweeper 相同，只是没有胜利：分数是揭开的安全格子数。
+    棋盘按区块按需生成，离视口远的区块换出到磁盘（见minesweeper_chunks.py）。
+    开局时从 (0, 0) 展开；行列号可以是负数，动作 (行, 列, 按键) 用的是棋盘坐标。
+    """
+    TITLE = "♾️ Infinite Minesweeper"
+    ORDER = 60
+
+    # 视口的大小（标准格子大小下的格子数）
+    VIEW_ROWS = 18
+    VIEW_COLS = 30
+
+    def __init__(self, headless=False, seed=None):
+        # reset_game() 在 Minesweeper.__init__ 里调用，要先准备好
+        self.board = None
+        self.chunk_mines = CHUNK_MINES
+        self.max_chunks = MAX_CHUNKS
+        self.cleared = 0
+        super().__init__(headless, seed)
+        self.caption = ('Infinite Minesweeper - Left click to reveal, Right click to flag, '
+                        'drag or arrow keys to explore, Home back to start, ESC to exit')
+        if not self.headless:
+            pygame.display.set_caption(self.caption)
+
+    def reset_game(self):
+        """新的一局：按游戏的随机数流选一个棋盘种子，从起点展开"""
+        if self.board is not None:
+            self.board.close()
+        self.board = InfiniteBoard(self.rng.getrandbits(64), self.chunk_mines, self.max_chunks)
+        self.game_state = GameState.PLAYING
+        # 计时从第一次操作开始
+        self.first_click = True
+        self.start_time = 0
+        self.elapsed_time = 0
+        self.flags_placed = 0
+        self.cleared = len(self.board.open_cells(0, 0))
+        self.analysis = None
+        self.hint_cell = None
+        self.loaded_from = None
+        self.win_stats = None
+        self.center_view()
+
+    def layout_board(self):
+        """固定大小的窗口，视口在两个方向上都没有边界"""
+        cell_size = self.CELL_SIZE
+        self.grid_width = self.VIEW_COLS * cell_size
+        self.grid_height = self.VIEW_ROWS * cell_size
+        self.SCREEN_WIDTH = self.grid_width
+        self.SCREEN_HEIGHT = self.grid_height + self.info_height + self.control_height
+        self.view = Viewport((0, self.info_height, self.grid_width, self.grid_height), None, None, cell_size)
+        self.board_layer = GridLayer(self.view, lambda row, col: self.draw_cell(row, col), self.BG_COLOR)
+        self.hover_cell = None
+
+    def center_view(self):
+        """把起点 (0, 0) 移到视口中间"""
+        view = self.view
+        view.offset_x = (view.cell_size - view.rect.width) // 2
+        view.offset_y = (view.cell_size - view.rect.height) // 2
+        view.version += 1
+        self.board_layer.invalidate_all()
+
+    def view_center(self):
+        """视口中间的格子"""
+        view = self.view
+        return ((view.offset_y + view.rect.height // 2) // view.cell_size,
+                (view.offset_x + view.rect.width // 2) // view.cell_size)
+
+    def cell_byte(self, row, col):
+        return self.board.get(row, col)
+
+    def start_clock(self):
+        if self.first_click:
+            self.first_click = False
+            self.start_time = self.get_ticks()
+
+    def reveal_cell(self, row, col):
+        """揭开格子，空白格子展开时可以跨过区块，返回状态发生变化的格子"""
+        state = self.board.get(row, col) & STATE_MASK
+        if self.game_state != GameState.PLAYING or state == REVEALED or state == FLAGGED:
+            return []
+        self.start_clock()
+
+        if self.board.get(row, col) & VALUE_MASK == MINE:
+            self.game_state = GameState.LOSE
+            self.elapsed_time = (self.get_ticks() - self.start_time) // 1000
+            # 踩中的格子排在最前面，再揭开内存里的其它地雷
+            self.board.set(row, col, MINE | REVEALED)
+            changed = [(row, col)] + self.board.reveal_mines()
+            self.board_layer.invalidate(changed)
+            return changed
+
+        changed = self.board.open_cells(row, col)
+        self.cleared += len(changed)
+        self.board_layer.invalidate(changed)
+        return changed
+
+    def toggle_flag(self, row, col):
+        """切换标记状态 (无标记 -> 旗帜 -> 问号 -> 无标记)"""
+        cell = self.board.get(row, col)
+        current_state = cell & STATE_MASK
+        if self.game_state != GameState.PLAYING or current_state == REVEALED:
+            return []
+        self.start_clock()
+
+        value = cell & VALUE_MASK
+        if current_state == HIDDEN:
+            self.board.set(row, col, value | FLAGGED)
+            self.flags_placed += 1
+        elif current_state == FLAGGED:
+            self.board.set(row, col, value | QUESTION)
+            self.flags_placed -= 1
+        elif current_state == QUESTION:
+            self.board.set(row, col, value)
+        self.board_layer.invalidate([(row, col)])
+        return [(row, col)]
+
+    def update_tick(self):
+        # 每个逻辑帧把离视口远的区块换出，内存里的区块数不超过 max_chunks
+        self.board.trim(*self.view_center())
+
+    def observe(self):
+        """观测：棋盘（board.get(行, 列) 读格子字节）和它内容的校验值、揭开的安全格子数、
+        旗子数和游戏状态
+
+        与 Minesweeper 一样，机器人应只读取已揭开的格子。有了校验值，回放的
+        state_digest 也比较格子内容（见replay.py）。
+        """
+        return {
+            'board': self.board,
+            'cells': self.board.digest(),
+            'cleared': self.cleared,
+            'flags': self.flags_placed,
+            'state': self.game_state,
+        }
+
+    def reward_signal(self):
+        return self.cleared
+
+    def apply_config(self, option):
+        """configure() 的选项：每个区块（CHUNK x CHUNK）的地雷数 'mines:数量'，重新开始一局"""
+        if option.startswith('mines:'):
+            mines = int(option[len('mines:'):])
+            if not 0 <= mines <= CHUNK * CHUNK // 2:
+                raise ValueError(f"{mines} mines per chunk is out of range")
+            self.chunk_mines = mines
+            self.reset_game()
+        else:
+            raise ValueError(f"unknown option {option!r}")
+
+    def current_config(self):
+        if self.chunk_mines != CHUNK_MINES:
+            return f"mines:{self.chunk_mines}"
+        return None
+
+    def counter_text(self):
+        return f"Cleared: {self.cleared}"
+
+    def handle_key(self, key):
+        """缩放，Home回到起点"""
+        if key in (pygame.K_EQUALS, pygame.K_PLUS, pygame.K_KP_PLUS):
+            self.view.zoom(1)
+        elif key in (pygame.K_MINUS, pygame.K_KP_MINUS):
+            self.view.zoom(-1)
+        elif key == pygame.K_HOME:
+            self.center_view()
+
+    def restart_rect(self):
+        button_width, button_height = 100, 40
+        return pygame.Rect(self.SCREEN_WIDTH - 120, self.SCREEN_HEIGHT - self.control_height // 2 - button_height // 2,
+                           button_width, button_height)
+
+    def draw_control_bar(self):
+        """底部控制栏：操作提示和重新开始按钮"""
+        control_rect = pygame.Rect(0, self.SCREEN_HEIGHT - self.control_height,
+                                   self.SCREEN_WIDTH, self.control_height)
+        pygame.draw.rect(self.screen, (100, 100, 150), control_rect)
+        hint_text = "Left: Reveal | Right: Flag/Unflag | Drag: Explore | Home: Start | ESC: Exit"
+        blit_text(self.screen, hint_text, (255, 255, 255), 24, midleft=(20, control_rect.centery))
+        draw_button(self.screen, self.restart_rect(), "Restart", (100, 200, 100), font_size=32,
+                    text_color=(0, 0, 0), border_color=(0, 0, 0), border_radius=5)
+
+    def handle_click(self, pos, button):
+        """重新开始按钮，或者棋盘上的格子"""
+        if pos[1] > self.SCREEN_HEIGHT - self.control_height:
+            if button == 1 and self.restart_rect().collidepoint(pos):
+                self.restart()
+            return
+        cell = self.view.cell_at(pos)
+        if cell is not None and button in (1, 3):
+            self.pending_action = (*cell, button)
+
+    def run(self):
+        """运行游戏主循环，退出时删掉换出区块的临时文件"""
+        try:
+            super().run()
+        finally:
+            self.board.close()
+
+
+# 单独测试用
+if __name__ == "__main__":
+    game = InfiniteMinesweeper()
+    game.run()
@@ -0,0 +1,209 @@
+"""后台生成"不用猜"的扫雷棋盘
+
+普通棋盘可能逼玩家在两个格子里二选一。不用猜模式下每个候选棋盘都要用
+求解器从第一次点击开始推一遍（minesweeper_solver.solve_without_guessing），
+高级棋盘平均要试七八个候选，第一次点击时当场生成会卡顿。
+
+BoardPool 用进程池为每种棋盘大小预先准备 QUEUE_DEPTH 个棋盘。棋盘只记
+(种子, 安全格, 翻转)，游戏用 minesweeper_board.seeded_board() 重建。
+点在一个棋盘初始展开区域里的任意空白格上都会展开同样的区域，所以这些
+格子都可以作为第一次点击；再加上上下、左右翻转（拓扑允许时），一个棋盘
+能覆盖不少点击位置。第一次点击时取一个覆盖该位置的棋盘，没有的话当场生成。
+每种拓扑（见minesweeper_topology.py）的棋盘分开排队。
+
+在守护进程里（启动器的 game_host 工作进程）不能再创建子进程，这时以及
+进程池启动失败时不在后台生成，take() 总是返回None，由游戏当场生成。
+
+    pool = BoardPool()
+    pool.want(16, 30, 99)           # 开始在后台填充队列
+    pool.poll()                     # 每帧调用，收集完成的棋盘
+    spec = pool.take(16, 30, 99, row, col)
+    pool.metrics(16, 30, 99)        # 队列深度、生成速度等
+"""
+import multiprocessing as mp
+import os
+import random
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from minesweeper_board import seeded_board
+from minesweeper_solver import solve_without_guessing
+from minesweeper_topology import SQUARE
+
+# 每种棋盘预先准备的数量（高级棋盘的展开区域平均只有十几个空白格，
+# 32个棋盘加上翻转能覆盖约95%的第一次点击位置）
+QUEUE_DEPTH = 32
+# 一个任务最多尝试的候选棋盘数
+ATTEMPTS = 200
+# 超过这个格子数的棋盘不做不用猜检查（求解太慢），按普通方式生成
+MAX_CELLS = 2500
+
+
+class BoardSpec:
+    """一个不用猜的棋盘：种子、第一次点击的安全格、翻转方式
+
+    starts 是可以作为第一次点击的格子（初始展开区域里的空白格，未翻转的坐标）。
+    """
+
+    def __init__(self, seed, row, col, flip=0, starts=()):
+        self.seed = seed
+        self.row = row
+        self.col = col
+        self.flip = flip
+        self.starts = starts
+
+    def option(self):
+        """Minesweeper.configure() 的选项，录制后回放时重建同一个棋盘"""
+        return f"board:{self.seed}:{self.row}:{self.col}:{self.flip}"
+
+
+def find_board(rows, cols, mine_count, seed, safe_cell=None, attempts=ATTEMPTS, topology=SQUARE):
+    """寻找一个从安全格开始不用猜的棋盘，返回 (BoardSpec或None, 尝试次数)
+
+    safe_cell为None时每个候选随机选第一次点击的位置，这样后台队列里的
+    棋盘能覆盖不同的点击位置。
+    """
+    rng = random.Random(seed)
+    for attempt in range(1, attempts + 1):
+        board_seed = rng.getrandbits(32)
+        row, col = safe_cell if safe_cell is not None else (rng.randrange(rows), rng.randrange(cols))
+        cells, _ = seeded_board(rows, cols, mine_count, row, col, board_seed, topology=topology)
+        if solve_without_guessing(cells, rows, cols, mine_count, row, col, topology):
+            opening = _opening(cells, rows, cols, row, col, topology)
+            return BoardSpec(board_seed, row, col, 0, opening), attempt
+    return None, attempts
+
+
+def _search(rows, cols, mine_count, topology, seed):
+    """工作进程里执行的任务，返回 (BoardSpec或None, 尝试次数, 耗时)"""
+    start = time.perf_counter()
+    spec, attempts = find_board(rows, cols, mine_count, seed, topology=topology)
+    return spec, attempts, time.perf_counter() - start
+
+
+def _opening(cells, rows, cols, row, col, topology=SQUARE):
+    """从 (row, col) 展开的区域里的空白格（cells是新生成的格子字节，空白格为0）"""
+    neighbors = topology.neighbors(rows, cols)
+    table, k = neighbors.table, neighbors.k
+    zeros = {row * cols + col}
+    queue = [row * cols + col]
+    while queue:
+        base = queue.pop() * k
+        for i in table[base:base + k]:
+            if i < 0:
+                break
+            if cells[i] == 0 and i not in zeros:
+                zeros.add(i)
+                queue.append(i)
+    return frozenset(divmod(i, cols) for i in zeros)
+
+
+class _Queue:
+    """一种棋盘大小的队列和统计"""
+
+    def __init__(self):
+        self.boards = []
+        self.running = []
+        self.generated = 0
+        self.attempts = 0
+        self.busy_time = 0.0
+        self.hits = 0
+        self.misses = 0
+
+
+class BoardPool:
+    """后台进程池，为每种棋盘大小保持一个不用猜棋盘的队列"""
+
+    def __init__(self, depth=QUEUE_DEPTH, workers=None):
+        self.depth = depth
+        self.workers = workers or max((os.cpu_count() or 2) - 1, 1)
+        self.executor = None
+        self.queues = {}
+        self.rng = random.Random()
+        # 守护进程不能有子进程，只能当场生成
+        self.background = not mp.current_process().daemon
+
+    def want(self, rows, cols, mine_count, topology=SQUARE):
+        """开始（或继续）为这种棋盘填充队列"""
+        if rows * cols > MAX_CELLS:
+            return
+        self.queues.setdefault((rows, cols, mine_count, topology), _Queue())
+        self.poll()
+
+    def poll(self):
+        """收集完成的任务，补充提交任务直到队列填满"""
+        if not self.background:
+            return
+        for key, queue in self.queues.items():
+            for future in [f for f in queue.running if f.done()]:
+                queue.running.remove(future)
+                try:
+                    spec, attempts, elapsed = future.result()
+                except Exception as e:  # 工作进程崩溃时丢弃这个任务，下面会重新提交
+                    print(f"No-guess board search failed: {type(e).__name__}: {e}")
+                    continue
+                queue.attempts += attempts
+                queue.busy_time += elapsed
+                if spec is not None:
+                    queue.boards.append(spec)
+                    queue.generated += 1
+
+            missing = self.depth - len(queue.boards) - len(queue.running)
+            if missing > 0:
+                try:
+                    if self.executor is None:
+                        self.executor = ProcessPoolExecutor(self.workers, mp_context=mp.get_context())
+                    for _ in range(missing):
+                        queue.running.append(self.executor.submit(_search, *key, self.rng.getrandbits(32)))
+                except (AssertionError, OSError, RuntimeError) as e:
+                    # 进程池启动不了（例如不允许创建子进程），改为当场生成
+                    print(f"No-guess board pool unavailable: {type(e).__name__}: {e}")
+                    self.shutdown()
+                    self.background = False
+                    return
+
+    def take(self, rows, cols, mine_count, row, col, topology=SQUARE):
+        """取一个第一次点击 (row, col) 可用的棋盘，没有时返回None"""
+        queue = self.queues.get((rows, cols, mine_count, topology))
+        if queue is None:
+            return None
+        self.poll()
+        for index, spec in enumerate(queue.boards):
+            for flip in topology.flips:
+                # 翻转后的点击位置对应原棋盘上的格子
+                r = rows - 1 - row if flip & 1 else row
+                c = cols - 1 - col if flip & 2 else col
+                if (r, c) in spec.starts:
+                    del queue.boards[index]
+                    queue.hits += 1
+                    self.poll()
+                    return BoardSpec(spec.seed, spec.row, spec.col, flip)
+        queue.misses += 1
+        return None
+
+    def metrics(self, rows, cols, mine_count, topology=SQUARE):
+        """队列的统计：depth/target 当前和目标深度，running 进行中的任务，
+        rate 每个工作进程每秒生成的棋盘数，attempts_per_board 平均候选数，
+        hits/misses 第一次点击时队列里有没有合适的棋盘；不在后台生成时返回None
+        """
+        queue = self.queues.get((rows, cols, mine_count, topology))
+        if queue is None or not self.background:
+            return None
+        return {
+            'depth': len(queue.boards),
+            'target': self.depth,
+            'running': len(queue.running),
+            'generated': queue.generated,
+            'rate': queue.generated / queue.busy_time if queue.busy_time else 0.0,
+            'attempts_per_board': queue.attempts / queue.generated if queue.generated else 0.0,
+            'hits': queue.hits,
+            'misses': queue.misses,
+        }
+
+    def shutdown(self):
+        """停止工作进程，丢弃没完成的任务"""
+        if self.executor is not None:
+            self.executor.shutdown(wait=False, cancel_futures=True)
+            self.executor = None
+        for queue in self.queues.values():
+            queue.running.clear()
@@ -0,0 +1,387 @@
+"""扫雷求解器：按玩家看到的局面计算每个未揭开格子是地雷的概率
+
+只读取已揭开格子的数字，旗子和问号当作未揭开（玩家可能标错）。
+
+1. 约束传播：每个数字给出"周围未揭开格子里有几个雷"的约束。数字已满足
+   （剩余0个雷）或剩余格子全是雷时直接确定；一个约束的格子是另一个的子集
+   时两者相减得到新约束。反复进行直到没有新的结论。
+2. 剩下的边界格子（挨着数字的格子）按所属的约束分组，属于同样约束的格子
+   可以互换，只需要决定每组有几个雷（组合数计权）。通过共享约束连在一起
+   的组构成一个连通分量，分量之间互不影响，分别穷举。
+3. 各分量按雷数合并，再乘以剩下的雷落在其它（不挨着数字的）格子里的
+   组合数，得到与总雷数一致的精确概率。
+
+分量太大、穷举超过 ENUMERATION_LIMIT 个节点时改为随机抽样估计，
+结果的 exact 为False。高级棋盘上一次分析通常只需要几毫秒。
+
+    analysis = analyze(game.cells, game.rows, game.cols, game.mine_count, topology=game.topology)
+    cell, p = analysis.best_move()
+"""
+import math
+import random
+from collections import defaultdict
+
+from minesweeper_board import MINE, REVEALED, STATE_MASK, VALUE_MASK, count_state, open_cells
+from minesweeper_topology import SQUARE
+
+# 穷举一个连通分量时最多搜索的节点数，超过后改为抽样
+ENUMERATION_LIMIT = 200000
+# 抽样估计时每个分量的样本数，以及每个样本最多搜索的节点数
+SAMPLES = 200
+SAMPLE_LIMIT = 5000
+
+
+class _Exhausted(Exception):
+    """搜索超过了节点数限制"""
+
+
+class Analysis:
+    """analyze() 的结果
+
+    safe / mines: 一定安全 / 一定是地雷的边界格子 (行, 列)
+    probabilities: 边界格子是地雷的概率
+    interior: 其它未揭开格子（不挨着任何数字）是地雷的概率，它们之间没有区别
+    interior_cell: 其中的一个格子，没有时为None
+    exact: False 表示有分量太大，概率是抽样估计的
+    """
+
+    def __init__(self, safe, mines, probabilities, interior, interior_cell, exact):
+        self.safe = safe
+        self.mines = mines
+        self.probabilities = probabilities
+        self.interior = interior
+        self.interior_cell = interior_cell
+        self.exact = exact
+
+    def probability(self, row, col):
+        """未揭开的格子是地雷的概率"""
+        return self.probabilities.get((row, col), self.interior)
+
+    def best_move(self):
+        """最安全的格子和它是地雷的概率，一定安全的格子优先；没有未揭开的格子时返回None"""
+        if self.safe:
+            return min(self.safe), 0.0
+        candidates = [(p, cell) for cell, p in self.probabilities.items() if cell not in self.mines]
+        if self.interior_cell is not None:
+            candidates.append((self.interior, self.interior_cell))
+        if not candidates:
+            return None
+        p, cell = min(candidates)
+        return cell, p
+
+
+def analyze(board, rows, cols, mine_count, rng=None, topology=SQUARE):
+    """分析局面；board 是格子字节（格式见minesweeper_board.py），rng用于抽样（默认固定种子）"""
+    # 每个数字的约束：周围未揭开的格子里有几个雷
+    constraints = {}
+    hidden_count = len(board) - count_state(board, REVEALED)
+    neighbors = topology.neighbors(rows, cols)
+    table, k = neighbors.table, neighbors.k
+    for index, cell in enumerate(board):
+        # 只看已揭开的数字（已揭开的地雷只在输了以后出现）
+        if cell & STATE_MASK != REVEALED or cell & VALUE_MASK in (0, MINE):
+            continue
+        cells = frozenset(divmod(i, cols) for i in table[index * k:index * k + k]
+                          if i >= 0 and board[i] & STATE_MASK != REVEALED)
+        if cells:
+            constraints[cells] = cell & VALUE_MASK
+
+    frontier = set()
+    for cells in constraints:
+        frontier.update(cells)
+    known = {}
+    constraints = _propagate(constraints, known)
+
+    probabilities = {cell: float(mine) for cell, mine in known.items()}
+    safe = {cell for cell, mine in known.items() if not mine}
+    mines = {cell for cell, mine in known.items() if mine}
+    remaining = mine_count - len(mines)
+    interior_count = hidden_count - len(frontier)
+
+    components = [_solve_component(groups, group_constraints, needs, rng)
+                  for groups, group_constraints, needs in _components(constraints)]
+    exact = all(component[3] for component in components)
+
+    # 按雷数合并各分量：full[k] 是分量里一共k个雷的（对数）权重
+    prefix = [{0: 0.0}]
+    for component in components:
+        prefix.append(_convolve(prefix[-1], component[1]))
+    suffix = [{0: 0.0}]
+    for component in reversed(components):
+        suffix.append(_convolve(suffix[-1], component[1]))
+    suffix.reverse()
+    full = prefix[-1]
+
+    # 剩下的雷落在其它格子里的组合数
+    def rest(k):
+        return _log_comb(interior_count, remaining - k)
+
+    total = _log_sum(weight + rest(k) for k, weight in full.items() if rest(k) is not None)
+    if total is None:
+        # 局面与总雷数矛盾（不应该发生），退回平均密度
+        density = remaining / max(hidden_count - len(known), 1)
+        for component in components:
+            for cells in component[0]:
+                for cell in cells:
+                    probabilities[cell] = density
+        return Analysis(safe, mines, probabilities, density,
+                        _interior_cell(board, cols, frontier), False)
+
+    for index, (groups, weights, expected, component_exact) in enumerate(components):
+        others = _convolve(prefix[index], suffix[index + 1])
+        # 这个分量有k个雷时，其它部分的总权重
+        joint = {}
+        for k, weight in weights.items():
+            tail = _log_sum(other + rest(k + ko) for ko, other in others.items()
+                            if rest(k + ko) is not None)
+            if tail is not None:
+                joint[k] = math.exp(weight + tail - total)
+        for g, cells in enumerate(groups):
+            size = len(cells)
+            p = sum(share * expected[k][g] for k, share in joint.items()) / size
+            if component_exact and all(expected[k][g] == 0 for k in joint):
+                p = 0.0
+                safe.update(cells)
+            elif component_exact and all(expected[k][g] == size for k in joint):
+                p = 1.0
+                mines.update(cells)
+            for cell in cells:
+                probabilities[cell] = p
+
+    interior = 0.0
+    if interior_count:
+        interior = sum(math.exp(weight + rest(k) - total) * (remaining - k)
+                       for k, weight in full.items() if rest(k) is not None) / interior_count
+    interior_cell = _interior_cell(board, cols, frontier) if interior_count else None
+    return Analysis(safe, mines, probabilities, interior, interior_cell, exact)
+
+
+def _propagate(constraints, known):
+    """约束传播，确定的格子写进known（格子 -> 0/1），返回剩下的约束"""
+    while True:
+        reduced = {}
+        progress = False
+        for cells, mines in constraints.items():
+            if any(cell in known for cell in cells):
+                mines -= sum(known.get(cell, 0) for cell in cells)
+                cells = frozenset(cell for cell in cells if cell not in known)
+                if not cells:
+                    continue
+            if mines == 0 or mines == len(cells):
+                value = 1 if mines else 0
+                for cell in cells:
+                    known[cell] = value
+                progress = True
+                continue
+            reduced[cells] = mines
+        constraints = reduced
+        if progress:
+            continue
+
+        # 子集规则：A是B的子集时，B - A 里有 mines(B) - mines(A) 个雷
+        by_cell = defaultdict(list)
+        for cells in constraints:
+            for cell in cells:
+                by_cell[cell].append(cells)
+        derived = {}
+        for small, mines in constraints.items():
+            for large in by_cell[next(iter(small))]:
+                if len(large) > len(small) and small < large:
+                    difference = large - small
+                    if difference not in constraints:
+                        derived[difference] = constraints[large] - mines
+        if not derived:
+            return constraints
+        constraints.update(derived)
+
+
+def _components(constraints):
+    """把约束按共享的格子分成连通分量
+
+    每个分量返回 (组, 每组所属的约束编号, 每个约束的雷数)，组是属于同样
+    约束的格子列表，按广度优先的顺序排列，这样穷举时约束能尽早检查。
+    """
+    constraint_list = list(constraints.items())
+    membership = defaultdict(list)
+    for index, (cells, _) in enumerate(constraint_list):
+        for cell in cells:
+            membership[cell].append(index)
+    groups_by_key = defaultdict(list)
+    for cell in sorted(membership):
+        groups_by_key[tuple(membership[cell])].append(cell)
+    groups_of = defaultdict(list)
+    for key in groups_by_key:
+        for index in key:
+            groups_of[index].append(key)
+
+    seen = set()
+    for start in groups_by_key:
+        if start in seen:
+            continue
+        seen.add(start)
+        order = [start]
+        for key in order:
+            for index in key:
+                for neighbor in groups_of[index]:
+                    if neighbor not in seen:
+                        seen.add(neighbor)
+                        order.append(neighbor)
+        indexes = sorted({index for key in order for index in key})
+        local = {index: i for i, index in enumerate(indexes)}
+        yield ([groups_by_key[key] for key in order],
+               [[local[index] for index in key] for key in order],
+               [constraint_list[index][1] for index in indexes])
+
+
+def _solve_component(groups, group_constraints, needs, rng):
+    """穷举（或抽样）一个分量，返回 (组, {雷数: 对数权重}, {雷数: 每组的期望雷数}, 是否精确)"""
+    sizes = [len(cells) for cells in groups]
+    totals = defaultdict(int)
+    sums = defaultdict(lambda: [0] * len(groups))
+
+    def record(assigned, weight=None):
+        if weight is None:
+            weight = 1
+            for size, j in zip(sizes, assigned):
+                weight *= math.comb(size, j)
+        k = sum(assigned)
+        totals[k] += weight
+        row = sums[k]
+        for g, j in enumerate(assigned):
+            row[g] += weight * j
+
+    exact = True
+    try:
+        for assigned in _search(sizes, group_constraints, list(needs), ENUMERATION_LIMIT):
+            record(assigned)
+    except _Exhausted:
+        exact = False
+        totals.clear()
+        sums.clear()
+        rng = rng or random.Random(0)
+        for _ in range(SAMPLES):
+            try:
+                assigned = next(_search(sizes, group_constraints, list(needs), SAMPLE_LIMIT, rng), None)
+            except _Exhausted:
+                continue
+            if assigned is not None:
+                record(assigned)
+        if not totals:
+            # 一个样本也没找到：各组按约束的平均密度估计
+            density = sum(needs) / max(sum(len(cells) for cells in groups), 1)
+            k = round(density * sum(sizes))
+            totals[k] = 1
+            sums[k] = [density * size for size in sizes]
+
+    weights = {k: math.log(weight) for k, weight in totals.items()}
+    expected = {k: [s / totals[k] for s in sums[k]] for k in totals}
+    return groups, weights, expected, exact
+
+
+def _search(sizes, group_constraints, need, limit, rng=None):
+    """依次决定每组的雷数，生成所有满足约束的分配（生成的列表会被复用）
+
+    need[i] 是第i个约束还差的雷数，left[i] 是它还没决定的格子数。
+    每组的雷数限制在 [need - (left - 组大小), need] 里，最后一组决定后
+    约束正好满足。rng不为None时随机选择取值的顺序（抽样用）。
+    """
+    n = len(sizes)
+    left = [0] * len(need)
+    for size, keys in zip(sizes, group_constraints):
+        for i in keys:
+            left[i] += size
+    assigned = [0] * n
+    applied = [False] * n
+    pending = [None] * n
+    nodes = 0
+
+    def candidates(g):
+        size = sizes[g]
+        low, high = 0, size
+        for i in group_constraints[g]:
+            high = min(high, need[i])
+            low = max(low, need[i] - (left[i] - size))
+        values = list(range(low, high + 1))
+        if rng is not None:
+            rng.shuffle(values)
+        return values
+
+    g = 0
+    pending[0] = candidates(0)
+    while g >= 0:
+        size = sizes[g]
+        if applied[g]:
+            j = assigned[g]
+            for i in group_constraints[g]:
+                need[i] += j
+                left[i] += size
+            applied[g] = False
+        if not pending[g]:
+            g -= 1
+            continue
+        nodes += 1
+        if nodes > limit:
+            raise _Exhausted
+        j = pending[g].pop()
+        for i in group_constraints[g]:
+            need[i] -= j
+            left[i] -= size
+        assigned[g] = j
+        applied[g] = True
+        if g + 1 == n:
+            yield assigned
+        else:
+            g += 1
+            pending[g] = candidates(g)
+
+
+def _interior_cell(board, cols, frontier):
+    """一个不挨着数字的未揭开格子"""
+    for index, cell in enumerate(board):
+        if cell & STATE_MASK != REVEALED and divmod(index, cols) not in frontier:
+            return divmod(index, cols)
+    return None
+
+
+def _log_comb(n, k):
+    """log(C(n, k))，k超出范围时返回None"""
+    if k < 0 or k > n:
+        return None
+    return math.lgamma(n + 1) - math.lgamma(k + 1) - math.lgamma(n - k + 1)
+
+
+def _log_sum(values):
+    """log(sum(exp(v)))，没有值时返回None"""
+    values = list(values)
+    if not values:
+        return None
+    top = max(values)
+    return top + math.log(sum(math.exp(v - top) for v in values))
+
+
+def _convolve(a, b):
+    """两个 {雷数: 对数权重} 分布相加"""
+    out = defaultdict(list)
+    for ka, wa in a.items():
+        for kb, wb in b.items():
+            out[ka + kb].append(wa + wb)
+    return {k: _log_sum(values) for k, values in out.items()}
+
+
+def solve_without_guessing(board, rows, cols, mine_count, row, col, topology=SQUARE):
+    """从 (row, col) 开始只靠推理能否揭开所有安全格子（board是新生成的格子字节，不会被修改）"""
+    board = bytearray(board)
+    hidden = rows * cols - len(open_cells(board, rows, cols, row * cols + col, topology))
+    while hidden > mine_count:
+        analysis = analyze(board, rows, cols, mine_count, topology=topology)
+        cells = analysis.safe
+        if not cells and analysis.interior == 0 and analysis.interior_cell is not None:
+            # 剩下的雷都在边界上，其它格子都安全
+            cells = [analysis.interior_cell]
+        if not cells:
+            return False
+        for r, c in cells:
+            index = r * cols + c
+            if board[index] & STATE_MASK != REVEALED:
+                hidden -= len(open_cells(board, rows, cols, index, topology))
+    return True
@@ -0,0 +1,203 @@
+"""扫雷棋盘的难度统计：3BV 和开口数
+
+3BV（Bechtel's Board Benchmark Value）是不插旗通关最少要点的次数：
+每个开口（连成一片的空白格子，点其中一个就会连同边上的数字一起展开）
+算一次，再加上不挨着任何开口的数字格子各一次。通关时间相同的两局，
+3BV越大说明玩得越快，所以赢了以后显示 3BV 和 3BV/s。
+
+board_stats() 统计一局的棋盘：在只有数字的副本上反复用 bytes.find
+找下一个没展开的空白格，用 minesweeper_board.open_cells 展开，
+最后剩下的未揭开安全格子就是孤立的数字。
+
+batch_stats() 用numpy一次统计一批同样大小的棋盘：空白格的连通分量
+用数组上的并查集标号（所有相邻空白格之间的边一起把大的根挂到小的根下，
+再让每个格子直接指向根，几轮就收敛），不需要逐格的Python循环。
+run_batch() 把一段种子分块交给进程池，结果按列存成 .npz，用来研究
+棋盘难度的分布、挑选或过滤棋盘：
+
+    python minesweeper_stats.py 16x30:99 --count 1000000 --out expert.npz
+
+种子与 minesweeper_board.seeded_board() 的一致，第一次点击默认在棋盘中间，
+所以 configure('board:种子:行:列:0') 可以在游戏里玩到统计过的任意一个棋盘。
+批量统计需要numpy。
+"""
+import argparse
+import multiprocessing as mp
+import os
+import random
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from minesweeper_board import MINE, covered_safe_count, open_cells, sample_mines, values
+from minesweeper_topology import SQUARE, TOPOLOGIES, get_topology
+
+try:
+    import numpy as np
+except ImportError:  # numpy是可选依赖，只有批量统计需要
+    np = None
+
+# 每个任务统计的棋盘数
+CHUNK = 2000
+# .npz 里每个棋盘一行的列
+COLUMNS = ('seed', 'bbbv', 'openings', 'isolated')
+
+
+def board_stats(cells, rows, cols, topology=SQUARE):
+    """一个棋盘的 {'bbbv': 3BV, 'openings': 开口数, 'isolated': 不挨着开口的数字格子数}
+
+    cells 是格子字节（状态位不影响结果）。
+    """
+    work = values(cells)
+    openings = 0
+    index = work.find(0)
+    while index >= 0:
+        # 展开后这个开口里的空白格都带上了揭开位，不会再被找到
+        open_cells(work, rows, cols, index, topology)
+        openings += 1
+        index = work.find(0, index + 1)
+    isolated = covered_safe_count(work)
+    return {'bbbv': openings + isolated, 'openings': openings, 'isolated': isolated}
+
+
+def batch_stats(boards, rows, cols, topology=SQUARE):
+    """一批棋盘的统计，boards 是 (棋盘数, rows * cols) 的uint8数组（只有数字，没有状态位）
+
+    返回与 board_stats() 同名的列，每列是一个长度为棋盘数的int32数组。
+    """
+    count = len(boards)
+    grid = boards.reshape(count, rows, cols)
+    zero = grid == 0
+
+    # 挨着空白格的格子（包括空白格自己）
+    near = zero | (topology.count(zero) > 0)
+    isolated = (~near & (grid != MINE)).sum(axis=(1, 2), dtype=np.int32)
+
+    # 空白格之间的边，两端换成空白格的序号
+    cells = np.flatnonzero(zero)
+    order = np.full(zero.size, -1, dtype=np.int64)
+    order[cells] = np.arange(len(cells))
+    first, second = _edges(topology, rows, cols)
+    shift = (np.arange(count, dtype=np.int64) * (rows * cols))[:, None]
+    heads = order[first + shift]
+    tails = order[second + shift]
+    both = (heads >= 0) & (tails >= 0)
+    heads = heads[both]
+    tails = tails[both]
+
+    # 并查集：每条边把两端的根里编号大的挂到小的下面，再让每个格子直接指向根，
+    # 重复到所有边的两端都在同一个根下
+    parent = np.arange(len(cells))
+    while True:
+        a, b = parent[heads], parent[tails]
+        apart = a != b
+        if not apart.any():
+            break
+        np.minimum.at(parent, np.maximum(a, b)[apart], np.minimum(a, b)[apart])
+        while True:
+            grand = parent[parent]
+            if np.array_equal(grand, parent):
+                break
+            parent = grand
+    roots = cells[parent == np.arange(len(cells))]
+    openings = np.bincount(roots // (rows * cols), minlength=count).astype(np.int32)
+    return {'bbbv': openings + isolated, 'openings': openings, 'isolated': isolated}
+
+
+def _edges(topology, rows, cols):
+    """一个棋盘上所有相邻格子对 (编号小的, 编号大的)，两个numpy数组"""
+    table = topology.neighbors(rows, cols).take(np.arange(rows * cols))
+    first = np.broadcast_to(np.arange(rows * cols).reshape(-1, 1), table.shape)
+    # 每对只取一次；补位的-1小于任何编号，也一起去掉
+    keep = table > first
+    return first[keep].astype(np.int64), table[keep].astype(np.int64)
+
+
+def seeded_stats(rows, cols, mine_count, seeds, safe_cell=None, topology=SQUARE):
+    """按种子生成棋盘（第一次点击在safe_cell，默认棋盘中间）并统计，返回 COLUMNS 各列"""
+    row, col = safe_cell if safe_cell is not None else (rows // 2, cols // 2)
+    seeds = list(seeds)
+    boards = seeded_boards(rows, cols, mine_count, seeds, row, col, topology)
+    columns = batch_stats(boards, rows, cols, topology)
+    columns['seed'] = np.array(seeds, dtype=np.int64)
+    return columns
+
+
+def seeded_boards(rows, cols, mine_count, seeds, safe_row, safe_col, topology=SQUARE):
+    """与 seeded_board(..., seed) 相同的一批棋盘，返回 (棋盘数, rows * cols) 的uint8数组
+
+    地雷位置仍然逐个种子抽样，周围的地雷数对整批棋盘一起算。
+    """
+    mask = np.zeros((len(seeds), rows * cols), dtype=np.uint8)
+    for k, seed in enumerate(seeds):
+        mask[k, sample_mines(rows, cols, mine_count, safe_row, safe_col, random.Random(seed), topology)] = 1
+    mask = mask.reshape(len(seeds), rows, cols)
+    counts = topology.count(mask)
+    return np.where(mask, np.uint8(MINE), counts).reshape(len(seeds), rows * cols)
+
+
+def run_batch(rows, cols, mine_count, count, first_seed=0, safe_cell=None, workers=None, chunk=CHUNK,
+              topology=SQUARE):
+    """统计种子 first_seed .. first_seed + count - 1 的棋盘，返回按种子排列的 COLUMNS 各列"""
+    if np is None:
+        raise ImportError("batch board statistics need numpy")
+    starts = range(first_seed, first_seed + count, chunk)
+    ranges = [range(start, min(start + chunk, first_seed + count)) for start in starts]
+    workers = workers or os.cpu_count() or 1
+    if workers == 1 or len(ranges) == 1:
+        parts = [seeded_stats(rows, cols, mine_count, seeds, safe_cell, topology) for seeds in ranges]
+    else:
+        with ProcessPoolExecutor(workers, mp_context=mp.get_context()) as executor:
+            tasks = [(rows, cols, mine_count, seeds, safe_cell, topology) for seeds in ranges]
+            parts = list(executor.map(seeded_stats, *zip(*tasks)))
+    return {name: np.concatenate([part[name] for part in parts]) for name in COLUMNS}
+
+
+def save_columns(path, columns, rows, cols, mine_count, safe_cell=None, topology=SQUARE):
+    """把 run_batch() 的结果存成 .npz，棋盘大小、拓扑和第一次点击的位置一起存进去"""
+    row, col = safe_cell if safe_cell is not None else (rows // 2, cols // 2)
+    np.savez(path, rows=rows, cols=cols, mines=mine_count, safe_row=row, safe_col=col,
+             topology=topology.name, **{name: columns[name] for name in COLUMNS})
+
+
+def summarize(columns):
+    """每列的最小值、百分位数和最大值，用来打印分布"""
+    lines = []
+    for name in COLUMNS[1:]:
+        column = columns[name]
+        p5, p50, p95 = np.percentile(column, (5, 50, 95))
+        lines.append(f"{name:<9} mean {column.mean():7.2f}  min {column.min():4d}  "
+                     f"p5 {p5:6.1f}  p50 {p50:6.1f}  p95 {p95:6.1f}  max {column.max():4d}")
+    return '\n'.join(lines)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Minesweeper 3BV / openings statistics over seeded boards")
+    parser.add_argument('board', nargs='?', default='16x30:99', help="board as ROWSxCOLS:MINES")
+    parser.add_argument('--count', type=int, default=100000, help="number of boards")
+    parser.add_argument('--first-seed', type=int, default=0, help="first board seed")
+    parser.add_argument('--topology', choices=sorted(TOPOLOGIES), default='square', help="board topology")
+    parser.add_argument('--workers', type=int, help="worker processes (default: CPU count)")
+    parser.add_argument('--out', metavar='FILE', help="write the columns to a .npz file")
+    args = parser.parse_args(argv)
+
+    size, mines = args.board.split(':')
+    rows, cols = (int(value) for value in size.lower().split('x'))
+    mines = int(mines)
+    topology = get_topology(args.topology)
+
+    start = time.perf_counter()
+    columns = run_batch(rows, cols, mines, args.count, args.first_seed, workers=args.workers,
+                        topology=topology)
+    elapsed = time.perf_counter() - start
+    print(f"{args.count} {topology.name} boards {rows}x{cols}:{mines} in {elapsed:.1f} s "
+          f"({args.count / elapsed:,.0f} boards/s)")
+    print(summarize(columns))
+    if args.out:
+        save_columns(args.out, columns, rows, cols, mines, topology=topology)
+        print(f"Columns written to {args.out}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,281 @@
+"""扫雷棋盘的拓扑：哪些格子互相相邻
+
+- square: 普通的方格棋盘，每个格子有8个邻居（边上的少一些）
+- torus: 上下、左右边缘相连的方格棋盘，每个格子都有8个邻居
+- hex: 六边形棋盘，画成奇数行右移半格的"砖墙"，每个格子有6个邻居：
+  左右两个，上下两行各两个（偶数行是左上、正上，奇数行是正上、右上）
+
+所有遍历邻居的代码（放雷时的数字、展开空白格、求解器的约束、3BV统计）
+都通过 neighbors(rows, cols) 取得邻居表。格子数不超过 TABLE_CELLS 时是
+NeighborTable：一张扁平的int表（array('i')），格子编号 row * cols + col
+的邻居在 table[index * k:(index + 1) * k]，k是每个格子最多的邻居数，
+边上不足k个时后面补-1。热点循环直接切片这张表，遇到-1就停，不再有
+边界判断。表有numpy时直接按int32整块生成，每个格子占 4 * k 字节
+（26万格子约8MB），只缓存最近的一张。
+
+更大的自定义棋盘（百万格子的整张表要32MB以上，生成也要时间）改用
+LazyNeighbors：接口相同，但 table 的每次切片现算这个格子的邻居，
+take() 按偏移对一批格子向量化计算，不占与格子数成正比的内存。
+
+count(mask) 用numpy统计每个格子周围有几个 mask 为真的格子（大棋盘的数字、
+批量统计），只看最后两维，前面可以有批量的维度。
+"""
+from array import array
+from functools import lru_cache
+
+# 整张邻居表最多保存的格子数
+TABLE_CELLS = 1 << 18
+
+try:
+    import numpy as np
+except ImportError:  # numpy是可选依赖，count()需要，邻居表没有numpy时逐个格子计算
+    np = None
+
+
+class Topology:
+    """棋盘拓扑的基类，子类实现 around()、offsets() 和 count()
+
+    code 是存档里的编号；stagger 为True时奇数行向右错开半格绘制；
+    flips 是翻转后仍然是合法棋盘的翻转方式（见minesweeper_board.seeded_board）；
+    wrap 为True时边缘相连（邻居表的偏移按行、列数取模）。
+    """
+
+    name = None
+    code = None
+    stagger = False
+    flips = (0, 1, 2, 3)
+    wrap = False
+
+    def check(self, rows, cols):
+        """棋盘大小不适合这种拓扑时抛出ValueError"""
+        if rows < 1 or cols < 1:
+            raise ValueError(f"invalid board size {rows}x{cols}")
+
+    def around(self, rows, cols, index):
+        """格子index的邻居编号（不含自己，没有重复）"""
+        raise NotImplementedError
+
+    def offsets(self, row):
+        """第row行的格子的邻居偏移 ((行, 列), ...)，顺序与 around() 相同"""
+        raise NotImplementedError
+
+    def count(self, mask):
+        """numpy: 每个格子的邻居里mask为真的个数（uint8，最后两维是行、列）"""
+        raise NotImplementedError
+
+    @lru_cache(maxsize=1)
+    def neighbors(self, rows, cols):
+        """邻居表（NeighborTable 或大棋盘上的 LazyNeighbors），见模块说明"""
+        if rows * cols > TABLE_CELLS:
+            return LazyNeighbors(self, rows, cols)
+        k = len(self.offsets(0))
+        table = array('i')
+        if np is None:
+            for index in range(rows * cols):
+                around = self.around(rows, cols, index)
+                table.extend(around)
+                table.extend([-1] * (k - len(around)))
+            return NeighborTable(table, k)
+
+        # 四周补一圈（边缘相连时补对边的格子，否则补-1），每个偏移就是一个切片
+        ids = np.arange(rows * cols, dtype=np.intc).reshape(rows, cols)
+        if self.wrap:
+            padded = np.pad(ids, 1, mode='wrap')
+        else:
+            padded = np.pad(ids, 1, constant_values=-1)
+        grid = np.empty((rows, cols, k), dtype=np.intc)
+        for parity in (0, 1):
+            # 偏移可能随行的奇偶变化（六边形）
+            for j, (dr, dc) in enumerate(self.offsets(parity)):
+                grid[parity::2, :, j] = padded[1 + dr:1 + dr + rows, 1 + dc:1 + dc + cols][parity::2]
+        if not self.wrap:
+            # 只有边上的格子缺邻居：把它们的-1挪到末尾，其余邻居保持 around() 的顺序
+            edge = np.unique(np.concatenate((ids[0], ids[-1], ids[:, 0], ids[:, -1])))
+            flat = grid.reshape(-1, k)
+            part = flat[edge]
+            flat[edge] = np.take_along_axis(part, np.argsort(part < 0, axis=1, kind='stable'), axis=1)
+        table.frombytes(memoryview(grid).cast('B'))
+        return NeighborTable(table, k)
+
+    def zone(self, rows, cols, index):
+        """格子及其邻居，按编号排好序（第一次点击的安全区）"""
+        # 只要一个格子，不为它建整张邻居表
+        return sorted((index, *self.around(rows, cols, index)))
+
+    def __repr__(self):
+        return f"<Topology {self.name}>"
+
+    def __reduce__(self):
+        # 传给工作进程后仍然是同一个实例（邻居表的缓存按实例保存）
+        return get_topology, (self.name,)
+
+
+class NeighborTable:
+    """扁平的邻居表：table 是 array('i')，格子index的邻居在
+    table[index * k:(index + 1) * k]，不足k个时后面是-1
+
+    热点循环直接切片 table；neighbors[index] 返回去掉-1的邻居列表，
+    给不在乎这点开销的代码用。
+    """
+
+    def __init__(self, table, k):
+        self.table = table
+        self.k = k
+
+    def __len__(self):
+        return len(self.table) // self.k
+
+    def __getitem__(self, index):
+        base = index * self.k
+        return [i for i in self.table[base:base + self.k] if i >= 0]
+
+    def take(self, indexes):
+        """numpy: 这些格子的邻居，形状为 (len(indexes), k)，-1表示没有"""
+        return np.frombuffer(self.table, dtype=np.intc).reshape(-1, self.k)[indexes]
+
+
+class LazyNeighbors:
+    """大棋盘的邻居表：接口与 NeighborTable 相同，用到时才计算
+
+    table[index * k:(index + 1) * k] 返回格子index的邻居（没有补位的-1）。
+    """
+
+    def __init__(self, topology, rows, cols):
+        self.topology = topology
+        self.rows = rows
+        self.cols = cols
+        self.k = len(topology.offsets(0))
+        self.table = _LazyTable(self)
+
+    def __len__(self):
+        return self.rows * self.cols
+
+    def __getitem__(self, index):
+        return self.topology.around(self.rows, self.cols, index)
+
+    def take(self, indexes):
+        """numpy: 这些格子的邻居，形状为 (len(indexes), k)，-1表示没有"""
+        rows, cols, topology = self.rows, self.cols, self.topology
+        r, c = np.divmod(np.asarray(indexes), cols)
+        parity = r & 1
+        result = np.empty((len(r), self.k), dtype=np.intp)
+        for j in range(self.k):
+            dr = np.array([topology.offsets(0)[j][0], topology.offsets(1)[j][0]])[parity]
+            dc = np.array([topology.offsets(0)[j][1], topology.offsets(1)[j][1]])[parity]
+            nr, nc = r + dr, c + dc
+            if topology.wrap:
+                result[:, j] = nr % rows * cols + nc % cols
+            else:
+                result[:, j] = np.where((0 <= nr) & (nr < rows) & (0 <= nc) & (nc < cols), nr * cols + nc, -1)
+        return result
+
+
+class _LazyTable:
+    """LazyNeighbors.table：按 NeighborTable.table 的切片方式访问"""
+
+    def __init__(self, neighbors):
+        self.neighbors = neighbors
+
+    def __getitem__(self, key):
+        return self.neighbors[key.start // self.neighbors.k]
+
+
+def _window_sum(mask, offsets):
+    """numpy: 把mask按offsets里的 (行, 列) 偏移错开后相加（超出边界的部分为0）"""
+    rows, cols = mask.shape[-2:]
+    pad = [(0, 0)] * (mask.ndim - 2) + [(1, 1), (1, 1)]
+    padded = np.pad(mask.astype(np.uint8), pad)
+    counts = np.zeros(mask.shape, dtype=np.uint8)
+    for dr, dc in offsets:
+        counts += padded[..., 1 + dr:1 + dr + rows, 1 + dc:1 + dc + cols]
+    return counts
+
+
+_AROUND = tuple((dr, dc) for dr in (-1, 0, 1) for dc in (-1, 0, 1) if dr or dc)
+
+
+class Square(Topology):
+    name = 'square'
+    code = 0
+
+    def offsets(self, row):
+        return _AROUND
+
+    def around(self, rows, cols, index):
+        r, c = divmod(index, cols)
+        if 0 < r < rows - 1 and 0 < c < cols - 1:
+            return (index - cols - 1, index - cols, index - cols + 1, index - 1,
+                    index + 1, index + cols - 1, index + cols, index + cols + 1)
+        return tuple(nr * cols + nc
+                     for nr in range(max(r - 1, 0), min(r + 2, rows))
+                     for nc in range(max(c - 1, 0), min(c + 2, cols))
+                     if nr != r or nc != c)
+
+    def count(self, mask):
+        return _window_sum(mask, _AROUND)
+
+
+class Torus(Topology):
+    name = 'torus'
+    code = 1
+    wrap = True
+
+    def check(self, rows, cols):
+        # 小于3时同一个格子会从两边各算一次
+        if rows < 3 or cols < 3:
+            raise ValueError(f"a torus board needs at least 3x3 cells, not {rows}x{cols}")
+
+    def offsets(self, row):
+        return _AROUND
+
+    def around(self, rows, cols, index):
+        r, c = divmod(index, cols)
+        return tuple((r + dr) % rows * cols + (c + dc) % cols for dr, dc in _AROUND)
+
+    def count(self, mask):
+        counts = np.zeros(mask.shape, dtype=np.uint8)
+        cells = mask.astype(np.uint8)
+        for dr, dc in _AROUND:
+            counts += np.roll(cells, (-dr, -dc), axis=(-2, -1))
+        return counts
+
+
+# 六边形棋盘上偶数行、奇数行的邻居偏移
+_HEX_EVEN = ((-1, -1), (-1, 0), (0, -1), (0, 1), (1, -1), (1, 0))
+_HEX_ODD = ((-1, 0), (-1, 1), (0, -1), (0, 1), (1, 0), (1, 1))
+
+
+class Hex(Topology):
+    name = 'hex'
+    code = 2
+    stagger = True
+    # 翻转会改变哪些行错开，翻转后的数字不对
+    flips = (0,)
+
+    def offsets(self, row):
+        return _HEX_ODD if row & 1 else _HEX_EVEN
+
+    def around(self, rows, cols, index):
+        r, c = divmod(index, cols)
+        return tuple((r + dr) * cols + c + dc for dr, dc in (_HEX_ODD if r & 1 else _HEX_EVEN)
+                     if 0 <= r + dr < rows and 0 <= c + dc < cols)
+
+    def count(self, mask):
+        counts = _window_sum(mask, _HEX_EVEN)
+        counts[..., 1::2, :] = _window_sum(mask, _HEX_ODD)[..., 1::2, :]
+        return counts
+
+
+SQUARE = Square()
+TORUS = Torus()
+HEX = Hex()
+TOPOLOGIES = {topology.name: topology for topology in (SQUARE, TORUS, HEX)}
+BY_CODE = {topology.code: topology for topology in TOPOLOGIES.values()}
+
+
+def get_topology(name):
+    """按名字取拓扑，没有时抛出ValueError"""
+    try:
+        return TOPOLOGIES[name]
+    except KeyError:
+        raise ValueError(f"unknown board topology {name!r}") from None
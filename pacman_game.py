@@ -1,17 +1,33 @@
 import pygame
 import sys
 
-class PacManGame:
-    def __init__(self):
+from frame_profiler import FrameProfiler
+from game_loop import DISPLAY_FPS, FixedTimestep, lerp_position
+from game_api import HeadlessGame
+from game_ui import Label, blit_text, draw_overlay
+from sprites import bake
+
+class PacManGame(HeadlessGame):
+    TITLE = "👻 Pac-Man"
+    HIDDEN = True  # 有bug，暂不在启动器中显示
+
+    def __init__(self, headless=False, seed=None):
         pygame.init()
+        # 游戏自己的随机数流，seed为None时随机选择（录制时会保存下来）
+        self.seed_rng(seed)
         self.TILE_SIZE = 40
-        self.FPS = 10
+        self.FPS = 10  # 逻辑频率（每秒走几格），画面按DISPLAY_FPS插值绘制
         self.SCREEN_WIDTH = 600
         self.SCREEN_HEIGHT = 480
-        self.screen = pygame.display.set_mode((self.SCREEN_WIDTH, self.SCREEN_HEIGHT))
-        pygame.display.set_caption("Pac-Man - Use Arrow Keys | ESC to Exit")
+        self.screen = self.setup_screen((self.SCREEN_WIDTH, self.SCREEN_HEIGHT),
+                                        "Pac-Man - Use Arrow Keys | ESC to Exit",
+                                        headless)
         self.clock = pygame.time.Clock()
-        self.font = pygame.font.SysFont(None, 36)
+        self.score_label = Label(36, (255, 255, 255))
+
+        # 帧剖析器（默认关闭，F9开关，F10导出）
+        self.profiler = FrameProfiler(type(self).__name__)
+        self.profiler.instrument(self, 'move_ghosts', 'check_collisions')
 
         # 颜色定义
         self.BLACK = (0, 0, 0)
@@ -43,12 +59,15 @@ class PacManGame:
         ]
         self.rows = len(self.game_map)
         self.cols = len(self.game_map[0])
+        # 保存初始地图，重置时恢复豆子
+        self.initial_map = [row[:] for row in self.game_map]
 
         # 初始化游戏状态
         self.reset_game()
 
     def reset_game(self):
         """重置游戏状态"""
+        self.game_map = [row[:] for row in self.initial_map]
         self.player_pos = [self.rows - 1, 1]  # 玩家初始位置
         self.ghosts = [
             {'pos': [6, 7], 'color': self.RED, 'dir': 0},
@@ -60,6 +79,40 @@ class PacManGame:
         # 将初始方向改为 3 (上) 或 2 (左)，因为上方/左方是空的
         self.player_dir = 3  # 改为：初始朝上，因为位置[13,1]是豆子(2)，可通行
         self.next_dir = 3  # 保持与 player_dir 一致
+        # 上一逻辑帧的位置，绘制时用来插值
+        self.prev_player_pos = self.player_pos
+        self.prev_ghost_pos = [ghost['pos'] for ghost in self.ghosts]
+
+    def update(self):
+        """推进一个逻辑帧"""
+        # 位置每次移动都会换成新的列表，记住引用即可
+        self.prev_player_pos = self.player_pos
+        self.prev_ghost_pos = [ghost['pos'] for ghost in self.ghosts]
+        if self.game_over:
+            return
+        # 尝试应用下一个方向
+        self.player_dir = self.next_dir
+        self.move_player()
+        self.move_ghosts()
+        self.check_collisions()
+
+    def apply_action(self, action):
+        """step() 的动作：方向 0=右 1=下 2=左 3=上，None表示保持方向"""
+        if action is not None and not self.game_over:
+            self.next_dir = action
+
+    def update_tick(self):
+        self.update()
+
+    def observe(self):
+        """观测：地图、玩家位置和方向、幽灵位置和分数。返回的是内部对象，不要修改"""
+        return {
+            'map': self.game_map,
+            'player_pos': self.player_pos,
+            'player_dir': self.player_dir,
+            'ghosts': [ghost['pos'] for ghost in self.ghosts],
+            'score': self.score,
+        }
 
     def move_player(self):
         """移动玩家"""
@@ -116,8 +169,69 @@ class PacManGame:
                 self.game_over = True
                 self.win = False
 
-    def draw(self):
-        """绘制游戏画面"""
+    def player_sprite(self, direction):
+        """吃豆人精灵，每个朝向烘焙一次"""
+        return bake(('pacman_player', direction, self.TILE_SIZE),
+                    (0, 0, self.TILE_SIZE, self.TILE_SIZE),
+                    lambda surface, x, y: self.paint_player(surface, x, y, direction))
+
+    def ghost_sprite(self, color):
+        """幽灵精灵，每种颜色烘焙一次（身体的圆比格子高出几个像素）"""
+        return bake(('pacman_ghost', color, self.TILE_SIZE),
+                    (0, -4, self.TILE_SIZE, self.TILE_SIZE + 4),
+                    lambda surface, x, y: self.paint_ghost(surface, x, y, color))
+
+    def paint_player(self, surface, px, py, direction):
+        """以 (px, py) 为格子左上角画吃豆人"""
+        mouth_angle = 30  # 嘴巴张开的度数
+        if direction == 0:  # 右
+            start_angle = mouth_angle
+            end_angle = 360 - mouth_angle
+        elif direction == 2:  # 左
+            start_angle = 180 + mouth_angle
+            end_angle = 180 - mouth_angle
+        elif direction == 1:  # 下
+            start_angle = 90 + mouth_angle
+            end_angle = 90 - mouth_angle
+        else:  # 上
+            start_angle = 270 + mouth_angle
+            end_angle = 270 - mouth_angle
+
+        pygame.draw.circle(surface, self.YELLOW,
+                         (px + self.TILE_SIZE // 2, py + self.TILE_SIZE // 2),
+                         self.TILE_SIZE // 2 - 2)
+        # 绘制嘴巴（通过绘制一个重叠的黑色扇形实现）
+        pygame.draw.arc(surface, self.BLACK,
+                       (px + 2, py + 2, self.TILE_SIZE - 4, self.TILE_SIZE - 4),
+                       start_angle, end_angle)
+
+    def paint_ghost(self, surface, gx, gy, color):
+        """以 (gx, gy) 为格子左上角画幽灵"""
+        # 幽灵身体
+        pygame.draw.circle(surface, color,
+                         (gx + self.TILE_SIZE // 2, gy + self.TILE_SIZE // 2 - 5),
+                         self.TILE_SIZE // 2 - 2)
+        # 幽灵底部（波浪效果）
+        points = [(gx + 2, gy + self.TILE_SIZE // 2),
+                 (gx + 8, gy + self.TILE_SIZE - 2),
+                 (gx + 15, gy + self.TILE_SIZE // 2),
+                 (gx + 22, gy + self.TILE_SIZE - 2),
+                 (gx + 28, gy + self.TILE_SIZE // 2),
+                 (gx + 35, gy + self.TILE_SIZE - 2),
+                 (gx + self.TILE_SIZE - 2, gy + self.TILE_SIZE // 2)]
+        pygame.draw.polygon(surface, color, points)
+        # 幽灵眼睛
+        pygame.draw.circle(surface, self.WHITE,
+                         (gx + self.TILE_SIZE // 2 - 5, gy + self.TILE_SIZE // 2 - 5), 4)
+        pygame.draw.circle(surface, self.WHITE,
+                         (gx + self.TILE_SIZE // 2 + 5, gy + self.TILE_SIZE // 2 - 5), 4)
+        pygame.draw.circle(surface, self.BLUE,
+                         (gx + self.TILE_SIZE // 2 - 5, gy + self.TILE_SIZE // 2 - 5), 2)
+        pygame.draw.circle(surface, self.BLUE,
+                         (gx + self.TILE_SIZE // 2 + 5, gy + self.TILE_SIZE // 2 - 5), 2)
+
+    def draw(self, alpha=1.0):
+        """绘制游戏画面，alpha是上一逻辑帧到当前逻辑帧之间的插值系数"""
         self.screen.fill(self.BLACK)
 
         # 绘制地图
@@ -142,66 +256,24 @@ class PacManGame:
                                      (center_x, center_y), 8)
 
         # 绘制玩家 (吃豆人)
-        px = self.player_pos[1] * self.TILE_SIZE
-        py = self.player_pos[0] * self.TILE_SIZE
-        mouth_angle = 30  # 嘴巴张开的度数
-        if self.player_dir == 0:  # 右
-            start_angle = mouth_angle
-            end_angle = 360 - mouth_angle
-        elif self.player_dir == 2:  # 左
-            start_angle = 180 + mouth_angle
-            end_angle = 180 - mouth_angle
-        elif self.player_dir == 1:  # 下
-            start_angle = 90 + mouth_angle
-            end_angle = 90 - mouth_angle
-        else:  # 上
-            start_angle = 270 + mouth_angle
-            end_angle = 270 - mouth_angle
-
-        pygame.draw.circle(self.screen, self.YELLOW,
-                         (px + self.TILE_SIZE // 2, py + self.TILE_SIZE // 2),
-                         self.TILE_SIZE // 2 - 2)
-        # 绘制嘴巴（通过绘制一个重叠的黑色扇形实现）
-        pygame.draw.arc(self.screen, self.BLACK,
-                       (px + 2, py + 2, self.TILE_SIZE - 4, self.TILE_SIZE - 4),
-                       start_angle, end_angle)
+        row, col = lerp_position(self.prev_player_pos, self.player_pos, alpha)
+        px = round(col * self.TILE_SIZE)
+        py = round(row * self.TILE_SIZE)
+        self.player_sprite(self.player_dir).blit(self.screen, px, py)
 
         # 绘制幽灵
-        for ghost in self.ghosts:
-            gx = ghost['pos'][1] * self.TILE_SIZE
-            gy = ghost['pos'][0] * self.TILE_SIZE
-            # 幽灵身体
-            pygame.draw.circle(self.screen, ghost['color'],
-                             (gx + self.TILE_SIZE // 2, gy + self.TILE_SIZE // 2 - 5),
-                             self.TILE_SIZE // 2 - 2)
-            # 幽灵底部（波浪效果）
-            points = [(gx + 2, gy + self.TILE_SIZE // 2),
-                     (gx + 8, gy + self.TILE_SIZE - 2),
-                     (gx + 15, gy + self.TILE_SIZE // 2),
-                     (gx + 22, gy + self.TILE_SIZE - 2),
-                     (gx + 28, gy + self.TILE_SIZE // 2),
-                     (gx + 35, gy + self.TILE_SIZE - 2),
-                     (gx + self.TILE_SIZE - 2, gy + self.TILE_SIZE // 2)]
-            pygame.draw.polygon(self.screen, ghost['color'], points)
-            # 幽灵眼睛
-            pygame.draw.circle(self.screen, self.WHITE,
-                             (gx + self.TILE_SIZE // 2 - 5, gy + self.TILE_SIZE // 2 - 5), 4)
-            pygame.draw.circle(self.screen, self.WHITE,
-                             (gx + self.TILE_SIZE // 2 + 5, gy + self.TILE_SIZE // 2 - 5), 4)
-            pygame.draw.circle(self.screen, self.BLUE,
-                             (gx + self.TILE_SIZE // 2 - 5, gy + self.TILE_SIZE // 2 - 5), 2)
-            pygame.draw.circle(self.screen, self.BLUE,
-                             (gx + self.TILE_SIZE // 2 + 5, gy + self.TILE_SIZE // 2 - 5), 2)
+        for ghost, prev_pos in zip(self.ghosts, self.prev_ghost_pos):
+            row, col = lerp_position(prev_pos, ghost['pos'], alpha)
+            gx = round(col * self.TILE_SIZE)
+            gy = round(row * self.TILE_SIZE)
+            self.ghost_sprite(ghost['color']).blit(self.screen, gx, gy)
 
         # 绘制分数
-        score_text = self.font.render(f"Score: {self.score}", True, self.WHITE)
-        self.screen.blit(score_text, (10, 10))
+        self.score_label.draw(self.screen, f"Score: {self.score}", topleft=(10, 10))
 
         # 游戏结束/胜利画面
         if self.game_over:
-            overlay = pygame.Surface((self.SCREEN_WIDTH, self.SCREEN_HEIGHT), pygame.SRCALPHA)
-            overlay.fill((0, 0, 0, 180))
-            self.screen.blit(overlay, (0, 0))
+            draw_overlay(self.screen)
 
             if self.win:
                 msg = "YOU WIN! 🎉"
@@ -210,63 +282,75 @@ class PacManGame:
                 msg = "GAME OVER"
                 color = self.RED
 
-            font_large = pygame.font.SysFont(None, 64)
-            font_small = pygame.font.SysFont(None, 32)
-            game_over_text = font_large.render(msg, True, color)
-            restart_text = font_small.render("Press R to Restart | ESC to Exit", True, self.YELLOW)
-
-            self.screen.blit(game_over_text,
-                           (self.SCREEN_WIDTH // 2 - game_over_text.get_width() // 2,
-                            self.SCREEN_HEIGHT // 2 - 50))
-            self.screen.blit(restart_text,
-                           (self.SCREEN_WIDTH // 2 - restart_text.get_width() // 2,
-                            self.SCREEN_HEIGHT // 2 + 20))
+            blit_text(self.screen, msg, color, 64,
+                      midtop=(self.SCREEN_WIDTH // 2, self.SCREEN_HEIGHT // 2 - 50))
+            blit_text(self.screen, "Press R to Restart | ESC to Exit", self.YELLOW, 32,
+                      midtop=(self.SCREEN_WIDTH // 2, self.SCREEN_HEIGHT // 2 + 20))
 
-        pygame.display.flip()
+    def handle_events(self):
+        """处理游戏事件，返回False表示退出游戏"""
+        running = True
+        for event in pygame.event.get():
+            if self.profiler.handle_event(event):
+                continue
+            if event.type == pygame.QUIT:
+                running = False
+            elif event.type == pygame.KEYDOWN:
+                if event.key == pygame.K_ESCAPE:
+                    running = False
+                elif event.key == pygame.K_r and self.game_over:
+                    self.restart()
+                elif not self.game_over:
+                    # 方向键控制，在下一个逻辑帧作为动作生效
+                    if event.key == pygame.K_RIGHT:
+                        self.pending_action = 0
+                    elif event.key == pygame.K_DOWN:
+                        self.pending_action = 1
+                    elif event.key == pygame.K_LEFT:
+                        self.pending_action = 2
+                    elif event.key == pygame.K_UP:
+                        self.pending_action = 3
+
+        return running
 
     def run(self):
-        """运行游戏主循环"""
+        """运行游戏主循环：逻辑按FPS固定步长推进，画面按DISPLAY_FPS插值绘制"""
+        profiler = self.profiler
+        self.start_recording()
+        timestep = FixedTimestep(self.FPS)
+        dt = 0.0
+        # 按键产生的动作，下一个逻辑帧使用
+        self.pending_action = None
         running = True
         while running:
+            profiler.begin_frame()
+
             # 处理事件
-            for event in pygame.event.get():
-                if event.type == pygame.QUIT:
-                    running = False
-                elif event.type == pygame.KEYDOWN:
-                    if event.key == pygame.K_ESCAPE:
-                        running = False
-                    elif event.key == pygame.K_r and self.game_over:
-                        self.reset_game()
-                    elif not self.game_over:
-                        # 方向键控制
-                        if event.key == pygame.K_RIGHT:
-                            self.next_dir = 0
-                        elif event.key == pygame.K_DOWN:
-                            self.next_dir = 1
-                        elif event.key == pygame.K_LEFT:
-                            self.next_dir = 2
-                        elif event.key == pygame.K_UP:
-                            self.next_dir = 3
+            with profiler.phase('event'):
+                running = self.handle_events()
 
             if not running:
                 break
 
-            # 更新玩家方向（防止原地转向）
-            if not self.game_over:
-                # 尝试应用下一个方向
-                self.player_dir = self.next_dir
-                self.move_player()
-                self.move_ghosts()
-                self.check_collisions()
+            # 按固定步长推进逻辑帧
+            with profiler.phase('update'):
+                for _ in range(timestep.advance(dt)):
+                    self.advance(self.pending_action)
+                    self.pending_action = None
 
             # 绘制
-            self.draw()
-            self.clock.tick(self.FPS)
-
+            with profiler.phase('draw'):
+                self.draw(timestep.alpha)
+            with profiler.phase('flip'):
+                pygame.display.flip()
+            with profiler.phase('tick'):
+                dt = self.clock.tick(DISPLAY_FPS) / 1000
+
+        self.stop_recording()
+        profiler.close()
         pygame.quit()
         return
 
-
 if __name__ == "__main__":
     game = PacManGame()
     game.run()
\ No newline at end of file
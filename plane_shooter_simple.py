@@ -3,16 +3,35 @@ import random
 import math
 import sys
 
+from frame_profiler import FrameProfiler
+from game_loop import DISPLAY_FPS, FixedTimestep
+from game_api import HeadlessGame
+from game_ui import Label, blit_text, draw_button, draw_overlay
+from sprites import bake
 
-class PlaneShooter:
-    def __init__(self):
+
+class PlaneShooter(HeadlessGame):
+    TITLE = "✈️ Air Battle"
+    ORDER = 40
+
+    # step() 的动作是以下标志的按位组合（0或None表示没有输入）
+    ACTION_LEFT = 1
+    ACTION_RIGHT = 2
+    ACTION_UP = 4
+    ACTION_DOWN = 8
+    ACTION_SHOOT = 16
+
+    def __init__(self, headless=False, seed=None):
         pygame.init()
+        # 游戏自己的随机数流，seed为None时随机选择（录制时会保存下来）
+        self.seed_rng(seed)
 
         # 屏幕设置
         self.SCREEN_WIDTH = 800
         self.SCREEN_HEIGHT = 600
-        self.screen = pygame.display.set_mode((self.SCREEN_WIDTH, self.SCREEN_HEIGHT))
-        pygame.display.set_caption('Airplane Battle - Arrow Keys Move, Space Shoot, ESC Exit')
+        self.screen = self.setup_screen((self.SCREEN_WIDTH, self.SCREEN_HEIGHT),
+                                        'Airplane Battle - Arrow Keys Move, Space Shoot, ESC Exit',
+                                        headless)
 
         # 颜色定义
         self.BLACK = (0, 0, 0)
@@ -35,8 +54,9 @@ class PlaneShooter:
         self.level = 1
         self.lives = 3
         self.game_over = False
-        self.font = pygame.font.SysFont(None, 36)
-        self.big_font = pygame.font.SysFont(None, 72)
+        self.score_label = Label(36, self.WHITE)
+        self.level_label = Label(36, self.WHITE)
+        self.lives_label = Label(36, self.WHITE)
 
         # 按钮悬停状态
         self.restart_button_hover = False
@@ -73,48 +93,57 @@ class PlaneShooter:
 
         # 星星背景
         self.stars = []
+        # 星空只在绘制时移动，用单独的随机数流，不影响游戏逻辑（headless回放不绘制）
+        self.star_rng = random.Random(self.seed_value)
         self.create_stars(100)
 
         # 游戏时钟
         self.clock = pygame.time.Clock()
         self.FPS = 60
 
+        # 帧剖析器（默认关闭，F9开关，F10导出）
+        self.profiler = FrameProfiler(type(self).__name__)
+        self.profiler.instrument(self, 'update_bullets', 'update_enemies', 'draw_stars', 'draw_bullets',
+                                 'draw_enemies', 'draw_explosions', 'draw_hud')
+
     def create_stars(self, count):
         """创建星空背景"""
         for _ in range(count):
-            x = random.randint(0, self.SCREEN_WIDTH)
-            y = random.randint(0, self.SCREEN_HEIGHT)
-            size = random.randint(1, 3)
-            brightness = random.randint(150, 255)
+            x = self.star_rng.randint(0, self.SCREEN_WIDTH)
+            y = self.star_rng.randint(0, self.SCREEN_HEIGHT)
+            size = self.star_rng.randint(1, 3)
+            brightness = self.star_rng.randint(150, 255)
             color = (brightness, brightness, brightness)
             self.stars.append([x, y, size, color])
 
     def create_player(self):
         """绘制玩家飞机"""
+        width, height = self.player_width, self.player_height
+        sprite = bake(('plane_player', self.player_color, width, height),
+                      (-width // 2 - 1, -1, width + 2, height + 2), self.paint_player)
+        sprite.blit(self.screen, self.player_x, self.player_y)
+
+    def paint_player(self, surface, x, y):
+        """以机头 (x, y) 为锚点画玩家飞机"""
         # 飞机主体
-        pygame.draw.polygon(self.screen, self.player_color, [
-            (self.player_x, self.player_y),  # 机头
-            (self.player_x - self.player_width // 2, self.player_y + self.player_height),  # 左翼
-            (self.player_x + self.player_width // 2, self.player_y + self.player_height)  # 右翼
+        pygame.draw.polygon(surface, self.player_color, [
+            (x, y),  # 机头
+            (x - self.player_width // 2, y + self.player_height),  # 左翼
+            (x + self.player_width // 2, y + self.player_height)  # 右翼
         ])
 
         # 飞机驾驶舱
-        pygame.draw.circle(self.screen, self.CYAN,
-                           (self.player_x, self.player_y + 10), 10)
+        pygame.draw.circle(surface, self.CYAN, (x, y + 10), 10)
 
         # 飞机机翼装饰
-        pygame.draw.rect(self.screen, self.WHITE,
-                         (self.player_x - self.player_width // 2 + 5,
-                          self.player_y + self.player_height - 10,
-                          15, 8))
-        pygame.draw.rect(self.screen, self.WHITE,
-                         (self.player_x + self.player_width // 2 - 20,
-                          self.player_y + self.player_height - 10,
-                          15, 8))
+        pygame.draw.rect(surface, self.WHITE,
+                         (x - self.player_width // 2 + 5, y + self.player_height - 10, 15, 8))
+        pygame.draw.rect(surface, self.WHITE,
+                         (x + self.player_width // 2 - 20, y + self.player_height - 10, 15, 8))
 
     def create_bullet(self):
         """创建子弹"""
-        current_time = pygame.time.get_ticks()
+        current_time = self.get_ticks()
         if current_time - self.last_shot_time > self.shoot_delay:
             self.bullets.append({
                 'x': self.player_x,
@@ -178,22 +207,22 @@ class PlaneShooter:
 
     def spawn_enemy(self):
         """生成敌机"""
-        current_time = pygame.time.get_ticks()
+        current_time = self.get_ticks()
         if current_time - self.last_enemy_spawn > self.enemy_spawn_delay:
-            enemy_type = random.randint(0, 2)
+            enemy_type = self.rng.randint(0, 2)
             enemy_color = self.enemy_colors[enemy_type]
 
             self.enemies.append({
-                'x': random.randint(self.enemy_width // 2,
+                'x': self.rng.randint(self.enemy_width // 2,
                                     self.SCREEN_WIDTH - self.enemy_width // 2),
                 'y': -self.enemy_height,
                 'width': self.enemy_width,
                 'height': self.enemy_height,
-                'speed': self.enemy_speed + random.uniform(-0.5, 0.5),
+                'speed': self.enemy_speed + self.rng.uniform(-0.5, 0.5),
                 'color': enemy_color,
                 'type': enemy_type,
-                'wobble': random.uniform(0, math.pi * 2),  # 用于摆动效果
-                'wobble_speed': random.uniform(0.02, 0.05)
+                'wobble': self.rng.uniform(0, math.pi * 2),  # 用于摆动效果
+                'wobble_speed': self.rng.uniform(0.02, 0.05)
             })
 
             # 随着等级提高，敌机生成更快
@@ -250,45 +279,46 @@ class PlaneShooter:
                 self.enemies.pop(i)
 
     def draw_enemies(self):
-        """绘制敌机"""
+        """绘制敌机（每种类型和颜色烘焙一次）"""
         for enemy in self.enemies:
-            color = enemy['color']
-
-            # 根据敌机类型绘制不同形状
-            if enemy['type'] == 0:  # 类型0：三角形敌机
-                pygame.draw.polygon(self.screen, color, [
-                    (enemy['x'], enemy['y'] - enemy['height'] // 2),  # 顶部
-                    (enemy['x'] - enemy['width'] // 2, enemy['y'] + enemy['height'] // 2),  # 左下
-                    (enemy['x'] + enemy['width'] // 2, enemy['y'] + enemy['height'] // 2)  # 右下
-                ])
-
-            elif enemy['type'] == 1:  # 类型1：方形敌机
-                pygame.draw.rect(self.screen, color,
-                                 (enemy['x'] - enemy['width'] // 2,
-                                  enemy['y'] - enemy['height'] // 2,
-                                  enemy['width'],
-                                  enemy['height']))
-
-                # 方形敌机上的图案
-                pygame.draw.circle(self.screen, self.BLACK,
-                                   (enemy['x'], enemy['y']), 8)
-
-            else:  # 类型2：菱形敌机
-                points = [
-                    (enemy['x'], enemy['y'] - enemy['height'] // 2),  # 上
-                    (enemy['x'] + enemy['width'] // 2, enemy['y']),  # 右
-                    (enemy['x'], enemy['y'] + enemy['height'] // 2),  # 下
-                    (enemy['x'] - enemy['width'] // 2, enemy['y'])  # 左
-                ]
-                pygame.draw.polygon(self.screen, color, points)
-
-                # 菱形敌机上的图案
-                pygame.draw.line(self.screen, self.BLACK,
-                                 (enemy['x'] - enemy['width'] // 4, enemy['y']),
-                                 (enemy['x'] + enemy['width'] // 4, enemy['y']), 2)
-                pygame.draw.line(self.screen, self.BLACK,
-                                 (enemy['x'], enemy['y'] - enemy['height'] // 4),
-                                 (enemy['x'], enemy['y'] + enemy['height'] // 4), 2)
+            enemy_type, color = enemy['type'], enemy['color']
+            width, height = enemy['width'], enemy['height']
+            sprite = bake(('plane_enemy', enemy_type, color, width, height),
+                          (-width // 2 - 1, -height // 2 - 1, width + 2, height + 2),
+                          lambda surface, x, y: self.paint_enemy(surface, x, y, enemy_type,
+                                                                 color, width, height))
+            sprite.blit(self.screen, int(enemy['x']), int(enemy['y']))
+
+    def paint_enemy(self, surface, x, y, enemy_type, color, width, height):
+        """以敌机中心 (x, y) 为锚点画敌机"""
+        # 根据敌机类型绘制不同形状
+        if enemy_type == 0:  # 类型0：三角形敌机
+            pygame.draw.polygon(surface, color, [
+                (x, y - height // 2),  # 顶部
+                (x - width // 2, y + height // 2),  # 左下
+                (x + width // 2, y + height // 2)  # 右下
+            ])
+
+        elif enemy_type == 1:  # 类型1：方形敌机
+            pygame.draw.rect(surface, color, (x - width // 2, y - height // 2, width, height))
+
+            # 方形敌机上的图案
+            pygame.draw.circle(surface, self.BLACK, (x, y), 8)
+
+        else:  # 类型2：菱形敌机
+            points = [
+                (x, y - height // 2),  # 上
+                (x + width // 2, y),  # 右
+                (x, y + height // 2),  # 下
+                (x - width // 2, y)  # 左
+            ]
+            pygame.draw.polygon(surface, color, points)
+
+            # 菱形敌机上的图案
+            pygame.draw.line(surface, self.BLACK,
+                             (x - width // 4, y), (x + width // 4, y), 2)
+            pygame.draw.line(surface, self.BLACK,
+                             (x, y - height // 4), (x, y + height // 4), 2)
 
     def create_explosion(self, x, y, color):
         """创建爆炸效果"""
@@ -297,10 +327,10 @@ class PlaneShooter:
 
         # 创建爆炸粒子
         for _ in range(15):
-            angle = random.uniform(0, math.pi * 2)
-            speed = random.uniform(2, 8)
-            size = random.randint(2, 6)
-            lifetime = random.randint(20, 40)
+            angle = self.rng.uniform(0, math.pi * 2)
+            speed = self.rng.uniform(2, 8)
+            size = self.rng.randint(2, 6)
+            lifetime = self.rng.randint(20, 40)
 
             explosion_particles.append({
                 'x': x,
@@ -372,21 +402,18 @@ class PlaneShooter:
             star[1] += 0.5  # 向下移动
             if star[1] > self.SCREEN_HEIGHT:
                 star[1] = 0
-                star[0] = random.randint(0, self.SCREEN_WIDTH)
+                star[0] = self.star_rng.randint(0, self.SCREEN_WIDTH)
 
     def draw_hud(self):
         """绘制游戏界面信息"""
         # 绘制分数
-        score_text = self.font.render(f'Score: {self.score}', True, self.WHITE)
-        self.screen.blit(score_text, (10, 10))
+        self.score_label.draw(self.screen, f'Score: {self.score}', topleft=(10, 10))
 
         # 绘制等级
-        level_text = self.font.render(f'Level: {self.level}', True, self.WHITE)
-        self.screen.blit(level_text, (10, 50))
+        self.level_label.draw(self.screen, f'Level: {self.level}', topleft=(10, 50))
 
         # 绘制生命值
-        lives_text = self.font.render(f'Lives: {self.lives}', True, self.WHITE)
-        self.screen.blit(lives_text, (10, 90))
+        self.lives_label.draw(self.screen, f'Lives: {self.lives}', topleft=(10, 90))
 
         # 绘制生命图标
         for i in range(self.lives):
@@ -397,35 +424,13 @@ class PlaneShooter:
             ])
 
         # 绘制控制提示
-        controls_text = self.font.render('Arrow Keys Move, Space Shoot, ESC Exit', True, self.WHITE)
-        self.screen.blit(controls_text,
-                         (self.SCREEN_WIDTH // 2 - controls_text.get_width() // 2,
-                          self.SCREEN_HEIGHT - 30))
-
-    def draw_button(self, rect, text, normal_color, hover_color, is_hovering, font_size=28):
-        """绘制按钮的通用函数"""
-        # 选择按钮颜色
-        button_color = hover_color if is_hovering else normal_color
-
-        # 绘制按钮背景
-        pygame.draw.rect(self.screen, button_color, rect, border_radius=8)
-        pygame.draw.rect(self.screen, (220, 220, 220), rect, 2, border_radius=8)
-
-        # 绘制按钮文字
-        button_font = pygame.font.SysFont(None, font_size)
-        button_text = button_font.render(text, True, (255, 255, 255))
-        self.screen.blit(button_text,
-                         (rect.centerx - button_text.get_width() // 2,
-                          rect.centery - button_text.get_height() // 2))
-
-        return rect
+        blit_text(self.screen, 'Arrow Keys Move, Space Shoot, ESC Exit', self.WHITE, 36,
+                  midtop=(self.SCREEN_WIDTH // 2, self.SCREEN_HEIGHT - 30))
 
     def draw_game_over(self):
         """绘制游戏结束画面 - 左侧文字，右侧按钮"""
         # 半透明覆盖层
-        overlay = pygame.Surface((self.SCREEN_WIDTH, self.SCREEN_HEIGHT), pygame.SRCALPHA)
-        overlay.fill((0, 0, 0, 180))
-        self.screen.blit(overlay, (0, 0))
+        draw_overlay(self.screen)
 
         # 在中间绘制一条垂直分割线
         divider_x = self.SCREEN_WIDTH // 2
@@ -438,22 +443,16 @@ class PlaneShooter:
         left_center_x = left_area_width // 2
 
         # 游戏结束文字
-        game_over_text = self.big_font.render('Game Over', True, self.RED)
-        self.screen.blit(game_over_text,
-                         (left_center_x - game_over_text.get_width() // 2,
-                          self.SCREEN_HEIGHT // 2 - 120))
+        blit_text(self.screen, 'Game Over', self.RED, 72,
+                  midtop=(left_center_x, self.SCREEN_HEIGHT // 2 - 120))
 
         # 最终分数
-        score_text = self.font.render(f'Final Score: {self.score}', True, self.WHITE)
-        self.screen.blit(score_text,
-                         (left_center_x - score_text.get_width() // 2,
-                          self.SCREEN_HEIGHT // 2 - 40))
+        blit_text(self.screen, f'Final Score: {self.score}', self.WHITE, 36,
+                  midtop=(left_center_x, self.SCREEN_HEIGHT // 2 - 40))
 
         # 最终等级
-        level_text = self.font.render(f'Final Level: {self.level}', True, self.YELLOW)
-        self.screen.blit(level_text,
-                         (left_center_x - level_text.get_width() // 2,
-                          self.SCREEN_HEIGHT // 2))
+        blit_text(self.screen, f'Final Level: {self.level}', self.YELLOW, 36,
+                  midtop=(left_center_x, self.SCREEN_HEIGHT // 2))
 
         # 右侧区域：按钮
         right_area_width = self.SCREEN_WIDTH // 2
@@ -477,12 +476,11 @@ class PlaneShooter:
             button_width,
             button_height
         )
-        self.restart_button_rect = self.draw_button(
+        self.restart_button_rect = draw_button(
+            self.screen,
             restart_button_rect,
             "PLAY AGAIN",
-            self.BUTTON_GREEN_NORMAL,
-            self.BUTTON_GREEN_HOVER,
-            self.restart_button_hover,
+            self.BUTTON_GREEN_HOVER if self.restart_button_hover else self.BUTTON_GREEN_NORMAL,
             font_size=30
         )
 
@@ -493,22 +491,18 @@ class PlaneShooter:
             button_width,
             button_height
         )
-        self.exit_button_rect = self.draw_button(
+        self.exit_button_rect = draw_button(
+            self.screen,
             exit_button_rect,
             "EXIT TO LAUNCHER",
-            self.BUTTON_RED_NORMAL,
-            self.BUTTON_RED_HOVER,
-            self.exit_button_hover,
+            self.BUTTON_RED_HOVER if self.exit_button_hover else self.BUTTON_RED_NORMAL,
             font_size=26
         )
 
         # 键盘提示（小字提示，放在底部）
-        hint_font = pygame.font.SysFont(None, 20)
         hint_text = "(You can also press R to restart or ESC to exit)"
-        hint_surface = hint_font.render(hint_text, True, (150, 150, 150))
-        self.screen.blit(hint_surface,
-                         (self.SCREEN_WIDTH // 2 - hint_surface.get_width() // 2,
-                          self.SCREEN_HEIGHT - 30))
+        blit_text(self.screen, hint_text, (150, 150, 150), 20,
+                  midtop=(self.SCREEN_WIDTH // 2, self.SCREEN_HEIGHT - 30))
 
     def reset_game(self):
         """重置游戏状态"""
@@ -523,95 +517,162 @@ class PlaneShooter:
         self.explosions.clear()
         self.enemy_speed = 3
         self.enemy_spawn_delay = 1000
-        self.last_enemy_spawn = pygame.time.get_ticks()
+        self.last_enemy_spawn = self.get_ticks()
         self.last_shot_time = 0
         # 重置按钮悬停状态
         self.restart_button_hover = False
         self.exit_button_hover = False
 
-    def run(self):
-        """运行游戏主循环"""
+    def apply_action(self, action):
+        """移动玩家飞机并射击"""
+        if not action or self.game_over:
+            return
+        if action & self.ACTION_LEFT and self.player_x > self.player_width // 2:
+            self.player_x -= self.player_speed
+        if action & self.ACTION_RIGHT and self.player_x < self.SCREEN_WIDTH - self.player_width // 2:
+            self.player_x += self.player_speed
+        if action & self.ACTION_UP and self.player_y > self.SCREEN_HEIGHT // 2:
+            self.player_y -= self.player_speed
+        if action & self.ACTION_DOWN and self.player_y < self.SCREEN_HEIGHT - self.player_height:
+            self.player_y += self.player_speed
+        if action & self.ACTION_SHOOT:
+            self.create_bullet()
+
+    def update(self):
+        """更新游戏状态 - 只有在游戏未结束时才更新"""
+        if self.game_over:
+            return
+        self.spawn_enemy()
+        self.update_bullets()
+        self.update_enemies()
+        self.update_explosions()
+
+    def update_tick(self):
+        self.update()
+
+    def observe(self):
+        """观测：玩家位置、子弹、敌机、分数和生命。返回的是内部对象，不要修改"""
+        return {
+            'player': (self.player_x, self.player_y),
+            'bullets': self.bullets,
+            'enemies': self.enemies,
+            'score': self.score,
+            'lives': self.lives,
+        }
+
+    def draw(self):
+        """绘制整个游戏画面"""
+        self.screen.fill(self.BLACK)  # 黑色背景
+
+        # 绘制星空
+        self.draw_stars()
+
+        # 绘制游戏元素
+        self.draw_bullets()
+        self.draw_enemies()
+        self.draw_explosions()
+        self.create_player()
+
+        # 绘制界面信息
+        self.draw_hud()
+
+        # 如果游戏结束，显示结束画面
+        if self.game_over:
+            self.draw_game_over()
+
+    def handle_events(self):
+        """处理游戏事件和按键状态，返回False表示退出游戏"""
         running = True
-
-        while running:
-            mouse_pos = pygame.mouse.get_pos()
-
-            # 处理事件
-            for event in pygame.event.get():
-                if event.type == pygame.QUIT:
+        mouse_pos = pygame.mouse.get_pos()
+
+        # 处理事件
+        for event in pygame.event.get():
+            if self.profiler.handle_event(event):
+                continue
+            if event.type == pygame.QUIT:
+                running = False
+            elif event.type == pygame.KEYDOWN:
+                if event.key == pygame.K_ESCAPE:
                     running = False
-                elif event.type == pygame.KEYDOWN:
-                    if event.key == pygame.K_ESCAPE:
+                elif event.key == pygame.K_r and self.game_over:
+                    self.restart()
+                elif event.key == pygame.K_SPACE and not self.game_over:
+                    # 短按空格也至少射击一次
+                    self.pending_action |= self.ACTION_SHOOT
+            elif event.type == pygame.MOUSEBUTTONDOWN:
+                if self.game_over:
+                    # 检查是否点击了重新开始按钮
+                    if hasattr(self, 'restart_button_rect') and self.restart_button_rect.collidepoint(mouse_pos):
+                        self.restart()
+                    # 检查是否点击了退出按钮
+                    elif hasattr(self, 'exit_button_rect') and self.exit_button_rect.collidepoint(mouse_pos):
                         running = False
-                    elif event.key == pygame.K_r and self.game_over:
-                        self.reset_game()
-                    elif event.key == pygame.K_SPACE and not self.game_over:
-                        self.create_bullet()
-                elif event.type == pygame.MOUSEBUTTONDOWN:
-                    if self.game_over:
-                        # 检查是否点击了重新开始按钮
-                        if hasattr(self, 'restart_button_rect') and self.restart_button_rect.collidepoint(mouse_pos):
-                            self.reset_game()
-                        # 检查是否点击了退出按钮
-                        elif hasattr(self, 'exit_button_rect') and self.exit_button_rect.collidepoint(mouse_pos):
-                            running = False
-                elif event.type == pygame.MOUSEMOTION:
-                    # 更新按钮悬停状态
-                    if self.game_over:
-                        if hasattr(self, 'restart_button_rect'):
-                            self.restart_button_hover = self.restart_button_rect.collidepoint(mouse_pos)
-                        if hasattr(self, 'exit_button_rect'):
-                            self.exit_button_hover = self.exit_button_rect.collidepoint(mouse_pos)
-
-            # 获取按键状态（持续移动）
-            keys = pygame.key.get_pressed()
-            if not self.game_over:
-                if keys[pygame.K_LEFT] and self.player_x > self.player_width // 2:
-                    self.player_x -= self.player_speed
-                if keys[pygame.K_RIGHT] and self.player_x < self.SCREEN_WIDTH - self.player_width // 2:
-                    self.player_x += self.player_speed
-                if keys[pygame.K_UP] and self.player_y > self.SCREEN_HEIGHT // 2:
-                    self.player_y -= self.player_speed
-                if keys[pygame.K_DOWN] and self.player_y < self.SCREEN_HEIGHT - self.player_height:
-                    self.player_y += self.player_speed
-
-                # 按住空格连续射击
-                if keys[pygame.K_SPACE]:
-                    self.create_bullet()
-
-            # 更新游戏状态 - 只有在游戏未结束时才更新
-            if not self.game_over:
-                self.spawn_enemy()
-                self.update_bullets()
-                self.update_enemies()
-                self.update_explosions()
+            elif event.type == pygame.MOUSEMOTION:
+                # 更新按钮悬停状态
+                if self.game_over:
+                    if hasattr(self, 'restart_button_rect'):
+                        self.restart_button_hover = self.restart_button_rect.collidepoint(mouse_pos)
+                    if hasattr(self, 'exit_button_rect'):
+                        self.exit_button_hover = self.exit_button_rect.collidepoint(mouse_pos)
+
+        # 获取按键状态（持续移动，按住空格连续射击）
+        keys = pygame.key.get_pressed()
+        action = 0
+        if keys[pygame.K_LEFT]:
+            action |= self.ACTION_LEFT
+        if keys[pygame.K_RIGHT]:
+            action |= self.ACTION_RIGHT
+        if keys[pygame.K_UP]:
+            action |= self.ACTION_UP
+        if keys[pygame.K_DOWN]:
+            action |= self.ACTION_DOWN
+        if keys[pygame.K_SPACE]:
+            action |= self.ACTION_SHOOT
+        # 按住的键在每个逻辑帧里生效，见run()
+        self.held_action = action
+
+        return running
 
-            # 绘制游戏
-            self.screen.fill(self.BLACK)  # 黑色背景
+    def run(self):
+        """运行游戏主循环：逻辑按FPS固定步长推进，与画面帧率无关"""
+        profiler = self.profiler
+        self.start_recording()
+        # 射击间隔、敌机生成等计时器按逻辑帧计时
+        self.sim_clock = True
+        timestep = FixedTimestep(self.FPS)
+        dt = 0.0
+        self.held_action = 0
+        self.pending_action = 0
+        running = True
 
-            # 绘制星空
-            self.draw_stars()
+        while running:
+            profiler.begin_frame()
 
-            # 绘制游戏元素
-            self.draw_bullets()
-            self.draw_enemies()
-            self.draw_explosions()
-            self.create_player()
+            # 处理事件
+            with profiler.phase('event'):
+                running = self.handle_events()
 
-            # 绘制界面信息
-            self.draw_hud()
+            # 更新游戏状态
+            with profiler.phase('update'):
+                for _ in range(timestep.advance(dt)):
+                    self.advance(self.held_action | self.pending_action)
+                    self.pending_action = 0
 
-            # 如果游戏结束，显示结束画面
-            if self.game_over:
-                self.draw_game_over()
+            # 绘制游戏
+            with profiler.phase('draw'):
+                self.draw()
 
             # 更新屏幕
-            pygame.display.flip()
+            with profiler.phase('flip'):
+                pygame.display.flip()
 
-            # 控制帧率
-            self.clock.tick(self.FPS)
+            # 控制画面帧率
+            with profiler.phase('tick'):
+                dt = self.clock.tick(DISPLAY_FPS) / 1000
 
         # 退出游戏
+        self.stop_recording()
+        profiler.close()
         pygame.quit()
         return
 
@@ -0,0 +1,330 @@
+"""输入录制与回放
+
+每个游戏有自己的随机数流（按种子创建），游戏逻辑按逻辑帧推进，
+所以同一个种子加上同样的输入序列，一定得到同样的一局。录制文件只保存：
+- 文件头：游戏类、种子、逻辑频率
+- 输入变化：第几个逻辑帧、动作变成了什么（动作会一直保持到下一次变化）
+- 重新开始、切换难度等不经过 step() 的操作
+- 结束记录：总逻辑帧数和最终状态的校验值，回放时用来确认结果一致
+
+设置环境变量 GAMEBOX_RECORD_DIR 后，每局游戏的输入会录制到该目录。
+
+    python replay.py session.gbr             # headless全速回放，报告加速倍数
+    python replay.py session.gbr --render    # 打开窗口按正常速度回放
+    python replay.py session.gbr --render --speed 4
+
+benchmarks.py --replay session.gbr 可以把任意录制文件作为性能测试场景。
+"""
+import argparse
+import importlib
+import json
+import os
+import sys
+import time
+import zlib
+
+import pygame
+
+from game_loop import DISPLAY_FPS, FixedTimestep
+
+MAGIC = b'GBRL'
+VERSION = 1
+
+# 记录类型
+ACTION_NONE = 0
+ACTION_INT = 1
+ACTION_TUPLE = 2
+RESET = 3
+CONFIG = 4
+END = 5
+
+
+def _write_varint(buf, value):
+    """无符号LEB128"""
+    while True:
+        byte = value & 0x7F
+        value >>= 7
+        if value:
+            buf.append(byte | 0x80)
+        else:
+            buf.append(byte)
+            return
+
+
+def _read_varint(data, pos):
+    result = shift = 0
+    while True:
+        byte = data[pos]
+        pos += 1
+        result |= (byte & 0x7F) << shift
+        if not byte & 0x80:
+            return result, pos
+        shift += 7
+
+
+def _zigzag(value):
+    return value * 2 if value >= 0 else -value * 2 - 1
+
+
+def _unzigzag(value):
+    return value >> 1 if not value & 1 else -(value >> 1) - 1
+
+
+def state_digest(game):
+    """游戏状态的校验值，用来确认回放和录制的结果一致"""
+    return zlib.crc32(repr(game.observe()).encode('utf-8'))
+
+
+class Recorder:
+    """把一局游戏的输入写入录制文件"""
+
+    def __init__(self, path, game):
+        self.path = path
+        self.file = open(path, 'wb')
+        cls = type(game)
+        header = json.dumps({
+            'game': f"{cls.__module__}.{cls.__name__}",
+            'seed': game.seed_value,
+            'fps': game.FPS,
+            'created': time.strftime('%Y-%m-%d %H:%M:%S'),
+        }).encode('utf-8')
+        buf = bytearray(MAGIC)
+        buf.append(VERSION)
+        _write_varint(buf, len(header))
+        buf += header
+        self.file.write(buf)
+        self.last_tick = 0
+        self.last_action = None
+
+    def _write(self, tick, kind, payload=b''):
+        buf = bytearray()
+        _write_varint(buf, tick - self.last_tick)
+        buf.append(kind)
+        buf += payload
+        self.file.write(buf)
+        self.last_tick = tick
+
+    def action(self, tick, action):
+        """记录第tick个逻辑帧使用的动作；与上一帧相同时不写入"""
+        if action == self.last_action:
+            return
+        self.last_action = action
+        payload = bytearray()
+        if action is None:
+            kind = ACTION_NONE
+        elif isinstance(action, tuple):
+            kind = ACTION_TUPLE
+            payload.append(len(action))
+            for value in action:
+                _write_varint(payload, _zigzag(value))
+        else:
+            kind = ACTION_INT
+            _write_varint(payload, _zigzag(action))
+        self._write(tick, kind, payload)
+
+    def reset(self, tick):
+        self._write(tick, RESET)
+
+    def config(self, tick, option):
+        payload = bytearray()
+        data = str(option).encode('utf-8')
+        _write_varint(payload, len(data))
+        payload += data
+        self._write(tick, CONFIG, payload)
+
+    def close(self, game):
+        """写入结束记录（总帧数和状态校验值）并关闭文件"""
+        self._write(game.sim_ticks, END, state_digest(game).to_bytes(4, 'little'))
+        self.file.close()
+
+
+class InputLog:
+    """读取后的录制文件"""
+
+    def __init__(self, header, records, end_tick, digest):
+        self.game = header['game']
+        self.seed = header['seed']
+        self.fps = header['fps']
+        self.created = header.get('created')
+        # (逻辑帧, 类型, 值)
+        self.records = records
+        self.end_tick = end_tick
+        # 文件被截断（游戏崩溃）时没有结束记录，digest为None
+        self.digest = digest
+
+    @classmethod
+    def load(cls, path):
+        with open(path, 'rb') as f:
+            return cls.parse(f.read())
+
+    @classmethod
+    def parse(cls, data):
+        if data[:4] != MAGIC:
+            raise ValueError("not a gamebox input log")
+        if data[4] != VERSION:
+            raise ValueError(f"unsupported input log version {data[4]}")
+        length, pos = _read_varint(data, 5)
+        header = json.loads(data[pos:pos + length].decode('utf-8'))
+        pos += length
+
+        records = []
+        tick = 0
+        end_tick = None
+        digest = None
+        try:
+            while pos < len(data):
+                delta, pos = _read_varint(data, pos)
+                tick += delta
+                kind = data[pos]
+                pos += 1
+                if kind == ACTION_NONE:
+                    records.append((tick, kind, None))
+                elif kind == ACTION_INT:
+                    value, pos = _read_varint(data, pos)
+                    records.append((tick, kind, _unzigzag(value)))
+                elif kind == ACTION_TUPLE:
+                    count = data[pos]
+                    pos += 1
+                    values = []
+                    for _ in range(count):
+                        value, pos = _read_varint(data, pos)
+                        values.append(_unzigzag(value))
+                    records.append((tick, kind, tuple(values)))
+                elif kind == RESET:
+                    records.append((tick, kind, None))
+                elif kind == CONFIG:
+                    length, pos = _read_varint(data, pos)
+                    records.append((tick, kind, data[pos:pos + length].decode('utf-8')))
+                    pos += length
+                elif kind == END:
+                    if pos + 4 > len(data):
+                        break
+                    end_tick = tick
+                    digest = int.from_bytes(data[pos:pos + 4], 'little')
+                    break
+                else:
+                    raise ValueError(f"unknown record type {kind}")
+        except IndexError:
+            # 最后一条记录不完整，丢弃
+            pass
+
+        if end_tick is None:
+            end_tick = records[-1][0] if records else 0
+        return cls(header, records, end_tick, digest)
+
+    def create_game(self, headless=True):
+        """按文件头创建游戏实例（使用录制时的种子）"""
+        module_name, class_name = self.game.rsplit('.', 1)
+        cls = getattr(importlib.import_module(module_name), class_name)
+        return cls(headless=headless, seed=self.seed)
+
+
+class ReplayCursor:
+    """按逻辑帧把录制的输入喂给游戏"""
+
+    def __init__(self, log, game):
+        self.log = log
+        self.game = game
+        self.index = 0
+        self.action = None
+
+    @property
+    def finished(self):
+        return self.game.sim_ticks >= self.log.end_tick
+
+    def _apply_records(self):
+        records = self.log.records
+        tick = self.game.sim_ticks
+        while self.index < len(records) and records[self.index][0] <= tick:
+            _, kind, value = records[self.index]
+            self.index += 1
+            if kind == RESET:
+                self.game.reset_game()
+            elif kind == CONFIG:
+                self.game.apply_config(value)
+            else:
+                self.action = value
+
+    def step(self):
+        """推进一个逻辑帧"""
+        self._apply_records()
+        self.game.advance(self.action)
+
+    def finish(self):
+        """应用最后一帧之后的记录（例如最后按了重新开始）"""
+        self._apply_records()
+
+
+def replay(log, game=None):
+    """headless全速回放，返回回放结束时的游戏"""
+    if game is None:
+        game = log.create_game()
+    cursor = ReplayCursor(log, game)
+    while not cursor.finished:
+        cursor.step()
+    cursor.finish()
+    return game
+
+
+def play(log, speed=1.0):
+    """打开窗口按录制时的速度回放（speed为倍速），ESC提前结束"""
+    game = log.create_game(headless=False)
+    cursor = ReplayCursor(log, game)
+    timestep = FixedTimestep(game.FPS)
+    dt = 0.0
+    while not cursor.finished:
+        for event in pygame.event.get():
+            if event.type == pygame.QUIT or (event.type == pygame.KEYDOWN and
+                                             event.key == pygame.K_ESCAPE):
+                pygame.quit()
+                return game
+        timestep.tick_rate = game.FPS
+        for _ in range(timestep.advance(dt * speed)):
+            cursor.step()
+            if cursor.finished:
+                break
+        game.draw()
+        pygame.display.flip()
+        dt = game.clock.tick(DISPLAY_FPS) / 1000
+    cursor.finish()
+    pygame.quit()
+    return game
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Replay a recorded game session")
+    parser.add_argument('log', help="input log (.gbr)")
+    parser.add_argument('--render', action='store_true', help="replay in a window")
+    parser.add_argument('--speed', type=float, default=1.0, help="playback speed with --render")
+    args = parser.parse_args(argv)
+
+    log = InputLog.load(args.log)
+    print(f"{log.game}  seed={log.seed}  {log.end_tick} ticks  {len(log.records)} records")
+
+    if args.render:
+        game = play(log, args.speed)
+    else:
+        os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+        start = time.perf_counter()
+        game = replay(log)
+        elapsed = time.perf_counter() - start
+        # 录制时的真实时长（逻辑频率会变的游戏按初始频率估算）
+        recorded = log.end_tick / log.fps
+        print(f"replayed {recorded:.1f}s of play in {elapsed * 1000:.1f} ms "
+              f"({recorded / max(elapsed, 1e-9):,.0f}x real time)")
+
+    if log.digest is None:
+        print("log has no end record (truncated), final state not verified")
+        return 0
+    if game.sim_ticks < log.end_tick:
+        print("replay stopped early, final state not verified")
+        return 0
+    if state_digest(game) != log.digest:
+        print("MISMATCH: final state differs from the recording")
+        return 1
+    print("final state matches the recording")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,257 @@
+"""贪吃蛇的自动驾驶：沿哈密顿回路走，蛇还短的时候抄近路
+
+哈密顿回路经过网格上的每个格子正好一次，最后回到起点。蛇一直沿着回路
+走就永远不会撞到自己，并且一定能把网格填满，只是很慢。为了快一些，
+Autopilot 在安全的时候抄近路，跳过回路上的一段格子：
+
+- 格子在回路上的位置是 order[i]，从格子a沿回路向前走到b的步数是
+  (order[b] - order[a]) % 格子数，下面叫"回路距离"。
+- 从一局开始（蛇只有一节）起保持一个不变式：沿回路从蛇尾向前走到蛇头，
+  途中经过所有蛇身。所以蛇头到蛇尾之间（沿回路向前）的格子都是空的，
+  蛇头只要落在这一段里，沿回路继续走就不会撞上。
+- 蛇头到蛇尾的回路距离叫 room，蛇头前面的空格子有 room - 1 个。room等于1时
+  回路上的下一格就是蛇尾，而蛇尾这一步还没移走，撞上也算。不吃食物时蛇尾
+  至少前进一格，room不会变小；吃到食物时蛇尾不动，room少1。
+- 抄近路跳过的空格子留在了蛇身之间（下面叫空隙），蛇尾走过去才把它们放回
+  蛇头前面。吃到食物时如果还有空隙，新的食物可能每次都正好生成在蛇头前面，
+  蛇尾一直不动，前面的空格子被吃光时就撞上蛇尾了。所以只在能证明吃到
+  食物之前空隙都已放出时才抄近路：食物在吃到之前不会移动，蛇头跳到
+  回路距离d的格子后还要不吃食物地走 food - d 步才到食物（food是食物的
+  回路距离），这期间蛇尾前进 food - d 格，而刚跳过的空隙要等蛇尾前进
+  蛇长那么多格才放出来（更早的空隙在它后面，放得更早）。所以跳过几格的
+  一步要满足 d <= food - 蛇长，并且不能直接跳到食物上；沿回路走一格
+  （d = 1）总是可以的。
+- 这样每次吃到食物时都没有空隙：蛇头前面的 room - 1 个格子就是所有空格子，
+  吃完后只要网格还没填满，room至少是2，沿回路走永远不会撞上，无论食物
+  生成在哪里，一定能填满网格。蛇只有一节时没有空隙，不吃食物的任何一步
+  都可以。
+- 不能直接反向（SnakeGame 会忽略反向的动作，蛇继续向前），反方向不是
+  候选的一步；蛇只有一节时回路上的下一格可能正好在反方向上，这时走
+  回路距离最小的其它可以走的格子。
+- 在这个范围里从蛇头做广度优先搜索，只走空格子，并且每一步的回路距离
+  都要变大（不变式要求）；走到回路距离最大的格子的最短路径的第一步，
+  就是这一步的方向（下一步重新判断，所以路径的后面几步不用满足上面的
+  条件）。搜索最多展开 SEARCH_NODES 个格子，所以每一步的开销和网格大小无关。
+- 空格子不到一半时不再抄近路，只沿回路走（剩下的格子都要走到，抄近路
+  省不了多少，留出的空间却可能不够蛇长）。
+
+宽、高至少有一个是偶数时回路只用网格内部的边；两个都是奇数时普通网格
+上没有哈密顿回路，这里利用贪吃蛇的上下、左右边缘相连，把最后一行接进
+前面各行的回路里。
+
+SnakeGame 里按A键开关自动驾驶；无界面跑到填满网格用 play()，
+benchmarks.py 的 snake_autopilot 场景就是这样计时的。sweep() 在所有
+小网格上用几个种子各玩一局，检查每一局都填满了网格，--adversarial
+把每个新食物都放在蛇头正前方（上面说的最坏情况）：
+
+    python snake_autopilot.py --max-side 11 --seeds 5
+    python snake_autopilot.py --max-side 11 --seeds 5 --adversarial
+"""
+import argparse
+import sys
+from collections import deque
+
+# 每一步的搜索最多展开的格子数
+SEARCH_NODES = 32
+
+
+def hamiltonian_cycle(width, height):
+    """上下、左右边缘相连的 width x height 网格上的一条哈密顿回路，返回 [(x, y)]"""
+    if width < 2 or height < 2:
+        # 只有一行或一列时，边缘相连的这一行（列）本身就是回路
+        return [(i % width, i // width) for i in range(width * height)]
+    if width % 2 == 0:
+        # 从左到右一列一列往返地走，不走第0行，最后沿第0行回到起点
+        cycle = []
+        for x in range(width):
+            ys = range(1, height) if x % 2 == 0 else range(height - 1, 0, -1)
+            cycle.extend((x, y) for y in ys)
+        cycle.extend((x, 0) for x in range(width - 1, -1, -1))
+        return cycle
+    if height % 2 == 0:
+        return [(x, y) for y, x in hamiltonian_cycle(height, width)]
+    # 宽、高都是奇数：前 height - 1 行（偶数行）按上面的方法转置得到回路，
+    # 其中倒数第二行从右往左走；把它的 (2, y) -> (1, y) 这一步换成向下进入
+    # 最后一行，向右走完一整行（经过右边缘回到第0列），再向上回到 (1, y)
+    y = height - 2
+    cycle = hamiltonian_cycle(width, height - 1)
+    at = cycle.index((2, y)) + 1
+    last_row = [(x % width, height - 1) for x in range(2, width + 2)]
+    cycle[at:at] = last_row
+    return cycle
+
+
+class Autopilot:
+    """给 SnakeGame 选动作：沿哈密顿回路走，安全时抄近路（见模块说明）
+
+    action(game) 返回 SnakeGame.ACTIONS 的下标，可以直接交给 step()/advance()，
+    所以自动驾驶的一局和玩家的一局一样可以录制和回放。
+    """
+
+    def __init__(self, width, height, actions):
+        self.width = width
+        self.height = height
+        size = width * height
+        self.cycle = [y * width + x for x, y in hamiltonian_cycle(width, height)]
+        # 格子在回路上的位置
+        self.order = [0] * size
+        for position, index in enumerate(self.cycle):
+            self.order[index] = position
+        # 每个格子的邻居和走过去的动作：((邻居编号, 动作), ...)，actions是各动作的 (dx, dy)
+        self.moves = []
+        for index in range(size):
+            x, y = index % width, index // width
+            self.moves.append(tuple(((y + dy) % height * width + (x + dx) % width, action)
+                                    for action, (dx, dy) in enumerate(actions)))
+        # 只有邻居编号，搜索的内层循环用
+        self.adjacent = [tuple(neighbor for neighbor, _ in moves) for moves in self.moves]
+        # 各方向的反方向动作
+        self.reverse = {(dx, dy): actions.index((-dx, -dy)) for dx, dy in actions}
+
+    def action(self, game):
+        """这一步的动作（ACTIONS的下标）"""
+        width, size = self.width, len(self.cycle)
+        order, occupied = self.order, game.occupied
+        snake = game.snake
+        x, y = snake[0]
+        head = y * width + x
+        base = order[head]
+        x, y = snake[-1]
+        # 蛇头沿回路到蛇尾的距离（只有一节时是一整圈）
+        room = (order[y * width + x] - base) % size or size
+
+        food = size
+        if game.food is not None:
+            x, y = game.food
+            food = (order[y * width + x] - base) % size
+        # 跳过几格的一步最远能到的回路距离：蛇尾要在蛇头走到食物之前放出空隙
+        # （见模块说明）
+        length = len(snake)
+        reach = min(room - 1, food - length)
+        # 可以走的一步：不反向的空邻居，沿回路走一格，或者跳过几格但不跳到食物上
+        # （蛇只有一节时不吃食物的任何一步）
+        reverse = self.reverse[game.direction]
+        steps = {}
+        for neighbor, action in self.moves[head]:
+            if action == reverse or occupied[neighbor]:
+                continue
+            ahead = (order[neighbor] - base) % size
+            if ahead == 1 and room >= 2 or ahead != food and (ahead <= reach or length == 1):
+                steps[neighbor] = action
+        if not steps:
+            # 不变式不成立（例如中途接管的一局）或者无路可走
+            return self.escape(head, game)
+
+        # 抄近路最远能到的回路距离（空格子不到一半时只沿回路走）
+        limit = 1
+        if (size - length) * 2 > size:
+            limit = reach
+        following = self.cycle[(base + 1) % size]
+        if following in steps and limit <= 1:
+            return steps[following]
+
+        # 沿回路距离递增的广度优先搜索，记下每个格子路径上的第一步；
+        # 回路上的下一格在反方向上时退而求其次，走回路距离最小的安全格子
+        if following in steps:
+            best, best_distance = following, 1
+        else:
+            best = min(steps, key=lambda cell: (order[cell] - base) % size)
+            best_distance = (order[best] - base) % size
+            limit = max(limit, best_distance)
+        adjacent = self.adjacent
+        first = {}
+        queue = deque()
+        for cell in steps:
+            ahead = (order[cell] - base) % size
+            if ahead <= limit:
+                first[cell] = cell
+                queue.append((cell, ahead))
+                if ahead > best_distance:
+                    best, best_distance = cell, ahead
+        expanded = 0
+        while queue and expanded < SEARCH_NODES and best_distance < limit:
+            cell, distance = queue.popleft()
+            expanded += 1
+            for neighbor in adjacent[cell]:
+                ahead = (order[neighbor] - base) % size
+                if ahead <= distance or ahead > limit or occupied[neighbor] or neighbor in first:
+                    continue
+                first[neighbor] = first[cell]
+                if ahead > best_distance:
+                    best, best_distance = first[cell], ahead
+                queue.append((neighbor, ahead))
+        return steps[best]
+
+    def escape(self, head, game):
+        """没有安全的一步时：走不反向的空邻居里回路距离最大的，没有时返回None"""
+        order, size = self.order, len(self.cycle)
+        reverse = self.reverse[game.direction]
+        free = [(neighbor, action) for neighbor, action in self.moves[head]
+                if action != reverse and not game.occupied[neighbor]]
+        if not free:
+            return None
+        return max(free, key=lambda move: (order[move[0]] - order[head]) % size)[1]
+
+
+def play(game, autopilot, max_ticks=None):
+    """无界面地让自动驾驶玩到一局结束（或者走了max_ticks步），返回走的步数"""
+    ticks = 0
+    while not game.game_over and (max_ticks is None or ticks < max_ticks):
+        game.advance(autopilot.action(game))
+        ticks += 1
+    return ticks
+
+
+def sweep(game_class, max_side=11, seeds=5, adversarial=False):
+    """在宽、高都不超过max_side的所有网格上用 range(seeds) 的种子各玩一局
+
+    game_class 是 SnakeGame（这个模块不导入它）。adversarial为True时每吃到
+    一个食物，就把新的食物挪到蛇头沿回路向前的第一个空格子上（最坏的情况：
+    蛇尾一直不动）。返回没有填满网格的局 [(宽, 高, 种子)]；每一局最多走
+    (格子数 ** 2) * 4 步，超过算失败。
+    """
+    failures = []
+    for width in range(1, max_side + 1):
+        for height in range(1, max_side + 1):
+            if width * height < 2:
+                continue
+            autopilot = Autopilot(width, height, game_class.ACTIONS)
+            cycle, order = autopilot.cycle, autopilot.order
+            for seed in range(seeds):
+                game = game_class(headless=True, seed=seed)
+                game.configure(f"grid:{width}x{height}")
+                ticks = 0
+                while not game.game_over and ticks < (width * height) ** 2 * 4:
+                    score = game.score
+                    game.advance(autopilot.action(game))
+                    ticks += 1
+                    if adversarial and game.score != score and game.food is not None:
+                        x, y = game.snake[0]
+                        position = order[y * width + x]
+                        while game.occupied[cycle[position]]:
+                            position = (position + 1) % len(cycle)
+                        game.food = (cycle[position] % width, cycle[position] // width)
+                if not game.won:
+                    failures.append((width, height, seed))
+    return failures
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Snake autopilot: check that it fills every small grid")
+    parser.add_argument('--max-side', type=int, default=11, help="largest width and height to play")
+    parser.add_argument('--seeds', type=int, default=5, help="games per grid size")
+    parser.add_argument('--adversarial', action='store_true',
+                        help="place every new food on the first free cell ahead of the head")
+    args = parser.parse_args(argv)
+    from snake_game import SnakeGame
+
+    failures = sweep(SnakeGame, args.max_side, args.seeds, args.adversarial)
+    for width, height, seed in failures:
+        print(f"FAILED: {width}x{height} seed {seed}")
+    grids = args.max_side * args.max_side - 1
+    print(f"{grids} grids x {args.seeds} seeds: {len(failures)} games did not fill the grid")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
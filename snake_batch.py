@@ -0,0 +1,258 @@
+"""批量贪吃蛇：N局游戏放在numpy数组里，每个逻辑帧一次向量化调用推进所有局
+
+训练机器人和压力测试要同时跑成千上万局，每局一个 SnakeGame 对象太慢。
+BatchSnake 把所有局的状态放在几个数组里（第一维是局的编号）：
+
+- occupied: (N, 格子数) 的uint8占用平面，格子编号与 SnakeGame 相同（y * 宽 + x）
+- body: (N, 格子数) 的环形缓冲区，存蛇身各节的格子编号；head_slot 是蛇头所在的
+  位置，往前数 length 节是蛇身，所以蛇头前进、蛇尾离开都只改一个位置
+- head、direction、food、score、length: 每局一个数
+
+规则与 SnakeGame.update 相同：上下、左右边缘相连；不能直接反向；撞到蛇身
+（包括这一步还没移走的蛇尾）结束；吃到食物长一节、加10分，食物在空格子里
+均匀随机地重新生成，没有空格子时赢了。结束的局在同一步里自动重新开始，
+step() 返回的 done 标出这些局，final_score 里是它们结束时的分数。
+
+食物的随机数流与 SnakeGame 不同，所以 verify() 拿同样的动作驱动一组
+SnakeGame，每一步把食物同步过去，再逐局比较蛇身、方向、分数和结束状态：
+
+    python snake_batch.py --envs 4096 --ticks 1000
+    python snake_batch.py --verify --envs 64 --ticks 2000 --grid 6x5
+
+需要numpy。
+"""
+import argparse
+import sys
+import time
+
+from snake_autopilot import Autopilot
+from snake_game import SnakeGame
+
+try:
+    import numpy as np
+except ImportError:  # numpy是可选依赖，只有批量贪吃蛇需要
+    np = None
+
+# 每一步的奖励：吃到食物加的分数
+FOOD_SCORE = 10
+
+
+class BatchSnake:
+    """N局同样大小的贪吃蛇，step() 一次推进所有局
+
+    动作与 SnakeGame 相同：方向下标 0=上 1=下 2=左 3=右，-1 表示保持方向。
+    """
+
+    def __init__(self, count, width=30, height=25, seed=None):
+        if np is None:
+            raise ImportError("the batched Snake engine needs numpy")
+        if width < 1 or height < 1 or width * height < 2:
+            raise ValueError(f"invalid grid size {width}x{height}")
+        self.count = count
+        self.width = width
+        self.height = height
+        self.cells = width * height
+        self.rng = np.random.default_rng(seed)
+        self.dx = np.array([dx for dx, dy in SnakeGame.ACTIONS], dtype=np.int32)
+        self.dy = np.array([dy for dx, dy in SnakeGame.ACTIONS], dtype=np.int32)
+        # 反方向的动作（上下、左右两两相邻）
+        self.reverse = np.array([SnakeGame.ACTIONS.index((-dx, -dy)) for dx, dy in SnakeGame.ACTIONS],
+                                dtype=np.int8)
+        self.start_cell = height // 2 * width + width // 2
+        self.start_direction = SnakeGame.ACTIONS.index((1, 0))
+
+        self.rows = np.arange(count)
+        self.occupied = np.zeros((count, self.cells), dtype=np.uint8)
+        self.body = np.zeros((count, self.cells), dtype=np.int32)
+        self.head_slot = np.zeros(count, dtype=np.int32)
+        self.head = np.zeros(count, dtype=np.int32)
+        self.length = np.zeros(count, dtype=np.int32)
+        self.direction = np.zeros(count, dtype=np.int8)
+        self.food = np.zeros(count, dtype=np.int32)
+        self.score = np.zeros(count, dtype=np.int32)
+        # 上一步结束的局结束时的分数、是否赢了
+        self.final_score = np.zeros(count, dtype=np.int32)
+        self.won = np.zeros(count, dtype=bool)
+        # 推进过的逻辑帧数、结束过的局数
+        self.ticks = 0
+        self.episodes = 0
+        self.reset_envs(self.rows)
+
+    def reset_envs(self, rows):
+        """让这些局重新开始：一节蛇身在网格中间，向右，重新放食物"""
+        self.occupied[rows] = 0
+        self.occupied[rows, self.start_cell] = 1
+        self.body[rows, 0] = self.start_cell
+        self.head_slot[rows] = 0
+        self.head[rows] = self.start_cell
+        self.length[rows] = 1
+        self.direction[rows] = self.start_direction
+        self.score[rows] = 0
+        self.food[rows] = self.place_food(rows)
+
+    def place_food(self, rows):
+        """在这些局的空格子里各随机选一个（均匀分布），没有空格子时是-1"""
+        free = self.occupied[rows] == 0
+        # 空格子取 [0, 1) 的随机数，占用的是-1，最大值的位置就是均匀选出的空格子
+        keys = np.where(free, self.rng.random(free.shape), -1.0)
+        return np.where(free.any(axis=1), keys.argmax(axis=1), -1).astype(np.int32)
+
+    def step(self, actions=None):
+        """所有局按各自的动作推进一个逻辑帧，返回 (观测, 奖励, 是否结束)
+
+        actions 是长度为N的整数序列（-1表示保持方向），None表示所有局都保持方向。
+        结束的局已经重新开始，返回的观测是新一局的。
+        """
+        rows = self.rows
+        direction = self.direction
+        if actions is not None:
+            actions = np.asarray(actions)
+            turn = (actions >= 0) & (actions != self.reverse[direction])
+            direction = self.direction = np.where(turn, actions, direction).astype(np.int8)
+
+        # 新的蛇头（边缘相连）
+        head = self.head
+        x = (head % self.width + self.dx[direction]) % self.width
+        y = (head // self.width + self.dy[direction]) % self.height
+        new_head = y * self.width + x
+
+        # 撞到蛇身（蛇尾这一步还没移走，撞上也算）的局不移动
+        crashed = self.occupied[rows, new_head] != 0
+        moving = rows[~crashed]
+        new_head = new_head[moving]
+        self.head_slot[moving] = (self.head_slot[moving] + 1) % self.cells
+        self.body[moving, self.head_slot[moving]] = new_head
+        self.occupied[moving, new_head] = 1
+        self.head[moving] = new_head
+
+        # 吃到食物的局长一节，其它移动的局移除蛇尾
+        eating = new_head == self.food[moving]
+        shrinking = moving[~eating]
+        tail_slot = (self.head_slot[shrinking] - self.length[shrinking]) % self.cells
+        self.occupied[shrinking, self.body[shrinking, tail_slot]] = 0
+        fed = moving[eating]
+        self.length[fed] += 1
+        self.score[fed] += FOOD_SCORE
+        if len(fed):
+            self.food[fed] = self.place_food(fed)
+
+        reward = np.zeros(self.count, dtype=np.int32)
+        reward[fed] = FOOD_SCORE
+        # 没有空格子放食物时蛇填满了网格，赢了
+        self.won = np.zeros(self.count, dtype=bool)
+        self.won[fed] = self.food[fed] < 0
+        done = crashed | self.won
+        self.ticks += 1
+        finished = rows[done]
+        if len(finished):
+            self.final_score[finished] = self.score[finished]
+            self.episodes += len(finished)
+            self.reset_envs(finished)
+        return self.observe(), reward, done
+
+    def observe(self):
+        """观测：各局的蛇头、食物（格子编号）、方向、长度、分数和 (N, 高, 宽) 的占用平面
+
+        返回的是内部数组，不要修改。
+        """
+        return {
+            'head': self.head,
+            'food': self.food,
+            'direction': self.direction,
+            'length': self.length,
+            'score': self.score,
+            'occupied': self.occupied.reshape(self.count, self.height, self.width),
+        }
+
+    def snake(self, index):
+        """第index局的蛇身格子编号（蛇头在前）"""
+        slots = (self.head_slot[index] - np.arange(self.length[index])) % self.cells
+        return self.body[index, slots].tolist()
+
+
+def verify(count=64, ticks=1000, width=30, height=25, seed=0, autopilot=False):
+    """用同样的动作驱动 BatchSnake 和 count 个 SnakeGame，逐步比较，不一致时抛出RuntimeError
+
+    动作是随机的（经常撞死，覆盖碰撞和重新开始）；autopilot为True时由各局的
+    SnakeGame 上的自动驾驶选动作（覆盖长蛇和填满网格）。返回结束过的局数。
+    """
+    batch = BatchSnake(count, width, height, seed)
+    games = []
+    for index in range(count):
+        game = SnakeGame(headless=True)
+        if (width, height) != (game.GRID_WIDTH, game.GRID_HEIGHT):
+            game.configure(f"grid:{width}x{height}")
+        games.append(game)
+    pilot = Autopilot(width, height, SnakeGame.ACTIONS) if autopilot else None
+    rng = np.random.default_rng(seed + 1)
+
+    def sync_food(index):
+        # 两边的随机数流不同，食物以批量引擎为准
+        food = int(batch.food[index])
+        games[index].food = None if food < 0 else (food % width, food // width)
+
+    for index in range(count):
+        sync_food(index)
+    for tick in range(ticks):
+        if pilot is not None:
+            actions = [pilot.action(game) for game in games]
+        else:
+            # 大约一半的步保持方向
+            actions = [int(a) if a < 4 else None for a in rng.integers(0, 8, count)]
+        _, reward, done = batch.step([-1 if a is None else a for a in actions])
+        for index, game in enumerate(games):
+            score = game.score
+            game.advance(actions[index])
+            if game.score - score != reward[index] or game.game_over != done[index]:
+                raise RuntimeError(f"env {index} tick {tick}: reward/done differ from SnakeGame")
+            if game.game_over:
+                if game.score != batch.final_score[index] or game.won != batch.won[index]:
+                    raise RuntimeError(f"env {index} tick {tick}: final score differs from SnakeGame")
+                game.reset_game()
+            else:
+                cells = [y * width + x for x, y in game.snake]
+                if (cells != batch.snake(index) or game.score != batch.score[index]
+                        or SnakeGame.ACTIONS[batch.direction[index]] != game.direction):
+                    raise RuntimeError(f"env {index} tick {tick}: state differs from SnakeGame")
+            if reward[index] or done[index]:
+                sync_food(index)
+    return batch.episodes
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Batched Snake engine: throughput and rule check")
+    parser.add_argument('--envs', type=int, default=4096, help="number of games stepped together")
+    parser.add_argument('--ticks', type=int, default=1000, help="ticks to run")
+    parser.add_argument('--grid', default='30x25', help="grid as WIDTHxHEIGHT")
+    parser.add_argument('--seed', type=int, default=0, help="random seed")
+    parser.add_argument('--verify', action='store_true',
+                        help="check every step against SnakeGame instead of timing")
+    parser.add_argument('--autopilot', action='store_true', help="with --verify, drive the games by autopilot")
+    args = parser.parse_args(argv)
+    width, height = (int(value) for value in args.grid.lower().split('x'))
+
+    if args.verify:
+        try:
+            episodes = verify(args.envs, args.ticks, width, height, args.seed, args.autopilot)
+        except RuntimeError as error:
+            print(f"MISMATCH: {error}")
+            return 1
+        print(f"{args.envs} games x {args.ticks} ticks ({episodes} finished) match SnakeGame")
+        return 0
+
+    batch = BatchSnake(args.envs, width, height, args.seed)
+    rng = np.random.default_rng(args.seed)
+    # 动作预先生成，不计入时间
+    actions = rng.integers(-1, 4, (args.ticks, args.envs))
+    start = time.perf_counter()
+    for tick in range(args.ticks):
+        batch.step(actions[tick])
+    elapsed = time.perf_counter() - start
+    print(f"{args.envs} games x {args.ticks} ticks on {width}x{height} in {elapsed:.2f} s: "
+          f"{elapsed / args.ticks * 1e3:.2f} ms per tick, {args.envs * args.ticks / elapsed:,.0f} game steps/s, "
+          f"{batch.episodes} finished")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
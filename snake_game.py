@@ -1,13 +1,28 @@
 import pygame
 import sys
-import random
-from typing import List, Tuple
+from collections import deque
+from itertools import islice
+from typing import List, Optional, Tuple
 
+from frame_profiler import FrameProfiler
+from game_loop import DISPLAY_FPS, FixedTimestep, lerp_position
+from game_api import HeadlessGame
+from game_ui import Button, Label, blit_text, draw_overlay
+from snake_autopilot import Autopilot
 
-class SnakeGame:
-    def __init__(self):
+
+class SnakeGame(HeadlessGame):
+    TITLE = "🐍 Snake Game"
+    ORDER = 10
+
+    # step() 的动作：方向下标 0=上 1=下 2=左 3=右，None表示保持方向
+    ACTIONS = [(0, -1), (0, 1), (-1, 0), (1, 0)]
+
+    def __init__(self, headless=False, seed=None):
         # 初始化pygame
         pygame.init()
+        # 游戏自己的随机数流，seed为None时随机选择（录制时会保存下来）
+        self.seed_rng(seed)
 
         # 游戏常量
         self.WIDTH, self.HEIGHT = 600, 500
@@ -28,44 +43,110 @@ class SnakeGame:
         self.BUTTON_HOVER = (70, 170, 70)  # 悬停状态
         self.BUTTON_CLICK = (30, 130, 30)  # 点击状态
 
-        # 创建游戏窗口
-        self.screen = pygame.display.set_mode((self.WIDTH, self.HEIGHT))
-        pygame.display.set_caption("Snake Game - Use Arrow Keys | Press ESC to Exit")
+        # 创建游戏窗口（headless模式下只创建内存画面）
+        self.screen = self.setup_screen((self.WIDTH, self.HEIGHT),
+                                        "Snake Game - Use Arrow Keys | A for Autopilot | Press ESC to Exit",
+                                        headless)
 
-        # 游戏时钟
+        # 游戏时钟：FPS是逻辑频率（蛇每秒走几格），画面按DISPLAY_FPS绘制
         self.clock = pygame.time.Clock()
         self.FPS = 10
 
+        # 文字和按钮
+        self.score_label = Label(36, self.TEXT_COLOR)
+        self.speed_label = Label(36, self.TEXT_COLOR)
+        self.restart_button = Button((self.WIDTH // 2 - 110, self.HEIGHT // 2 + 20, 220, 45),
+                                     "RESTART GAME", self.BUTTON_NORMAL, self.BUTTON_HOVER,
+                                     font_size=32)
+        self.exit_button = Button((self.WIDTH // 2 - 110, self.HEIGHT // 2 + 80, 220, 45),
+                                  "EXIT TO LAUNCHER", (150, 50, 50), (180, 60, 60),  # 红色系
+                                  font_size=32)
+
+        # 帧剖析器（默认关闭，F9开关，F10导出）
+        self.profiler = FrameProfiler(type(self).__name__)
+        self.profiler.instrument(self, 'draw_grid', 'update_field', 'draw_game_over_screen')
+
+        # 画好网格的背景，以及在背景上画好了蛇身（蛇头以外的各节）的场地层，
+        # 第一次绘制时创建；之后每一步只在场地层上重画变化的格子
+        self.background = None
+        self.field = None
+
+        # 自动驾驶（A键开关），打开时由它代替方向键选动作
+        self.autopilot = None
+
         # 游戏状态
         self.reset_game()
 
     def reset_game(self):
         """重置游戏状态"""
         # 蛇的初始位置和长度
-        self.snake = [(self.GRID_WIDTH // 2, self.GRID_HEIGHT // 2)]
+        self.set_snake([(self.GRID_WIDTH // 2, self.GRID_HEIGHT // 2)])
         self.direction = (1, 0)  # 初始向右移动
+        # 插值用：上一步是否移动过，以及上一步被移除的蛇尾
+        self.moved = False
+        self.prev_tail = None
         self.next_direction = self.direction
 
         # 生成第一个食物
         self.food = self.generate_food()
         self.score = 0
         self.game_over = False
+        # 蛇填满了整个网格
+        self.won = False
         self.restart_button_hover = False
         self.exit_button_hover = False
 
-    def generate_food(self) -> Tuple[int, int]:
-        """在随机位置生成食物，确保不在蛇身上"""
-        while True:
-            food_pos = (random.randint(0, self.GRID_WIDTH - 1),
-                        random.randint(0, self.GRID_HEIGHT - 1))
-            if food_pos not in self.snake:
-                return food_pos
+    def set_snake(self, cells):
+        """把蛇身设成cells（蛇头在前），重建占用表和空格子表
+
+        蛇身是deque：蛇头在左边加入、蛇尾从右边移除都是O(1)。格子编号是
+        y * GRID_WIDTH + x：occupied 是占用表，判断一个格子在不在蛇身上是O(1)；
+        free 是所有空格子的编号（顺序无关），free_slot[i] 是格子i在free里的
+        下标（被占用时为-1），占用时和free的最后一项交换后删除，也是O(1)。
+        """
+        self.snake = deque(cells)
+        size = self.GRID_WIDTH * self.GRID_HEIGHT
+        self.occupied = bytearray(size)
+        for x, y in self.snake:
+            self.occupied[y * self.GRID_WIDTH + x] = 1
+        self.free = [i for i in range(size) if not self.occupied[i]]
+        self.free_slot = [-1] * size
+        for slot, i in enumerate(self.free):
+            self.free_slot[i] = slot
+        # 场地层要全部重画
+        self.field_invalid = True
+        self.field_changes = []
+
+    def occupy(self, index):
+        """格子index成为蛇身：从空格子表里换到最后再删除"""
+        self.occupied[index] = 1
+        slot = self.free_slot[index]
+        last = self.free.pop()
+        if last != index:
+            self.free[slot] = last
+            self.free_slot[last] = slot
+        self.free_slot[index] = -1
+
+    def release(self, index):
+        """蛇尾离开了格子index"""
+        self.occupied[index] = 0
+        self.free_slot[index] = len(self.free)
+        self.free.append(index)
+
+    def generate_food(self) -> Optional[Tuple[int, int]]:
+        """在随机的空格子上生成食物，网格已经被蛇填满时返回None"""
+        if not self.free:
+            return None
+        index = self.free[self.rng.randrange(len(self.free))]
+        return index % self.GRID_WIDTH, index // self.GRID_WIDTH
 
     def handle_events(self):
         """处理游戏事件"""
         mouse_pos = pygame.mouse.get_pos()
 
         for event in pygame.event.get():
+            if self.profiler.handle_event(event):
+                continue
             if event.type == pygame.QUIT:
                 pygame.quit()
                 sys.exit()
@@ -73,23 +154,25 @@ class SnakeGame:
                 if event.key == pygame.K_ESCAPE:
                     return False  # 退出游戏
 
-                # 方向控制（不能直接反向移动）
-                if event.key == pygame.K_UP and self.direction != (0, 1):
-                    self.next_direction = (0, -1)
-                elif event.key == pygame.K_DOWN and self.direction != (0, -1):
-                    self.next_direction = (0, 1)
-                elif event.key == pygame.K_LEFT and self.direction != (1, 0):
-                    self.next_direction = (-1, 0)
-                elif event.key == pygame.K_RIGHT and self.direction != (-1, 0):
-                    self.next_direction = (1, 0)
+                # 方向控制（不能直接反向移动），在下一个逻辑帧作为动作生效
+                if event.key == pygame.K_UP:
+                    self.pending_action = 0
+                elif event.key == pygame.K_DOWN:
+                    self.pending_action = 1
+                elif event.key == pygame.K_LEFT:
+                    self.pending_action = 2
+                elif event.key == pygame.K_RIGHT:
+                    self.pending_action = 3
+                elif event.key == pygame.K_a:
+                    self.toggle_autopilot()
                 # 保留R键重新开始功能，但不是必需的
                 elif event.key == pygame.K_r and self.game_over:
-                    self.reset_game()
+                    self.restart()
 
             elif event.type == pygame.MOUSEBUTTONDOWN and self.game_over:
                 # 检查是否点击了重新开始按钮
                 if hasattr(self, 'restart_button_rect') and self.restart_button_rect.collidepoint(mouse_pos):
-                    self.reset_game()
+                    self.restart()
                 # 检查是否点击了退出按钮
                 elif hasattr(self, 'exit_button_rect') and self.exit_button_rect.collidepoint(mouse_pos):
                     return False
@@ -103,8 +186,65 @@ class SnakeGame:
 
         return True  # 继续游戏
 
+    def turn(self, direction):
+        """改变下一步的方向（不能直接反向移动）"""
+        dx, dy = direction
+        if self.direction != (-dx, -dy):
+            self.next_direction = direction
+
+    def toggle_autopilot(self):
+        """打开或关闭自动驾驶（见snake_autopilot.py）
+
+        从一局开始就打开时一定能填满网格；中途接管时蛇身不一定沿着回路，
+        只能尽量避开。
+        """
+        if self.autopilot is None:
+            self.autopilot = Autopilot(self.GRID_WIDTH, self.GRID_HEIGHT, self.ACTIONS)
+        else:
+            self.autopilot = None
+
+    def apply_action(self, action):
+        if action is not None:
+            self.turn(self.ACTIONS[action])
+
+    def update_tick(self):
+        self.update()
+
+    def observe(self):
+        """观测：蛇身（蛇头在前的deque）、食物、方向和分数。返回的是内部对象，不要修改"""
+        return {
+            'snake': self.snake,
+            'food': self.food,
+            'direction': self.direction,
+            'score': self.score,
+        }
+
+    def apply_config(self, option):
+        """configure() 的选项：网格大小 'grid:宽x高'，重新开始一局
+
+        只能在headless模式下修改，用来在大网格上测试机器人和自动驾驶；
+        画面大小不变，render() 只画出左上角的一部分。
+        """
+        if not option.startswith('grid:'):
+            raise ValueError(f"unknown option {option!r}")
+        width, height = (int(value) for value in option[len('grid:'):].lower().split('x'))
+        if width < 1 or height < 1 or width * height < 2:
+            raise ValueError(f"invalid grid size {width}x{height}")
+        if not self.headless:
+            raise ValueError("the grid size can only be changed in headless mode")
+        self.GRID_WIDTH, self.GRID_HEIGHT = width, height
+        if self.autopilot is not None:
+            self.autopilot = Autopilot(width, height, self.ACTIONS)
+        self.reset_game()
+
+    def current_config(self):
+        if (self.GRID_WIDTH, self.GRID_HEIGHT) != (self.WIDTH // self.GRID_SIZE, self.HEIGHT // self.GRID_SIZE):
+            return f"grid:{self.GRID_WIDTH}x{self.GRID_HEIGHT}"
+        return None
+
     def update(self):
         """更新游戏状态"""
+        self.moved = False
         if self.game_over:
             return
 
@@ -117,203 +257,227 @@ class SnakeGame:
         new_head = ((head_x + dx) % self.GRID_WIDTH,
                     (head_y + dy) % self.GRID_HEIGHT)
 
-        # 检查是否撞到自己
-        if new_head in self.snake:
+        # 检查是否撞到自己（蛇尾这一步还没移走，撞上也算）
+        head_index = new_head[1] * self.GRID_WIDTH + new_head[0]
+        if self.occupied[head_index]:
             self.game_over = True
             return
 
-        # 添加新的蛇头
-        self.snake.insert(0, new_head)
+        # 添加新的蛇头，原来的蛇头在场地层上变成蛇身
+        self.snake.appendleft(new_head)
+        self.occupy(head_index)
+        if len(self.snake) > 1:
+            self.field_changes.append((self.snake[1], True))
 
         # 检查是否吃到食物
         if new_head == self.food:
             self.score += 10
             self.food = self.generate_food()
+            if self.food is None:
+                # 没有空格子了：蛇填满了网格，赢了
+                self.won = True
+                self.game_over = True
             # 每得50分增加速度
             if self.score % 50 == 0 and self.FPS < 20:
                 self.FPS += 1
+            self.prev_tail = self.snake[-1]
         else:
             # 没吃到食物则移除蛇尾
-            self.snake.pop()
-
-    def draw_grid(self):
-        """绘制游戏网格"""
+            tail_x, tail_y = self.prev_tail = self.snake.pop()
+            self.release(tail_y * self.GRID_WIDTH + tail_x)
+            self.field_changes.append((self.prev_tail, False))
+        self.moved = True
+        # 很久没有绘制（headless）时不再累积，下次绘制时全部重画
+        if len(self.field_changes) > len(self.snake) + 2:
+            self.field_invalid = True
+            self.field_changes.clear()
+
+    def draw_grid(self, surface):
+        """绘制游戏网格（只在创建背景时画一次）"""
         for x in range(0, self.WIDTH, self.GRID_SIZE):
-            pygame.draw.line(self.screen, self.GRID_COLOR,
+            pygame.draw.line(surface, self.GRID_COLOR,
                              (x, 0), (x, self.HEIGHT), 1)
         for y in range(0, self.HEIGHT, self.GRID_SIZE):
-            pygame.draw.line(self.screen, self.GRID_COLOR,
+            pygame.draw.line(surface, self.GRID_COLOR,
                              (0, y), (self.WIDTH, y), 1)
 
+    def update_field(self):
+        """把蛇身的变化画到场地层上
+
+        每一步只有原来的蛇头变成蛇身、蛇尾离开的格子恢复成背景，蛇头和
+        插值中的蛇尾在draw()里每帧单独画，所以不管蛇多长，每帧的开销都一样。
+        """
+        if self.background is None:
+            self.background = pygame.Surface((self.WIDTH, self.HEIGHT))
+            if pygame.display.get_surface() is not None:
+                self.background = self.background.convert()
+            self.background.fill(self.BG_COLOR)
+            self.draw_grid(self.background)
+        if self.field is None or self.field_invalid:
+            self.field = self.background.copy()
+            for x, y in islice(self.snake, 1, None):
+                self.draw_segment(self.field, x, y, self.SNAKE_COLOR)
+            self.field_invalid = False
+        else:
+            size = self.GRID_SIZE
+            for (x, y), body in self.field_changes:
+                if body:
+                    self.draw_segment(self.field, x, y, self.SNAKE_COLOR)
+                else:
+                    rect = (x * size, y * size, size, size)
+                    self.field.blit(self.background, rect, rect)
+        self.field_changes.clear()
+
+    def draw_segment(self, surface, x, y, color):
+        """在格子坐标 (x, y) 画一节蛇身（坐标可以是插值出来的小数）"""
+        rect = pygame.Rect(x * self.GRID_SIZE, y * self.GRID_SIZE,
+                           self.GRID_SIZE, self.GRID_SIZE)
+        pygame.draw.rect(surface, color, rect)
+        pygame.draw.rect(surface, (color[0] // 2, color[1] // 2, color[2] // 2),
+                         rect, 2)  # 边框
+
     def draw_game_over_screen(self):
         """绘制游戏结束画面"""
         # 半透明覆盖层
-        overlay = pygame.Surface((self.WIDTH, self.HEIGHT), pygame.SRCALPHA)
-        overlay.fill((0, 0, 0, 180))  # 黑色半透明
-        self.screen.blit(overlay, (0, 0))
+        draw_overlay(self.screen)
 
-        # 游戏结束文字
-        game_over_font = pygame.font.SysFont(None, 64)
-        game_over_text = game_over_font.render("GAME OVER", True, (255, 50, 50))
-        self.screen.blit(game_over_text,
-                         (self.WIDTH // 2 - game_over_text.get_width() // 2,
-                          self.HEIGHT // 2 - 90))
+        # 游戏结束文字（蛇填满网格时是胜利）
+        if self.won:
+            blit_text(self.screen, "YOU WIN!", self.SNAKE_HEAD_COLOR, 64,
+                      midtop=(self.WIDTH // 2, self.HEIGHT // 2 - 90))
+        else:
+            blit_text(self.screen, "GAME OVER", (255, 50, 50), 64,
+                      midtop=(self.WIDTH // 2, self.HEIGHT // 2 - 90))
 
         # 最终分数
-        final_score_font = pygame.font.SysFont(None, 48)
-        final_score_text = final_score_font.render(f"Final Score: {self.score}",
-                                                   True, self.TEXT_COLOR)
-        self.screen.blit(final_score_text,
-                         (self.WIDTH // 2 - final_score_text.get_width() // 2,
-                          self.HEIGHT // 2 - 30))
-
-        # 按钮字体
-        button_font = pygame.font.SysFont(None, 32)
+        blit_text(self.screen, f"Final Score: {self.score}", self.TEXT_COLOR, 48,
+                  midtop=(self.WIDTH // 2, self.HEIGHT // 2 - 30))
 
         # 绘制重新开始按钮
-        restart_button_rect = pygame.Rect(
-            self.WIDTH // 2 - 110,
-            self.HEIGHT // 2 + 20,
-            220, 45
-        )
-        self.restart_button_rect = restart_button_rect
-
-        # 根据状态选择按钮颜色
-        if self.restart_button_hover:
-            restart_button_color = self.BUTTON_HOVER
-        else:
-            restart_button_color = self.BUTTON_NORMAL
-
-        pygame.draw.rect(self.screen, restart_button_color, restart_button_rect, border_radius=8)
-        pygame.draw.rect(self.screen, (220, 220, 220), restart_button_rect, 2, border_radius=8)
-
-        restart_text = button_font.render("RESTART GAME", True, (255, 255, 255))
-        self.screen.blit(restart_text,
-                         (restart_button_rect.centerx - restart_text.get_width() // 2,
-                          restart_button_rect.centery - restart_text.get_height() // 2))
+        self.restart_button.hovered = self.restart_button_hover
+        self.restart_button.draw(self.screen)
+        self.restart_button_rect = self.restart_button.rect
 
         # 绘制退出按钮
-        exit_button_rect = pygame.Rect(
-            self.WIDTH // 2 - 110,
-            self.HEIGHT // 2 + 80,
-            220, 45
-        )
-        self.exit_button_rect = exit_button_rect
-
-        # 根据状态选择按钮颜色
-        if self.exit_button_hover:
-            exit_button_color = (180, 60, 60)  # 红色系悬停
-        else:
-            exit_button_color = (150, 50, 50)  # 红色系正常
-
-        pygame.draw.rect(self.screen, exit_button_color, exit_button_rect, border_radius=8)
-        pygame.draw.rect(self.screen, (220, 220, 220), exit_button_rect, 2, border_radius=8)
-
-        exit_text = button_font.render("EXIT TO LAUNCHER", True, (255, 255, 255))
-        self.screen.blit(exit_text,
-                         (exit_button_rect.centerx - exit_text.get_width() // 2,
-                          exit_button_rect.centery - exit_text.get_height() // 2))
+        self.exit_button.hovered = self.exit_button_hover
+        self.exit_button.draw(self.screen)
+        self.exit_button_rect = self.exit_button.rect
 
         # 键盘提示（小字提示，可选）
-        hint_font = pygame.font.SysFont(None, 20)
-        hint_text = hint_font.render("(You can also press R to restart or ESC to exit)", True, (180, 180, 180))
-        self.screen.blit(hint_text,
-                         (self.WIDTH // 2 - hint_text.get_width() // 2,
-                          self.HEIGHT // 2 + 140))
-
-    def draw(self):
-        """绘制游戏元素"""
-        # 填充背景色
-        self.screen.fill(self.BG_COLOR)
-
-        # 绘制网格
-        self.draw_grid()
-
-        # 绘制蛇
-        for i, (x, y) in enumerate(self.snake):
-            color = self.SNAKE_HEAD_COLOR if i == 0 else self.SNAKE_COLOR
-            rect = pygame.Rect(x * self.GRID_SIZE, y * self.GRID_SIZE,
-                               self.GRID_SIZE, self.GRID_SIZE)
-            pygame.draw.rect(self.screen, color, rect)
-            pygame.draw.rect(self.screen, (color[0] // 2, color[1] // 2, color[2] // 2),
-                             rect, 2)  # 边框
-
-            # 蛇头眼睛
-            if i == 0:
-                eye_size = self.GRID_SIZE // 5
-                # 根据方向确定眼睛位置
-                dx, dy = self.direction
-                if dx != 0:  # 左右移动
-                    pygame.draw.circle(self.screen, (0, 0, 0),
-                                       (x * self.GRID_SIZE + self.GRID_SIZE // 3,
-                                        y * self.GRID_SIZE + self.GRID_SIZE // 3),
-                                       eye_size)
-                    pygame.draw.circle(self.screen, (0, 0, 0),
-                                       (x * self.GRID_SIZE + 2 * self.GRID_SIZE // 3,
-                                        y * self.GRID_SIZE + self.GRID_SIZE // 3),
-                                       eye_size)
-                else:  # 上下移动
-                    pygame.draw.circle(self.screen, (0, 0, 0),
-                                       (x * self.GRID_SIZE + self.GRID_SIZE // 3,
-                                        y * self.GRID_SIZE + self.GRID_SIZE // 3),
-                                       eye_size)
-                    pygame.draw.circle(self.screen, (0, 0, 0),
-                                       (x * self.GRID_SIZE + 2 * self.GRID_SIZE // 3,
-                                        y * self.GRID_SIZE + self.GRID_SIZE // 3),
-                                       eye_size)
-
-        # 绘制食物（苹果形状）
-        food_rect = pygame.Rect(self.food[0] * self.GRID_SIZE + 2,
-                                self.food[1] * self.GRID_SIZE + 2,
-                                self.GRID_SIZE - 4, self.GRID_SIZE - 4)
-        pygame.draw.circle(self.screen, self.FOOD_COLOR,
-                           food_rect.center, food_rect.width // 2)
-        # 食物茎
-        pygame.draw.rect(self.screen, (139, 69, 19),  # 棕色
-                         (self.food[0] * self.GRID_SIZE + self.GRID_SIZE // 2 - 2,
-                          self.food[1] * self.GRID_SIZE - 3, 4, 6))
+        blit_text(self.screen, "(You can also press R to restart or ESC to exit)", (180, 180, 180), 20,
+                  midtop=(self.WIDTH // 2, self.HEIGHT // 2 + 140))
+
+    def draw(self, alpha=1.0):
+        """绘制游戏元素，alpha是上一逻辑帧到当前逻辑帧之间的插值系数"""
+        # 背景、网格和不动的蛇身都在场地层上
+        self.update_field()
+        self.screen.blit(self.field, (0, 0))
+
+        # 在上一步和当前步之间插值：走一步后第i节的上一个位置是现在的第i+1节，
+        # 中间各节正好互相接上，看起来和停在格子上一样；只有蛇尾从离开的格子
+        # 缩回来（上一个位置是被移除的蛇尾），蛇头伸进新的格子
+        snake = self.snake
+        if alpha < 1 and self.moved and len(snake) > 1:
+            x, y = lerp_position(self.prev_tail, snake[-1], alpha)
+            self.draw_segment(self.screen, x, y, self.SNAKE_COLOR)
+        if alpha < 1 and self.moved:
+            x, y = lerp_position(snake[1] if len(snake) > 1 else self.prev_tail, snake[0], alpha)
+        else:
+            x, y = snake[0]
+        self.draw_segment(self.screen, x, y, self.SNAKE_HEAD_COLOR)
+
+        # 蛇头眼睛
+        eye_size = self.GRID_SIZE // 5
+        # 根据方向确定眼睛位置
+        dx, dy = self.direction
+        if dx != 0:  # 左右移动
+            pygame.draw.circle(self.screen, (0, 0, 0),
+                               (x * self.GRID_SIZE + self.GRID_SIZE // 3,
+                                y * self.GRID_SIZE + self.GRID_SIZE // 3),
+                               eye_size)
+            pygame.draw.circle(self.screen, (0, 0, 0),
+                               (x * self.GRID_SIZE + 2 * self.GRID_SIZE // 3,
+                                y * self.GRID_SIZE + self.GRID_SIZE // 3),
+                               eye_size)
+        else:  # 上下移动
+            pygame.draw.circle(self.screen, (0, 0, 0),
+                               (x * self.GRID_SIZE + self.GRID_SIZE // 3,
+                                y * self.GRID_SIZE + self.GRID_SIZE // 3),
+                               eye_size)
+            pygame.draw.circle(self.screen, (0, 0, 0),
+                               (x * self.GRID_SIZE + 2 * self.GRID_SIZE // 3,
+                                y * self.GRID_SIZE + self.GRID_SIZE // 3),
+                               eye_size)
+
+        # 绘制食物（苹果形状），蛇填满网格后没有食物
+        if self.food is not None:
+            self.draw_food()
 
         # 绘制分数
-        font = pygame.font.SysFont(None, 36)
-        score_text = font.render(f"Score: {self.score}", True, self.TEXT_COLOR)
-        self.screen.blit(score_text, (10, 10))
+        self.score_label.draw(self.screen, f"Score: {self.score}", topleft=(10, 10))
 
         # 绘制速度
-        speed_text = font.render(f"Speed: {self.FPS}", True, self.TEXT_COLOR)
-        self.screen.blit(speed_text, (self.WIDTH - 120, 10))
+        self.speed_label.draw(self.screen, f"Speed: {self.FPS}", topleft=(self.WIDTH - 120, 10))
 
         # 游戏结束显示
         if self.game_over:
             self.draw_game_over_screen()
         else:
             # 绘制控制提示（游戏未结束时）
-            control_font = pygame.font.SysFont(None, 24)
-            control_text = control_font.render("Use Arrow Keys to Move | ESC to Exit",
-                                               True, (150, 150, 150))
-            self.screen.blit(control_text,
-                             (self.WIDTH // 2 - control_text.get_width() // 2,
-                              self.HEIGHT - 30))
+            blit_text(self.screen, "Use Arrow Keys to Move | A: Autopilot | ESC to Exit", (150, 150, 150), 24,
+                      midtop=(self.WIDTH // 2, self.HEIGHT - 30))
 
-        # 更新显示
-        pygame.display.flip()
+    def draw_food(self):
+        """绘制食物（苹果形状）"""
+        food_rect = pygame.Rect(self.food[0] * self.GRID_SIZE + 2,
+                                self.food[1] * self.GRID_SIZE + 2,
+                                self.GRID_SIZE - 4, self.GRID_SIZE - 4)
+        pygame.draw.circle(self.screen, self.FOOD_COLOR,
+                           food_rect.center, food_rect.width // 2)
+        # 食物茎
+        pygame.draw.rect(self.screen, (139, 69, 19),  # 棕色
+                         (self.food[0] * self.GRID_SIZE + self.GRID_SIZE // 2 - 2,
+                          self.food[1] * self.GRID_SIZE - 3, 4, 6))
 
     def run(self):
-        """运行游戏主循环"""
+        """运行游戏主循环：逻辑按FPS固定步长推进，画面按DISPLAY_FPS插值绘制"""
+        profiler = self.profiler
+        self.start_recording()
+        timestep = FixedTimestep(self.FPS)
+        dt = 0.0
+        # 按键产生的动作，下一个逻辑帧使用
+        self.pending_action = None
         running = True
         while running:
-            # 1. 处理事件
-            running = self.handle_events()
+            profiler.begin_frame()
 
-            # 2. 更新游戏状态
-            self.update()
+            # 1. 处理事件
+            with profiler.phase('event'):
+                running = self.handle_events()
+
+            # 2. 更新游戏状态（吃到食物加速后FPS会变）
+            with profiler.phase('update'):
+                timestep.tick_rate = self.FPS
+                for _ in range(timestep.advance(dt)):
+                    action = self.pending_action
+                    if self.autopilot is not None and not self.game_over:
+                        action = self.autopilot.action(self)
+                    self.advance(action)
+                    self.pending_action = None
 
             # 3. 绘制游戏
-            self.draw()
+            with profiler.phase('draw'):
+                self.draw(timestep.alpha)
+            with profiler.phase('flip'):
+                pygame.display.flip()
 
-            # 4. 控制游戏帧率
-            self.clock.tick(self.FPS)
+            # 4. 控制画面帧率
+            with profiler.phase('tick'):
+                dt = self.clock.tick(DISPLAY_FPS) / 1000
 
         # 退出游戏
+        self.stop_recording()
+        profiler.close()
         pygame.quit()
         return
 
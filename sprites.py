@@ -0,0 +1,72 @@
+"""预先烘焙的精灵
+
+幽灵、敌机、旗子、地雷这类由多个图元（圆、多边形、线）拼成的实体，
+每种外观只在第一次出现时画到一个透明Surface上，转换成显示格式
+（convert_alpha）后缓存，之后每个实体每帧只需要一次blit。
+
+    sprite = bake(('ghost', color), (0, -4, 40, 44),
+                  lambda surface, x, y: self.paint_ghost(surface, x, y, color))
+    sprite.blit(self.screen, gx, gy)
+
+key 唯一标识一种外观（颜色、类型、朝向、尺寸……），bounds 是以实体
+锚点为原点的包围矩形，paint(surface, x, y) 以 (x, y) 为锚点绘制，与直接
+画到屏幕上的代码相同。pygame.quit() 之后显示格式可能变化，缓存会自动清空。
+"""
+import pygame
+
+_sprites = {}
+_quit_hook_registered = False
+
+
+def clear_cache():
+    """清空精灵缓存"""
+    global _quit_hook_registered
+    _sprites.clear()
+    _quit_hook_registered = False
+
+
+class Sprite:
+    __slots__ = ('surface', 'offset', 'opaque', 'converted')
+
+    def __init__(self, surface, offset, opaque):
+        self.surface = surface
+        self.offset = offset
+        self.opaque = opaque
+        self.converted = False
+
+    def convert(self):
+        """转换成显示格式（还没有窗口时，例如headless模式，保持原样）"""
+        if self.converted or pygame.display.get_surface() is None:
+            return
+        self.surface = self.surface.convert() if self.opaque else self.surface.convert_alpha()
+        self.converted = True
+
+    def blit(self, target, x, y):
+        """把精灵的锚点画在 (x, y)，返回占用的矩形"""
+        ox, oy = self.offset
+        return target.blit(self.surface, (x + ox, y + oy))
+
+
+def bake(key, bounds, paint, opaque=False):
+    """返回key对应的精灵，第一次请求时调用paint绘制
+
+    opaque=True 表示paint会画满整个bounds（例如扫雷的格子），
+    这时不需要alpha通道，blit更快。
+    """
+    global _quit_hook_registered
+    sprite = _sprites.get(key)
+    if sprite is None:
+        # pygame每次quit后会清空已注册的回调，所以每轮都要重新注册
+        if not _quit_hook_registered:
+            pygame.register_quit(clear_cache)
+            _quit_hook_registered = True
+        left, top, width, height = bounds
+        if opaque:
+            surface = pygame.Surface((width, height))
+        else:
+            surface = pygame.Surface((width, height), pygame.SRCALPHA)
+        paint(surface, -left, -top)
+        sprite = _sprites[key] = Sprite(surface, (left, top), opaque)
+    if not sprite.converted:
+        sprite.convert()
+    return sprite
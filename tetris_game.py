@@ -1,61 +1,46 @@
 import pygame
-import random
 import sys
 
+from dirty_rects import DirtyRegions
+from frame_profiler import FrameProfiler
+from game_loop import DISPLAY_FPS, FixedTimestep
+from game_api import HeadlessGame
+from game_ui import Button, Label, blit_text, draw_overlay
 
-class Button:
-    """Button class for creating clickable buttons"""
-
-    def __init__(self, x, y, width, height, text, color=(70, 130, 180), hover_color=(100, 160, 210),
-                 text_color=(255, 255, 255)):
-        self.rect = pygame.Rect(x, y, width, height)
-        self.text = text
-        self.color = color
-        self.hover_color = hover_color
-        self.text_color = text_color
-        self.font = pygame.font.SysFont(None, 32)
-        self.hovered = False
-
-    def draw(self, surface):
-        """Draw the button on the given surface"""
-        # Draw button with hover effect
-        current_color = self.hover_color if self.hovered else self.color
-        pygame.draw.rect(surface, current_color, self.rect, border_radius=8)
-        pygame.draw.rect(surface, (200, 200, 200), self.rect, 2, border_radius=8)
-
-        # Draw text
-        text_surf = self.font.render(self.text, True, self.text_color)
-        text_rect = text_surf.get_rect(center=self.rect.center)
-        surface.blit(text_surf, text_rect)
-
-    def check_hover(self, pos):
-        """Check if mouse is hovering over button"""
-        self.hovered = self.rect.collidepoint(pos)
-        return self.hovered
-
-    def is_clicked(self, event):
-        """Check if button was clicked"""
-        if event.type == pygame.MOUSEBUTTONDOWN and event.button == 1:
-            return self.rect.collidepoint(event.pos)
-        return False
 
+class TetrisGame(HeadlessGame):
+    TITLE = "🔷 Tetris"
+    ORDER = 30
+
+    # step() actions are a bitmask of the following flags (0 or None = no input)
+    ACTION_LEFT = 1
+    ACTION_RIGHT = 2
+    ACTION_ROTATE = 4
+    ACTION_SOFT_DROP = 8
+    ACTION_HARD_DROP = 16
 
-class TetrisGame:
-    def __init__(self):
+    def __init__(self, headless=False, seed=None):
         pygame.init()
+        # Per-game random stream; a random seed is picked when None (saved when recording)
+        self.seed_rng(seed)
         self.CELL_SIZE = 30
         self.GRID_WIDTH = 10
         self.GRID_HEIGHT = 20
         # Increase screen width to accommodate button
         self.SCREEN_WIDTH = self.CELL_SIZE * (self.GRID_WIDTH + 10)
         self.SCREEN_HEIGHT = self.CELL_SIZE * self.GRID_HEIGHT
-        self.screen = pygame.display.set_mode((self.SCREEN_WIDTH, self.SCREEN_HEIGHT))
-        pygame.display.set_caption("Tetris - Arrow Keys: Move, Up: Rotate | ESC to Exit")
+        self.screen = self.setup_screen((self.SCREEN_WIDTH, self.SCREEN_HEIGHT),
+                                        "Tetris - Arrow Keys: Move, Up: Rotate | ESC to Exit",
+                                        headless)
         self.clock = pygame.time.Clock()
-        self.FPS = 60
+        self.FPS = 60  # Logic ticks per second; falling is timed in ticks, not frames
         self.FALL_SPEED = 0.5  # Block fall speed (seconds per cell)
         self.fall_timer = 0
 
+        # Frame profiler (off by default, F9 toggles, F10 dumps)
+        self.profiler = FrameProfiler(type(self).__name__)
+        self.profiler.instrument(self, 'draw_grid', 'draw_game_over')
+
         # Color definitions
         self.BLACK = (0, 0, 0)
         self.WHITE = (255, 255, 255)
@@ -81,9 +66,30 @@ class TetrisGame:
             [[1, 1, 0], [0, 1, 1]]  # Z
         ]
 
+        # Labels for the changing stats
+        self.score_label = Label(24, self.WHITE)
+        self.level_label = Label(24, self.WHITE)
+        self.lines_label = Label(24, self.WHITE)
+
         # Initialize restart button (initially hidden)
         self.restart_button = None
 
+        # Dirty-rect rendering: only well cells and side panels that changed are redrawn
+        # (F8 shows the redrawn regions)
+        self.dirty = DirtyRegions()
+        for y in range(self.GRID_HEIGHT):
+            for x in range(self.GRID_WIDTH):
+                self.dirty.add((x * self.CELL_SIZE, y * self.CELL_SIZE, self.CELL_SIZE, self.CELL_SIZE),
+                               lambda x=x, y=y: self.cell_color(x, y),
+                               lambda x=x, y=y: self.draw_cell(x, y))
+        panel_x = (self.GRID_WIDTH + 2) * self.CELL_SIZE
+        self.dirty.add((panel_x, 3 * self.CELL_SIZE, 4 * self.CELL_SIZE, 2 * self.CELL_SIZE),
+                       lambda: self.current_shape_idx,
+                       lambda: self.draw_preview())
+        self.dirty.add((panel_x, 8 * self.CELL_SIZE, self.SCREEN_WIDTH - panel_x, 4 * self.CELL_SIZE),
+                       lambda: (self.score, self.level, self.lines_cleared),
+                       lambda: self.draw_stats())
+
         self.reset_game()
 
     def reset_game(self):
@@ -93,16 +99,16 @@ class TetrisGame:
         self.level = 1
         self.lines_cleared = 0
         self.game_over = False
+        self.soft_drop = False
+        self.fall_timer = 0
         self.new_piece()
-        self.font = pygame.font.SysFont(None, 24)
-        self.font_large = pygame.font.SysFont(None, 36)
 
         # Hide restart button when game starts
         self.restart_button = None
 
     def new_piece(self):
         """Create new piece"""
-        self.current_shape_idx = random.randint(0, len(self.SHAPES) - 1)
+        self.current_shape_idx = self.rng.randint(0, len(self.SHAPES) - 1)
         self.current_shape = [row[:] for row in self.SHAPES[self.current_shape_idx]]
         self.current_color = self.COLORS[self.current_shape_idx]
         self.current_x = self.GRID_WIDTH // 2 - len(self.current_shape[0]) // 2
@@ -122,11 +128,12 @@ class TetrisGame:
         button_y = self.SCREEN_HEIGHT - button_height - 40  # Y coordinate: 40 pixels above bottom
 
         self.restart_button = Button(
-            button_x,
-            button_y,
-            button_width,
-            button_height,
-            "RESTART"
+            (button_x, button_y, button_width, button_height),
+            "RESTART",
+            (70, 130, 180),
+            (100, 160, 210),
+            font_size=32,
+            border_color=(200, 200, 200)
         )
 
     def check_collision(self, x, y, shape):
@@ -190,6 +197,95 @@ class TetrisGame:
 
         return line_count
 
+    def move(self, dx):
+        """Move the current piece horizontally if possible"""
+        if not self.check_collision(self.current_x + dx, self.current_y, self.current_shape):
+            self.current_x += dx
+
+    def rotate(self):
+        """Rotate the current piece if possible"""
+        rotated = self.rotate_shape(self.current_shape)
+        if not self.check_collision(self.current_x, self.current_y, rotated):
+            self.current_shape = rotated
+
+    def hard_drop(self):
+        """Drop the current piece to the bottom"""
+        while not self.check_collision(self.current_x, self.current_y + 1, self.current_shape):
+            self.current_y += 1
+
+    def update(self, delta_time):
+        """Advance falling by delta_time seconds"""
+        if self.game_over:
+            return
+
+        # Update fall timer
+        speed = self.FALL_SPEED / 10 if self.soft_drop else self.FALL_SPEED
+        self.fall_timer += delta_time
+
+        if self.fall_timer >= speed:
+            self.fall_timer = 0
+            # Try to move down
+            if not self.check_collision(self.current_x, self.current_y + 1, self.current_shape):
+                self.current_y += 1
+            else:
+                # Can't move down, merge piece and create new one
+                self.merge_piece()
+                self.clear_lines()
+                self.new_piece()
+
+    def apply_action(self, action):
+        action = action or 0
+        self.soft_drop = bool(action & self.ACTION_SOFT_DROP)
+        if self.game_over:
+            return
+        if action & self.ACTION_LEFT:
+            self.move(-1)
+        if action & self.ACTION_RIGHT:
+            self.move(1)
+        if action & self.ACTION_ROTATE:
+            self.rotate()
+        if action & self.ACTION_HARD_DROP:
+            self.hard_drop()
+
+    def update_tick(self):
+        self.update(1.0 / self.FPS)
+
+    def observe(self):
+        """Observation: locked grid (0 or color), current piece and stats. Do not mutate"""
+        return {
+            'grid': self.grid,
+            'shape': self.current_shape,
+            'x': self.current_x,
+            'y': self.current_y,
+            'score': self.score,
+            'lines': self.lines_cleared,
+        }
+
+    def cell_color(self, x, y):
+        """Color currently shown in well cell (x, y), 0 if empty"""
+        row = y - self.current_y
+        col = x - self.current_x
+        if (0 <= row < len(self.current_shape) and 0 <= col < len(self.current_shape[row])
+                and self.current_shape[row][col]):
+            return self.current_color
+        return self.grid[y][x]
+
+    def draw_cell(self, x, y):
+        """Redraw a single well cell, including its background"""
+        self.screen.fill(self.BLACK, (x * self.CELL_SIZE, y * self.CELL_SIZE,
+                                      self.CELL_SIZE, self.CELL_SIZE))
+        rect = pygame.Rect(
+            x * self.CELL_SIZE,
+            y * self.CELL_SIZE,
+            self.CELL_SIZE - 1,
+            self.CELL_SIZE - 1
+        )
+        color = self.cell_color(x, y)
+        if color:
+            pygame.draw.rect(self.screen, color, rect)
+        else:
+            pygame.draw.rect(self.screen, self.GRAY, rect, 1)
+
     def draw_grid(self):
         """Draw game grid and pieces"""
         # Draw background grid
@@ -221,37 +317,16 @@ class TetrisGame:
         # Draw next piece preview
         preview_x = self.GRID_WIDTH + 2
         preview_y = 3
-        next_shape = self.SHAPES[(self.current_shape_idx + 1) % len(self.SHAPES)]
-        next_color = self.COLORS[(self.current_shape_idx + 1) % len(self.COLORS)]
 
         # Draw preview title
-        preview_text = self.font.render("Next:", True, self.WHITE)
-        self.screen.blit(preview_text,
-                         (preview_x * self.CELL_SIZE, (preview_y - 2) * self.CELL_SIZE))
-
-        # Draw preview piece
-        for row_idx, row in enumerate(next_shape):
-            for col_idx, cell in enumerate(row):
-                if cell:
-                    rect = pygame.Rect(
-                        (preview_x + col_idx) * self.CELL_SIZE,
-                        (preview_y + row_idx) * self.CELL_SIZE,
-                        self.CELL_SIZE - 1,
-                        self.CELL_SIZE - 1
-                    )
-                    pygame.draw.rect(self.screen, next_color, rect)
+        blit_text(self.screen, "Next:", self.WHITE, 24,
+                  topleft=(preview_x * self.CELL_SIZE, (preview_y - 2) * self.CELL_SIZE))
+        self.draw_preview()
 
         # Draw score and level info
         info_x = self.GRID_WIDTH + 2
         info_y = 8
-
-        score_text = self.font.render(f"Score: {self.score}", True, self.WHITE)
-        level_text = self.font.render(f"Level: {self.level}", True, self.WHITE)
-        lines_text = self.font.render(f"Lines: {self.lines_cleared}", True, self.WHITE)
-
-        self.screen.blit(score_text, (info_x * self.CELL_SIZE, info_y * self.CELL_SIZE))
-        self.screen.blit(level_text, (info_x * self.CELL_SIZE, (info_y + 1.5) * self.CELL_SIZE))
-        self.screen.blit(lines_text, (info_x * self.CELL_SIZE, (info_y + 3) * self.CELL_SIZE))
+        self.draw_stats()
 
         # Draw control hints
         controls_y = info_y + 6
@@ -265,36 +340,61 @@ class TetrisGame:
         ]
 
         for i, text in enumerate(controls):
-            control_text = self.font.render(text, True, self.WHITE)
-            self.screen.blit(control_text,
-                             (info_x * self.CELL_SIZE, (controls_y + i * 1.2) * self.CELL_SIZE))
+            blit_text(self.screen, text, self.WHITE, 24,
+                      topleft=(info_x * self.CELL_SIZE, int((controls_y + i * 1.2) * self.CELL_SIZE)))
+
+    def draw_preview(self):
+        """Draw the next piece preview (clears its 4x2 cell area first)"""
+        preview_x = self.GRID_WIDTH + 2
+        preview_y = 3
+        self.screen.fill(self.BLACK, (preview_x * self.CELL_SIZE, preview_y * self.CELL_SIZE,
+                                      4 * self.CELL_SIZE, 2 * self.CELL_SIZE))
+        next_shape = self.SHAPES[(self.current_shape_idx + 1) % len(self.SHAPES)]
+        next_color = self.COLORS[(self.current_shape_idx + 1) % len(self.COLORS)]
+
+        # Draw preview piece
+        for row_idx, row in enumerate(next_shape):
+            for col_idx, cell in enumerate(row):
+                if cell:
+                    rect = pygame.Rect(
+                        (preview_x + col_idx) * self.CELL_SIZE,
+                        (preview_y + row_idx) * self.CELL_SIZE,
+                        self.CELL_SIZE - 1,
+                        self.CELL_SIZE - 1
+                    )
+                    pygame.draw.rect(self.screen, next_color, rect)
+
+    def draw_stats(self):
+        """Draw score, level and lines (clears the stats area first)"""
+        info_x = self.GRID_WIDTH + 2
+        info_y = 8
+        self.screen.fill(self.BLACK, (info_x * self.CELL_SIZE, info_y * self.CELL_SIZE,
+                                      self.SCREEN_WIDTH - info_x * self.CELL_SIZE, 4 * self.CELL_SIZE))
+
+        self.score_label.draw(self.screen, f"Score: {self.score}",
+                              topleft=(info_x * self.CELL_SIZE, info_y * self.CELL_SIZE))
+        self.level_label.draw(self.screen, f"Level: {self.level}",
+                              topleft=(info_x * self.CELL_SIZE, int((info_y + 1.5) * self.CELL_SIZE)))
+        self.lines_label.draw(self.screen, f"Lines: {self.lines_cleared}",
+                              topleft=(info_x * self.CELL_SIZE, (info_y + 3) * self.CELL_SIZE))
 
     def draw_game_over(self):
         """Draw game over screen with restart button"""
         # Create semi-transparent overlay
-        overlay = pygame.Surface((self.SCREEN_WIDTH, self.SCREEN_HEIGHT), pygame.SRCALPHA)
-        overlay.fill((0, 0, 0, 180))  # Black with alpha
-        self.screen.blit(overlay, (0, 0))
+        draw_overlay(self.screen)  # Black with alpha
 
         # Draw game over text
-        game_over_text = self.font_large.render("GAME OVER", True, (255, 50, 50))
-        score_text = self.font.render(f"Final Score: {self.score}", True, self.WHITE)
-        hint_text = self.font.render("Click RESTART button to play again", True, (200, 200, 100))
-
-        self.screen.blit(game_over_text,
-                         (self.SCREEN_WIDTH // 2 - game_over_text.get_width() // 2,
-                          self.SCREEN_HEIGHT // 2 - 80))
-        self.screen.blit(score_text,
-                         (self.SCREEN_WIDTH // 2 - score_text.get_width() // 2,
-                          self.SCREEN_HEIGHT // 2 - 40))
-        self.screen.blit(hint_text,
-                         (self.SCREEN_WIDTH // 2 - hint_text.get_width() // 2,
-                          self.SCREEN_HEIGHT // 2))
+        blit_text(self.screen, "GAME OVER", (255, 50, 50), 36,
+                  midtop=(self.SCREEN_WIDTH // 2, self.SCREEN_HEIGHT // 2 - 80))
+        blit_text(self.screen, f"Final Score: {self.score}", self.WHITE, 24,
+                  midtop=(self.SCREEN_WIDTH // 2, self.SCREEN_HEIGHT // 2 - 40))
+        blit_text(self.screen, "Click RESTART button to play again", (200, 200, 100), 24,
+                  midtop=(self.SCREEN_WIDTH // 2, self.SCREEN_HEIGHT // 2))
 
         # Draw restart button if it exists
         if self.restart_button:
             # Update button hover state
-            mouse_pos = pygame.mouse.get_pos()
+            mouse_pos = self.get_mouse_pos()
             self.restart_button.check_hover(mouse_pos)
             self.restart_button.draw(self.screen)
 
@@ -306,83 +406,82 @@ class TetrisGame:
         if self.game_over:
             self.draw_game_over()
 
-        pygame.display.flip()
+    def handle_events(self):
+        """Handle input events, return False to exit the game"""
+        running = True
+        for event in pygame.event.get():
+            if self.profiler.handle_event(event) or self.dirty.handle_event(event):
+                continue
+            if event.type == pygame.QUIT:
+                running = False
+            elif event.type == pygame.KEYDOWN:
+                if event.key == pygame.K_ESCAPE:
+                    running = False
+                elif event.key == pygame.K_r and self.game_over:
+                    # Keep R key as alternative way to restart
+                    self.restart()
+                elif not self.game_over:
+                    # Key presses are applied as actions on the next logic tick
+                    if event.key == pygame.K_LEFT:
+                        self.pending_action |= self.ACTION_LEFT
+                    elif event.key == pygame.K_RIGHT:
+                        self.pending_action |= self.ACTION_RIGHT
+                    elif event.key == pygame.K_UP:
+                        # Rotate piece
+                        self.pending_action |= self.ACTION_ROTATE
+                    elif event.key == pygame.K_SPACE:
+                        # Hard drop (drop to bottom)
+                        self.pending_action |= self.ACTION_HARD_DROP
+            elif event.type == pygame.MOUSEBUTTONDOWN:
+                # Check if restart button was clicked
+                if self.game_over and self.restart_button and self.restart_button.is_clicked(event):
+                    self.restart()
+
+        return running
 
     def run(self):
-        """Run main game loop"""
+        """Run main game loop: logic on a fixed timestep, rendering at display rate"""
+        profiler = self.profiler
+        self.start_recording()
+        timestep = FixedTimestep(self.FPS)
+        dt = 0.0
+        # Actions from key presses, applied on the next logic tick
+        self.pending_action = 0
         running = True
-        last_time = pygame.time.get_ticks()
-        soft_drop = False
 
         while running:
-            current_time = pygame.time.get_ticks()
-            delta_time = (current_time - last_time) / 1000.0  # Convert to seconds
-            last_time = current_time
+            profiler.begin_frame()
 
             # Handle events
-            for event in pygame.event.get():
-                if event.type == pygame.QUIT:
-                    running = False
-                elif event.type == pygame.KEYDOWN:
-                    if event.key == pygame.K_ESCAPE:
-                        running = False
-                    elif event.key == pygame.K_r and self.game_over:
-                        # Keep R key as alternative way to restart
-                        self.reset_game()
-                    elif not self.game_over:
-                        if event.key == pygame.K_LEFT:
-                            if not self.check_collision(self.current_x - 1, self.current_y, self.current_shape):
-                                self.current_x -= 1
-                        elif event.key == pygame.K_RIGHT:
-                            if not self.check_collision(self.current_x + 1, self.current_y, self.current_shape):
-                                self.current_x += 1
-                        elif event.key == pygame.K_UP:
-                            # Rotate piece
-                            rotated = self.rotate_shape(self.current_shape)
-                            if not self.check_collision(self.current_x, self.current_y, rotated):
-                                self.current_shape = rotated
-                        elif event.key == pygame.K_DOWN:
-                            soft_drop = True
-                        elif event.key == pygame.K_SPACE:
-                            # Hard drop (drop to bottom)
-                            while not self.check_collision(self.current_x, self.current_y + 1, self.current_shape):
-                                self.current_y += 1
-                elif event.type == pygame.KEYUP:
-                    if event.key == pygame.K_DOWN:
-                        soft_drop = False
-                elif event.type == pygame.MOUSEBUTTONDOWN:
-                    # Check if restart button was clicked
-                    if self.game_over and self.restart_button and self.restart_button.is_clicked(event):
-                        self.reset_game()
+            with profiler.phase('event'):
+                running = self.handle_events()
 
             if not running:
                 break
 
-            # Update game state
-            if not self.game_over:
-                # Update fall timer
-                speed = self.FALL_SPEED / 10 if soft_drop else self.FALL_SPEED
-                self.fall_timer += delta_time
-
-                if self.fall_timer >= speed:
-                    self.fall_timer = 0
-                    # Try to move down
-                    if not self.check_collision(self.current_x, self.current_y + 1, self.current_shape):
-                        self.current_y += 1
-                    else:
-                        # Can't move down, merge piece and create new one
-                        self.merge_piece()
-                        self.clear_lines()
-                        self.new_piece()
+            # Update game state; holding Down soft-drops on every tick
+            with profiler.phase('update'):
+                held = self.ACTION_SOFT_DROP if pygame.key.get_pressed()[pygame.K_DOWN] else 0
+                for _ in range(timestep.advance(dt)):
+                    self.advance(held | self.pending_action)
+                    self.pending_action = 0
 
             # Draw
-            self.draw()
-            self.clock.tick(self.FPS)
-
+            # The game over overlay covers the whole screen, so any change to it is a full redraw
+            restart_hover = self.restart_button is not None and \
+                self.restart_button.check_hover(self.get_mouse_pos())
+            with profiler.phase('draw'):
+                rects = self.dirty.draw(self.screen, self.draw, scene=(self.game_over, restart_hover))
+            with profiler.phase('flip'):
+                self.dirty.update(rects)
+            with profiler.phase('tick'):
+                dt = self.clock.tick(DISPLAY_FPS) / 1000
+
+        self.stop_recording()
+        profiler.close()
         pygame.quit()
         return
 
-
 if __name__ == "__main__":
     game = TetrisGame()
     game.run()
\ No newline at end of file
@@ -1,11 +1,22 @@
 import pygame
 import sys
 
+from dirty_rects import DirtyRegions
+from frame_profiler import FrameProfiler
+from game_loop import FixedTimestep
+from game_api import HeadlessGame
+from game_ui import blit_text, draw_button
 
-class TicTacToe:
-    def __init__(self):
+
+class TicTacToe(HeadlessGame):
+    TITLE = "⭕ Tic-Tac-Toe"
+    ORDER = 20
+
+    def __init__(self, headless=False, seed=None):
         # 初始化pygame[citation:1]
         pygame.init()
+        # 游戏自己的随机数流，seed为None时随机选择（录制时会保存下来）
+        self.seed_rng(seed)
 
         # Game constants
         self.WIDTH, self.HEIGHT = 500, 600
@@ -30,13 +41,30 @@ class TicTacToe:
         self.BUTTON_RED_HOVER = (170, 70, 70)
 
         # Create game window[citation:1]
-        self.screen = pygame.display.set_mode((self.WIDTH, self.HEIGHT))
-        pygame.display.set_caption("Tic-Tac-Toe | Click to Play | ESC to Exit")
+        self.screen = self.setup_screen((self.WIDTH, self.HEIGHT),
+                                        "Tic-Tac-Toe | Click to Play | ESC to Exit",
+                                        headless)
 
         # Game clock[citation:1]
         self.clock = pygame.time.Clock()
         self.FPS = 60
 
+        # 帧剖析器（默认关闭，F9开关，F10导出）
+        self.profiler = FrameProfiler(type(self).__name__)
+        self.profiler.instrument(self, 'draw_board', 'draw_pieces', 'draw_status')
+
+        # 脏矩形刷新：棋盘和状态栏只在变化时重绘（F8显示重绘区域）
+        # 用lambda而不是绑定方法，这样剖析器替换的方法也会生效
+        self.dirty = DirtyRegions()
+        self.dirty.add((0, 0, self.WIDTH, self.WIDTH),
+                       lambda: (tuple(map(tuple, self.board)), self.winning_line),
+                       lambda: self.draw_play_area())
+        self.dirty.add((0, self.WIDTH, self.WIDTH, self.HEIGHT - self.WIDTH),
+                       lambda: (self.game_over, self.winner, self.current_player,
+                                self.restart_button_hover, self.new_game_button_hover,
+                                self.exit_button_hover),
+                       lambda: self.draw_status())
+
         # Game state
         self.reset_game()
 
@@ -60,6 +88,8 @@ class TicTacToe:
         mouse_pos = pygame.mouse.get_pos()
 
         for event in pygame.event.get():
+            if self.profiler.handle_event(event) or self.dirty.handle_event(event):
+                continue
             if event.type == pygame.QUIT:
                 pygame.quit()
                 sys.exit()
@@ -68,9 +98,9 @@ class TicTacToe:
                     return False  # Exit game
                 # 保留键盘快捷键作为备选
                 elif event.key == pygame.K_r and self.game_over:
-                    self.reset_game()
+                    self.restart()
                 elif event.key == pygame.K_n and not self.game_over:
-                    self.reset_game()
+                    self.restart()
 
             elif event.type == pygame.MOUSEBUTTONDOWN:
                 x, y = pygame.mouse.get_pos()
@@ -80,11 +110,12 @@ class TicTacToe:
                     if y < self.WIDTH:  # Only clicks on board area are valid
                         row = y // self.CELL_SIZE
                         col = x // self.CELL_SIZE
-                        self.make_move(row, col)
+                        # 在下一个逻辑帧作为动作落子
+                        self.pending_action = row * self.BOARD_SIZE + col
 
                     # 检查是否点击了"新游戏"按钮
                     elif hasattr(self, 'new_game_button_rect') and self.new_game_button_rect.collidepoint(x, y):
-                        self.reset_game()
+                        self.restart()
 
                     # 检查是否点击了"退出"按钮
                     elif hasattr(self, 'exit_button_rect') and self.exit_button_rect.collidepoint(x, y):
@@ -93,7 +124,7 @@ class TicTacToe:
                 else:  # 游戏结束
                     # 检查是否点击了"重新开始"按钮
                     if hasattr(self, 'restart_button_rect') and self.restart_button_rect.collidepoint(x, y):
-                        self.reset_game()
+                        self.restart()
 
                     # 检查是否点击了"退出"按钮
                     elif hasattr(self, 'exit_button_rect') and self.exit_button_rect.collidepoint(x, y):
@@ -122,6 +153,23 @@ class TicTacToe:
             if not self.game_over:
                 self.current_player = 3 - self.current_player  # 1<->2
 
+    def apply_action(self, action):
+        """step() 的动作：格子下标 0-8（row * 3 + col），None表示不落子"""
+        if action is not None and not self.game_over:
+            self.make_move(action // self.BOARD_SIZE, action % self.BOARD_SIZE)
+
+    def observe(self):
+        """观测：棋盘（0=空 1=X 2=O）、当前玩家和胜者"""
+        return {
+            'board': self.board,
+            'current_player': self.current_player,
+            'winner': self.winner,
+        }
+
+    def reward_signal(self):
+        # 落子获胜的一步奖励为1
+        return 1 if self.winner in (1, 2) else 0
+
     def check_game_over(self):
         """检查游戏是否结束（获胜或平局）"""
         # Check rows
@@ -228,24 +276,6 @@ class TicTacToe:
         pygame.draw.line(self.screen, self.HIGHLIGHT_COLOR,
                          start_pos, end_pos, line_width)
 
-    def draw_button(self, rect, text, normal_color, hover_color, is_hovering, font_size=28):
-        """绘制按钮的通用函数"""
-        # 选择按钮颜色
-        button_color = hover_color if is_hovering else normal_color
-
-        # 绘制按钮背景
-        pygame.draw.rect(self.screen, button_color, rect, border_radius=8)
-        pygame.draw.rect(self.screen, (220, 220, 220), rect, 2, border_radius=8)
-
-        # 绘制按钮文字
-        button_font = pygame.font.SysFont(None, font_size)
-        button_text = button_font.render(text, True, (255, 255, 255))
-        self.screen.blit(button_text,
-                         (rect.centerx - button_text.get_width() // 2,
-                          rect.centery - button_text.get_height() // 2))
-
-        return rect
-
     def draw_status(self):
         """绘制游戏状态信息 - 左边按钮，右边文字"""
         # Status area background
@@ -258,10 +288,6 @@ class TicTacToe:
                          (divider_x, self.WIDTH),
                          (divider_x, self.HEIGHT), 2)
 
-        font_large = pygame.font.SysFont(None, 48)
-        font_medium = pygame.font.SysFont(None, 32)
-        font_small = pygame.font.SysFont(None, 20)
-
         # Game status text (右边区域)
         if self.game_over:
             if self.winner == 1:
@@ -283,10 +309,8 @@ class TicTacToe:
         text_area_center_x = divider_x + text_area_width // 2
         text_area_center_y = self.WIDTH + (self.HEIGHT - self.WIDTH) // 2
 
-        status_surface = font_large.render(status_text, True, color)
-        self.screen.blit(status_surface,
-                         (text_area_center_x - status_surface.get_width() // 2,
-                          text_area_center_y - status_surface.get_height() // 2))
+        blit_text(self.screen, status_text, color, 48,
+                  center=(text_area_center_x, text_area_center_y))
 
         # 按钮布局 (左边区域)
         button_width = 200  # 稍微加宽按钮
@@ -309,12 +333,11 @@ class TicTacToe:
                 button_width,
                 button_height
             )
-            self.restart_button_rect = self.draw_button(
+            self.restart_button_rect = draw_button(
+                self.screen,
                 restart_button_rect,
                 "PLAY AGAIN",
-                self.BUTTON_GREEN_NORMAL,
-                self.BUTTON_GREEN_HOVER,
-                self.restart_button_hover,
+                self.BUTTON_GREEN_HOVER if self.restart_button_hover else self.BUTTON_GREEN_NORMAL,
                 font_size=28
             )
 
@@ -325,12 +348,11 @@ class TicTacToe:
                 button_width,
                 button_height
             )
-            self.exit_button_rect = self.draw_button(
+            self.exit_button_rect = draw_button(
+                self.screen,
                 exit_button_rect,
                 "EXIT TO LAUNCHER",
-                self.BUTTON_RED_NORMAL,
-                self.BUTTON_RED_HOVER,
-                self.exit_button_hover,
+                self.BUTTON_RED_HOVER if self.exit_button_hover else self.BUTTON_RED_NORMAL,
                 font_size=24
             )
         else:
@@ -341,12 +363,11 @@ class TicTacToe:
                 button_width,
                 button_height
             )
-            self.new_game_button_rect = self.draw_button(
+            self.new_game_button_rect = draw_button(
+                self.screen,
                 new_game_button_rect,
                 "NEW GAME",
-                self.BUTTON_BLUE_NORMAL,
-                self.BUTTON_BLUE_HOVER,
-                self.new_game_button_hover,
+                self.BUTTON_BLUE_HOVER if self.new_game_button_hover else self.BUTTON_BLUE_NORMAL,
                 font_size=28
             )
 
@@ -357,12 +378,11 @@ class TicTacToe:
                 button_width,
                 button_height
             )
-            self.exit_button_rect = self.draw_button(
+            self.exit_button_rect = draw_button(
+                self.screen,
                 exit_button_rect,
                 "EXIT TO LAUNCHER",
-                self.BUTTON_RED_NORMAL,
-                self.BUTTON_RED_HOVER,
-                self.exit_button_hover,
+                self.BUTTON_RED_HOVER if self.exit_button_hover else self.BUTTON_RED_NORMAL,
                 font_size=24
             )
 
@@ -372,47 +392,64 @@ class TicTacToe:
         else:
             hint_text = "(You can also press N for new game)"
 
-        hint_surface = font_small.render(hint_text, True, (150, 150, 150))
         hint_y = self.HEIGHT - 20
-        self.screen.blit(hint_surface,
-                         (self.WIDTH // 2 - hint_surface.get_width() // 2,
-                          hint_y))
+        blit_text(self.screen, hint_text, (150, 150, 150), 20,
+                  midtop=(self.WIDTH // 2, hint_y))
 
     def draw(self):
         """绘制游戏所有元素[citation:9]"""
         # Fill background color
         self.screen.fill(self.BG_COLOR)
 
-        # Draw board
-        self.draw_board()
+        # Draw board, pieces and winning line
+        self.draw_play_area()
+
+        # Draw status information
+        self.draw_status()
 
-        # Draw pieces
+    def draw_play_area(self):
+        """绘制棋盘区域：棋盘、棋子和获胜连线"""
+        self.draw_board()
         self.draw_pieces()
 
         # If game over, draw winning line
         if self.game_over and self.winning_line:
             self.draw_winning_line()
 
-        # Draw status information
-        self.draw_status()
-
-        # Update display[citation:1]
-        pygame.display.flip()
-
     def run(self):
         """运行游戏主循环[citation:1][citation:9]"""
+        profiler = self.profiler
+        self.start_recording()
+        # 点击产生的动作在逻辑帧里生效，逻辑帧数就是录制的时间戳
+        timestep = FixedTimestep(self.FPS)
+        dt = 0.0
+        self.pending_action = None
         running = True
         while running:
+            profiler.begin_frame()
+
             # 1. 处理事件[citation:9]
-            running = self.handle_events()
+            with profiler.phase('event'):
+                running = self.handle_events()
+
+            with profiler.phase('update'):
+                for _ in range(timestep.advance(dt)):
+                    self.advance(self.pending_action)
+                    self.pending_action = None
 
             # 2. 绘制游戏[citation:9]
-            self.draw()
+            with profiler.phase('draw'):
+                rects = self.dirty.draw(self.screen, self.draw)
+            with profiler.phase('flip'):
+                self.dirty.update(rects)
 
             # 3. 控制游戏帧率[citation:1]
-            self.clock.tick(self.FPS)
+            with profiler.phase('tick'):
+                dt = self.clock.tick(self.FPS) / 1000
 
         # Exit game
+        self.stop_recording()
+        profiler.close()
         pygame.quit()
         return
 
@@ -0,0 +1,239 @@
+"""网格棋盘的视口（摄像机）
+
+棋盘可以比窗口大。视口记录棋盘在屏幕上占的区域（rect）、当前的格子
+大小（缩放级别）和滚动位置（棋盘像素坐标），负责：
+- 屏幕坐标和格子坐标之间的换算（点击、悬停）
+- 计算视口里能看到的格子范围，每帧只绘制这些格子
+- 平移（拖动、方向键）和以鼠标位置为中心的缩放
+
+棋盘比视口小时居中显示。每次平移或缩放 version 加1，
+使用者据此判断按屏幕位置缓存的东西（例如脏矩形区域）是否过期。
+stagger 为True时奇数行向右错开半个格子（六边形棋盘画成砖墙的样子）。
+rows、cols 为None时棋盘在这个方向上没有边界（无尽模式），行列号可以是负数。
+
+GridLayer 把视口里的格子缓存在离屏Surface上，只重画失效的格子。
+"""
+import pygame
+
+ZOOM_LEVELS = (8, 12, 16, 20, 24, 32, 40, 48, 64)
+
+
+class Viewport:
+    def __init__(self, rect, rows, cols, cell_size, zoom_levels=ZOOM_LEVELS, stagger=False):
+        self.rect = pygame.Rect(rect)
+        self.rows = rows
+        self.cols = cols
+        self.cell_size = cell_size
+        self.zoom_levels = zoom_levels
+        self.stagger = stagger
+        # 视口左上角对应的棋盘像素坐标（棋盘比视口小时为负数，用来居中）
+        self.offset_x = 0
+        self.offset_y = 0
+        self.version = 0
+        self.clamp()
+
+    def clamp(self):
+        """把滚动位置限制在棋盘范围内"""
+        if self.cols is not None:
+            self.offset_x = self._clamp_axis(self.offset_x, self.board_width(), self.rect.width)
+        if self.rows is not None:
+            self.offset_y = self._clamp_axis(self.offset_y, self.rows * self.cell_size, self.rect.height)
+
+    def row_shift(self, row):
+        """第row行向右错开的像素数"""
+        return self.cell_size // 2 if self.stagger and row & 1 else 0
+
+    def board_width(self):
+        """棋盘的像素宽度（错开的行多出半个格子）"""
+        return self.cols * self.cell_size + (self.cell_size // 2 if self.stagger and self.rows != 1 else 0)
+
+    @staticmethod
+    def _clamp_axis(offset, board, view):
+        if board <= view:
+            return -((view - board) // 2)
+        return min(max(offset, 0), board - view)
+
+    @staticmethod
+    def _limit(start, end, count):
+        """把格子范围 [start, end) 限制在 0..count 里，count为None时不限制"""
+        if count is None:
+            return start, end
+        return max(start, 0), min(end, count)
+
+    def pan(self, dx, dy):
+        """按屏幕像素平移（正数表示看棋盘的右边、下边）"""
+        old = (self.offset_x, self.offset_y)
+        self.offset_x += dx
+        self.offset_y += dy
+        self.clamp()
+        if (self.offset_x, self.offset_y) != old:
+            self.version += 1
+
+    def zoom(self, steps, anchor=None):
+        """放大（steps > 0）或缩小若干级，anchor处的棋盘内容保持在原来的屏幕位置"""
+        levels = self.zoom_levels
+        if steps > 0:
+            larger = [size for size in levels if size > self.cell_size]
+            new_size = larger[min(steps, len(larger)) - 1] if larger else self.cell_size
+        else:
+            smaller = [size for size in levels if size < self.cell_size]
+            new_size = smaller[max(len(smaller) + steps, 0)] if smaller and steps else self.cell_size
+        if new_size == self.cell_size:
+            return
+
+        ax, ay = anchor if anchor is not None else self.rect.center
+        ax -= self.rect.x
+        ay -= self.rect.y
+        # anchor下面的棋盘位置（以格子为单位）缩放前后不变
+        board_x = (self.offset_x + ax) / self.cell_size
+        board_y = (self.offset_y + ay) / self.cell_size
+        self.cell_size = new_size
+        self.offset_x = round(board_x * new_size - ax)
+        self.offset_y = round(board_y * new_size - ay)
+        self.clamp()
+        self.version += 1
+
+    def cell_at(self, pos):
+        """屏幕坐标下的格子 (行, 列)，不在棋盘上时返回None"""
+        x, y = pos
+        if not self.rect.collidepoint(x, y):
+            return None
+        row = (y - self.rect.y + self.offset_y) // self.cell_size
+        col = (x - self.rect.x + self.offset_x - self.row_shift(row)) // self.cell_size
+        if (self.rows is None or 0 <= row < self.rows) and (self.cols is None or 0 <= col < self.cols):
+            return row, col
+        return None
+
+    def cell_rect(self, row, col):
+        """格子在屏幕上的矩形（可能只有一部分在视口里）"""
+        return pygame.Rect(self.rect.x + col * self.cell_size + self.row_shift(row) - self.offset_x,
+                           self.rect.y + row * self.cell_size - self.offset_y,
+                           self.cell_size, self.cell_size)
+
+    def visible_range(self):
+        """视口里能看到的格子范围 (起始行, 结束行, 起始列, 结束列)，不包括结束行列"""
+        size = self.cell_size
+        row0, row1 = self._limit(self.offset_y // size, -(-(self.offset_y + self.rect.height) // size),
+                                 self.rows)
+        col0, col1 = self._limit((self.offset_x - (size // 2 if self.stagger else 0)) // size,
+                                 -(-(self.offset_x + self.rect.width) // size), self.cols)
+        return row0, row1, col0, col1
+
+
+class GridLayer:
+    """视口里可见格子的离屏缓存
+
+    格子画在一个与视口同样大小的Surface上，之后只有被标记为失效的格子
+    （揭开、插旗、鼠标进出）才会重画，每帧把这个Surface贴到屏幕上即可。
+    视口平移时把已有的内容滚动过去，只重画新露出来的条带；缩放时全部重画。
+
+    paint(row, col) 把一个格子画到 surface 上 cell_rect(row, col) 的位置。
+    """
+
+    def __init__(self, view, paint, background):
+        self.view = view
+        self.paint = paint
+        self.background = background
+        self.surface = None
+        # 需要重画的格子；all_invalid 为True时下次全部重画
+        self.pending = []
+        self.all_invalid = True
+        # 上次画好时视口的状态
+        self.painted_view = None
+        # 每次有格子重画就加1，用作脏矩形的key
+        self.generation = 0
+
+    def invalidate(self, cells):
+        """标记格子需要重画，cells是 (行, 列) 的序列"""
+        if not self.all_invalid:
+            self.pending.extend(cells)
+
+    def invalidate_all(self):
+        self.all_invalid = True
+        self.pending.clear()
+
+    def cell_rect(self, row, col):
+        """格子在layer上的矩形"""
+        view = self.view
+        size = view.cell_size
+        return pygame.Rect(col * size + view.row_shift(row) - view.offset_x, row * size - view.offset_y,
+                           size, size)
+
+    def update(self):
+        """重画失效的格子，返回layer上发生变化的矩形列表"""
+        view = self.view
+        if self.surface is None or self.surface.get_size() != view.rect.size:
+            self.surface = pygame.Surface(view.rect.size)
+            if pygame.display.get_surface() is not None:
+                self.surface = self.surface.convert()
+            self.all_invalid = True
+
+        # 视口移动后整个layer的内容都变了
+        moved = False
+        state = (view.cell_size, view.offset_x, view.offset_y)
+        if state != self.painted_view and not self.all_invalid:
+            old_size, old_x, old_y = self.painted_view
+            if old_size != view.cell_size:
+                self.all_invalid = True
+            else:
+                self._scroll(view.offset_x - old_x, view.offset_y - old_y)
+                moved = True
+        self.painted_view = state
+
+        if self.all_invalid:
+            self.all_invalid = False
+            self.pending.clear()
+            self.surface.fill(self.background)
+            self._paint_area(self.surface.get_rect())
+            self.generation += 1
+            return [self.surface.get_rect()]
+
+        rects = []
+        if self.pending:
+            # 大片展开时失效的格子可能比视口里的格子还多，直接全部重画
+            row0, row1, col0, col1 = view.visible_range()
+            if len(self.pending) > (row1 - row0) * (col1 - col0):
+                self.invalidate_all()
+                return self.update()
+            for row, col in set(self.pending):
+                if row0 <= row < row1 and col0 <= col < col1:
+                    self.paint(row, col)
+                    rects.append(self.cell_rect(row, col))
+            self.pending.clear()
+            if rects:
+                self.generation += 1
+        return [self.surface.get_rect()] if moved else rects
+
+    def _scroll(self, dx, dy):
+        """视口平移了 (dx, dy)：移动已有内容，重画新露出来的条带"""
+        width, height = self.surface.get_size()
+        if abs(dx) >= width or abs(dy) >= height:
+            self.all_invalid = True
+            return
+        self.surface.scroll(-dx, -dy)
+        exposed = []
+        if dx > 0:
+            exposed.append(pygame.Rect(width - dx, 0, dx, height))
+        elif dx < 0:
+            exposed.append(pygame.Rect(0, 0, -dx, height))
+        if dy > 0:
+            exposed.append(pygame.Rect(0, height - dy, width, dy))
+        elif dy < 0:
+            exposed.append(pygame.Rect(0, 0, width, -dy))
+        for area in exposed:
+            self.surface.fill(self.background, area)
+            self._paint_area(area)
+        self.generation += 1
+
+    def _paint_area(self, area):
+        """重画与layer上的area相交的所有格子"""
+        view = self.view
+        size = view.cell_size
+        row0, row1 = view._limit((view.offset_y + area.top) // size, -(-(view.offset_y + area.bottom) // size),
+                                 view.rows)
+        col0, col1 = view._limit((view.offset_x + area.left - (size // 2 if view.stagger else 0)) // size,
+                                 -(-(view.offset_x + area.right) // size), view.cols)
+        paint = self.paint
+        for row in range(row0, row1):
+            for col in range(col0, col1):
+                paint(row, col)